@@ -26,20 +26,15 @@
 
 #!/usr/bin/env python 
 # -*- coding: utf-8 -*-
-import time
-import hashlib 
-
 # Import QT backends
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
 from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import pyqtSignal
 
-# Import QVisaWidgets
-from .widgets.QVisaDeviceSelect import QVisaDeviceSelect
-from .widgets.QVisaMetaWidget import QVisaMetaWidget
-from .widgets.QVisaSaveWidget import QVisaSaveWidget
+# Note that QVisaWidgets are imported when they are generated (see below)
 
-# Import QVisaDataObject
-from .utils.QVisaDataObject import QVisaDataObject
+# Import headless acquisition core
+from .core.QVisaAcquisition import QVisaAcquisition
 
 
 #####################################
@@ -49,18 +44,37 @@ from .utils.QVisaDataObject import QVisaDataObject
 # The purpouse of the QVisaApplication object is to bind a list pyVisaDevices to a QWidget 
 # It provides a basic framework for constructing user interfaces for interacting with GPIB 
 # hardware. 
+#
+# Devices, data and statistics are handled by a QVisaAcquisition (PyQtVisa.core)
+# which the application wraps. The same measurement code can run headless on 
+# the acquisition object.
 
 class QVisaApplication(QWidget):
 
+	# Device change signals (forwarded from _config)
+	deviceAdded = pyqtSignal(object)
+	deviceRemoved = pyqtSignal(object)
+
 	# Initialization: Note that _config is a QVisaConfig object 
 	# which contains a list of pyVisaDevices	
 	def __init__(self, _config):
 
 		QWidget.__init__(self)
 
-		# Data and configuration
-		self._data = QVisaDataObject()
+		# Configuration and acquisition core
 		self._config = _config 
+		self._acquisition = QVisaAcquisition( _config.get_registry() )
+
+		# Forward device change signals
+		_config.deviceAdded.connect(self.deviceAdded)
+		_config.deviceRemoved.connect(self.deviceRemoved)
+
+		# Data object (owned by acquisition core)
+		self._data = self._acquisition.get_data_object()
+
+	# Getter method for acquisition core
+	def get_acquisition(self):
+		return self._acquisition
 
 	# Getter method for data object
 	def _get_data_object(self):
@@ -68,37 +82,22 @@ class QVisaApplication(QWidget):
 
 	# Method to reset data
 	def _reset_data_object(self):
-		self._data.reset()
+		self._acquisition.reset_data_object()
 
 	#####################################
 	#  CONFIG WRAPPER METHODS
 	#	
 
 	def get_devices(self):
-	
-		if self._config.Devices != []:
-			return self._config.Devices
-		else:
-			return None 
+		return self._acquisition.get_devices()
 				
 	# Get all device names
 	def get_device_names(self):
-
-		if self._config.Devices != []:
-			return [_.get_property("name") for _ in self._config.Devices]	
-		else:	
-			return None
+		return self._acquisition.get_device_names()
 
 	# Get device by name
 	def get_device_by_name(self, _name):
-
-		# Loop through insturment list
-		for _ in self._config.Devices:
-			if _.get_property("name") == _name:
-				return _
-
-		# If we do not find device return None		
-		return None
+		return self._acquisition.get_device_by_name(_name)
 
 
 	#####################################
@@ -107,19 +106,36 @@ class QVisaApplication(QWidget):
 
 	# Method to set metadata 
 	def set_metadata(self, key, subkey, value):
-		self._data.set_metadata(key, subkey, value)
+		self._acquisition.set_metadata(key, subkey, value)
 
 	# Method to get metadata	
 	def get_metadata(self, key, subkey):
-		return self._data.get_metadata(key, subkey)
+		return self._acquisition.get_metadata(key, subkey)
 
 	# Method to set app-level meta
 	def _set_app_metadata(self, key, value):
-		self._data.set_metadata( "__self__" , key, value)
+		self._acquisition.set_app_metadata(key, value)
 
 	# Method to get app-level meta
 	def _get_app_metadata(self, key):	
-		return self._data.get_metadata("__self__", key)
+		return self._acquisition.get_app_metadata(key)
+
+	#####################################
+	#  STATISTICS WRAPPER METHODS
+	#	
+
+	# Method to enable running statistics (count, mean, std, min, max, last
+	# and optional ewma) on data subkey. Statistics are updated on append.
+	def enable_stats(self, key, subkey, ewma=None):
+		return self._acquisition.enable_stats(key, subkey, ewma)
+
+	# Method to disable running statistics on data subkey
+	def disable_stats(self, key, subkey):
+		self._acquisition.disable_stats(key, subkey)
+
+	# Method to get running statistics summary (dict) on data subkey
+	def get_stats(self, key, subkey):
+		return self._acquisition.get_stats(key, subkey)
 
 	#####################################
 	#  INST/SAVE WIDGET CONSTRUCTORS
@@ -127,14 +143,20 @@ class QVisaApplication(QWidget):
 	
 	# Method to generate insturment widget
 	def _gen_device_select(self):
+
+		from .widgets.QVisaDeviceSelect import QVisaDeviceSelect
 		return QVisaDeviceSelect(self)
 
 	# Method to generate the standard meta widget
 	def _gen_meta_widget(self):
+
+		from .widgets.QVisaMetaWidget import QVisaMetaWidget
 		return QVisaMetaWidget(self)
 
 	# Method to generate the standard save widget
 	def _gen_save_widget(self):
+
+		from .widgets.QVisaSaveWidget import QVisaSaveWidget
 		return QVisaSaveWidget(self)
 
 
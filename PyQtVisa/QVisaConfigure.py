@@ -30,82 +30,120 @@
 
 #!/usr/bin/env python 
 # -*- coding: utf-8 -*-
-import visa
-import time
-import threading 
-import numpy as np
 
 # Import QT backends
-import os
-import sys
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QMessageBox 
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+from PyQt5.QtCore import pyqtSignal
 
-# Import QVisaInstWidget and QVisaCommWidget
-from .widgets.QVisaDeviceSelect import QVisaDeviceSelect
-from .widgets.QVisaDeviceControl import QVisaDeviceControl
+# Import headless device registry, trigger group and discovery
+from .core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from .core.QVisaTriggerGroup import QVisaTriggerGroup
+from .core.QVisaDiscovery import QVisaDiscovery
+from .core.QVisaStationProfile import QVisaStationProfile
+
+# Note that QVisaDeviceSelect and QVisaDeviceControl are imported when the 
+# widgets are generated. This keeps the import of QVisaConfigure cheap.
 
 # The purpouse of this object is to bind a list pyVisaDevices to a QWidget 
 # in a configuration context. The idea is to first construct a QVisaConifg
 # object which contains the list of insturment handles, and then pass the 
 # object to QVisaWidget objects which can interact with the insturments
 #
+# Device management is delegated to a QVisaDeviceRegistry (PyQtVisa.core), 
+# which can also be used without Qt. Registry changes are re-emitted as the
+# deviceAdded and deviceRemoved signals (argument is the QVisaDevice).
+#
 
 class QVisaConfigure(QWidget):
 
+	# Device change signals
+	deviceAdded = pyqtSignal(object)
+	deviceRemoved = pyqtSignal(object)
+
 	# Initialization
 	def __init__(self):
 
 		QWidget.__init__(self)
-		self.Devices = []
+		self._registry = QVisaDeviceRegistry()
+		self._registry.add_listener(self._emit_device_signal)
+
+	# Registry listener 
+	def _emit_device_signal(self, _event, _device):
+
+		if _event == "added":
+			self.deviceAdded.emit(_device)
+
+		if _event == "removed":
+			self.deviceRemoved.emit(_device)
+
+	# Getter method for device registry
+	def get_registry(self):
+		return self._registry
+
+	# List of devices (compatibility)
+	@property
+	def Devices(self):
+		return self._registry.Devices
 
 	# Add QVisaDevice objects
 	def add_device(self, _device):
-		self.Devices.append(_device)
+		self._registry.add_device(_device)
+
+	# Remove device by resource string or device object
+	def remove_device(self, _device, close=False):
+		return self._registry.remove_device(_device, close)
 
 	# Get all insturment handles
 	def get_devices(self):
-	
-		if self.Devices != []:
-			return self.Devices
-		else:
-			return None 
+		return self._registry.get_devices()
 			
 	# Get all device names
 	def get_device_names(self):
-
-		if self.Devices != []:
-			return [_.get_property("name") for _ in self.Devices]	
-		else:	
-			return None
+		return self._registry.get_device_names()
 
 	# Get device by resrouce string 
 	def get_device(self, _resource):
-
-		# Loop through insturment list
-		for _ in self.Devices:
-			if _.get_property("resource") == _resource:
-				return _
-
-		# If we do not find device return None		
-		return None
+		return self._registry.get_device(_resource)
 
 	# Get device by name
 	def get_device_by_name(self, _name):
+		return self._registry.get_device_by_name(_name)
+
+	# Get devices by type
+	def get_devices_by_type(self, _type):
+		return self._registry.get_devices_by_type(_type)
 
-		# Loop through insturment list
-		for _ in self.Devices:
-			if _.get_property("name") == _name:
-				return _
+	# Get devices by bus
+	def get_devices_by_bus(self, _bus):
+		return self._registry.get_devices_by_bus(_bus)
 
-		# If we do not find device return None		
-		return None
+	# Discover resources and initialize devices with matching drivers in one
+	# parallel sweep (see QVisaDiscovery). Returns list of new devices.
+	def discover_devices(self, resources=None, reset=True, timeout=500):
+		return QVisaDiscovery(timeout=timeout).populate(self._registry, resources, reset)
 
-	# Close devices on app.exit()
-	def close_devices(self):
+	# Save station profile (resource, driver, *IDN? fingerprint and configuration
+	# of each device). Returns number of saved devices.
+	def save_station(self, _filename):
+		return QVisaStationProfile(_filename).save(self._registry)
 
-		for Device in self.Devices:
+	# Warm start from station profile. Sessions are reopened in parallel and 
+	# verified by fingerprint. Only devices which do not match are reset. 
+	# Returns status ("warm", "cold" or "failed") by resource.
+	def load_station(self, _filename, timeout=500):
+		return QVisaStationProfile(_filename, timeout=timeout).warm_start(self._registry)
 
-			Device.close()
+	# Generate trigger group for synchronized acquisition. Devices are given by 
+	# name (default all devices). See QVisaTriggerGroup.
+	def gen_trigger_group(self, _names=None, interface=None):
+
+		_devices = list(self.Devices) if _names is None else [ self.get_device_by_name(_name) for _name in _names ]
+		return QVisaTriggerGroup(_devices, interface=interface)
+
+	# Close devices on app.exit(). Outputs are switched off first and sessions
+	# are closed concurrently. Returns dictionary of errors by resource.
+	def close_devices(self, timeout=5.0, safe_state=True):
+		return self._registry.close_devices(timeout, safe_state)
 
 	# Helper method to pack widgets into hbox
 	def _gen_hbox_widget(self, _widget_list):
@@ -133,9 +171,13 @@ class QVisaConfigure(QWidget):
 
 	# Method to generate device select widget
 	def _gen_device_select(self):
+
+		from .widgets.QVisaDeviceSelect import QVisaDeviceSelect
 		return QVisaDeviceSelect(self)
 
 	# Method to generate communication widget
 	def _gen_device_control(self):
+
+		from .widgets.QVisaDeviceControl import QVisaDeviceControl
 		return QVisaDeviceControl(self)
 
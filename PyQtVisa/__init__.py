@@ -0,0 +1,51 @@
+# ---------------------------------------------------------------------------------
+# 	PyQtVisa
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import importlib
+
+# Submodules are loaded on first attribute access (PEP 562), so importing the 
+# package (or only PyQtVisa.drivers) never pulls in Qt or matplotlib.
+#
+#	import PyQtVisa
+#	PyQtVisa.drivers.keithley2400	-> loads the keithley2400 driver module only
+#	PyQtVisa.core.QVisaAcquisition	-> loads the headless core (no Qt)
+#	PyQtVisa.QVisaApplication		-> loads PyQt5
+#
+# Subpackages load their modules the same way (see their __init__).
+_submodules = ("core", "drivers", "sim", "utils", "widgets", "QVisaApplication", "QVisaConfigure")
+
+def __getattr__(_name):
+
+	if _name in _submodules:
+		return importlib.import_module("%s.%s"%(__name__, _name))
+
+	raise AttributeError("module %s has no attribute %s"%(__name__, _name))
+
+def __dir__():
+	return sorted( list( globals().keys() ) + list(_submodules) )
@@ -0,0 +1,189 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaAcquisition
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+import concurrent.futures
+
+# Import QVisaDeviceRegistry and QVisaDataObject
+from .QVisaDeviceRegistry import QVisaDeviceRegistry
+from ..utils.QVisaDataObject import QVisaDataObject
+
+# Headless acquisition core. Binds a device registry to a data object and runs
+# measurement procedures on them. This is the measurement part of QVisaApplication
+# without any Qt dependency; QVisaApplication wraps an acquisition object and 
+# the GUI is an optional view on top.
+#
+# A procedure is any callable taking the acquisition object as first argument.
+# Long running procedures should check is_aborted() between points.
+#
+#	def iv_sweep(_acq, _voltages):
+#		_smu = _acq.get_device_by_name("Keithley GPIB0::24")
+#		_key = _acq.get_data_object().add_hash_key("iv")
+#		...
+#
+#	_acq = QVisaAcquisition(_registry)
+#	_acq.run(iv_sweep, np.linspace(0, 1, 11))
+#	_acq.save("iv.dat")
+#
+# Independent jobs can be distributed over worker processes with run_batch. 
+# Each worker opens its own devices and returns a QVisaDataObject, which are 
+# merged into one data object.
+#
+
+class QVisaAcquisition:
+
+	def __init__(self, _registry=None):
+
+		# Device registry and data object
+		self._registry = _registry if _registry is not None else QVisaDeviceRegistry()
+		self._data = QVisaDataObject()
+
+		# Runner state
+		self._abort = threading.Event()
+		self._running = False
+
+	# Getter method for device registry
+	def get_registry(self):
+		return self._registry
+
+	# Getter method for data object
+	def get_data_object(self):
+		return self._data
+
+	# Method to reset data
+	def reset_data_object(self):
+		self._data.reset()
+
+	# Method to save data object
+	def save(self, _filename):
+		self._data.write_to_file(_filename)
+
+	#####################################
+	#  DEVICE WRAPPER METHODS
+	#
+
+	def get_devices(self):
+		return self._registry.get_devices()
+
+	def get_device_names(self):
+		return self._registry.get_device_names()
+
+	def get_device(self, _resource):
+		return self._registry.get_device(_resource)
+
+	def get_device_by_name(self, _name):
+		return self._registry.get_device_by_name(_name)
+
+	#####################################
+	#  METADATA AND STATISTICS
+	#
+
+	def set_metadata(self, _key, _subkey, _value):
+		self._data.set_metadata(_key, _subkey, _value)
+
+	def get_metadata(self, _key, _subkey):
+		return self._data.get_metadata(_key, _subkey)
+
+	# App-level metadata is stored on the __self__ key
+	def set_app_metadata(self, _key, _value):
+		self._data.set_metadata("__self__", _key, _value)
+
+	def get_app_metadata(self, _key):
+		return self._data.get_metadata("__self__", _key)
+
+	def enable_stats(self, _key, _subkey, ewma=None):
+		return self._data.enable_subkey_stats(_key, _subkey, ewma)
+
+	def disable_stats(self, _key, _subkey):
+		self._data.disable_subkey_stats(_key, _subkey)
+
+	# Running statistics summary (dict) on data subkey
+	def get_stats(self, _key, _subkey):
+
+		_stats = self._data.get_subkey_stats(_key, _subkey)
+		return _stats.summary() if _stats is not None else None
+
+	#####################################
+	#  RUNNER
+	#
+
+	# Run procedure. Returns the return value of the procedure.
+	def run(self, _procedure, *args, **kwargs):
+
+		if self._running:
+			raise RuntimeError("Acquisition is already running")
+
+		self._abort.clear()
+		self._running = True
+
+		try:
+			return _procedure(self, *args, **kwargs)
+
+		finally:
+			self._running = False
+
+	# Request abort of running procedure (thread safe)
+	def abort(self):
+		self._abort.set()
+
+	def is_aborted(self):
+		return self._abort.is_set()
+
+	def is_running(self):
+		return self._running
+
+	# Sleep which returns early on abort. Returns True if aborted.
+	def wait(self, _seconds):
+		return self._abort.wait(_seconds)
+
+	# Run independent jobs on worker processes. _worker is a module level 
+	# function which takes one job and returns a QVisaDataObject. Results are 
+	# merged into the data object in job order. Hash keys are generated from 
+	# time in each worker and can collide between jobs, so merged keys are 
+	# suffixed with the job index ("<key>_<index>"), which is also stored in 
+	# the "__job__" metadata field.
+	def run_batch(self, _worker, _jobs, max_workers=None):
+
+		_jobs = list(_jobs)
+
+		if max_workers == 1 or len(_jobs) <= 1:
+			_results = [ _worker(_job) for _job in _jobs ]
+
+		else:
+			with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as _pool:
+				_results = list( _pool.map(_worker, _jobs) )
+
+		for _index, _result in enumerate(_results):
+
+			_rename = { _key : "%s_%d"%(_key, _index) for _key in _result.keys() }
+
+			for _key in self._data.merge(_result, rename=_rename):
+				self._data.set_metadata(_key, "__job__", _index)
+
+		return self._data
@@ -0,0 +1,111 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaBusScheduler
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import collections
+
+import pyvisa
+
+# Scheduler for split phase queries on several devices (see QVisaDevice.query_start). 
+# All queries are started first, then the devices are serial polled and each 
+# response is read as soon as it is available. Devices on the same bus work 
+# on their queries at the same time, so the integration times overlap instead
+# of adding up.
+#
+#	_scheduler = QVisaBusScheduler()
+#	_buffers = _scheduler.meas( _config.get_devices_by_bus("GPIB0") )
+#
+# Responses are returned as ordered dictionaries keyed on resource string.
+#
+
+class QVisaBusScheduler:
+
+	def __init__(self, poll_interval=1.0e-3):
+
+		# Wait between serial poll rounds (seconds)
+		self._poll_interval = poll_interval
+
+	# Run split phase queries. _queries is a list of (device, query) pairs 
+	# with at most one query per device. Raises a VISA timeout error if the 
+	# responses are not available after timeout seconds (default is the 
+	# longest session timeout of the devices). Pending queries are cancelled
+	# on error.
+	def query(self, _queries, timeout=None):
+
+		_queries = list(_queries)
+		return self._run( [ (_device, lambda _d=_device, _q=_query : _d.query_start(_q), _device.query_fetch) for _device, _query in _queries ], 
+			timeout if timeout is not None else max( [ _d.get_timeout() / 1000.0 for _d, _ in _queries ] + [0.0] ) )
+
+	# Split phase measurement on devices (meas_start and meas_fetch). Default
+	# timeout is the longest measurement timeout of the devices.
+	def meas(self, _devices, timeout=None):
+
+		_devices = list(_devices)
+		return self._run( [ (_device, _device.meas_start, _device.meas_fetch) for _device in _devices ], 
+			timeout if timeout is not None else max( [ _d.get_meas_timeout() / 1000.0 for _d in _devices ] + [0.0] ) )
+
+	# Start all, then poll and fetch
+	def _run(self, _tasks, _timeout):
+
+		_responses = collections.OrderedDict()
+		_pending = []
+
+		try:
+			for _device, _start, _fetch in _tasks:
+				_start()
+				_pending.append( (_device, _fetch) )
+
+			_deadline = time.perf_counter() + _timeout
+
+			while _pending != []:
+
+				_ready = [ _task for _task in _pending if _task[0].query_ready() ]
+
+				for _device, _fetch in _ready:
+					_responses[ _device.get_property("resource") ] = _fetch()
+					_pending.remove( (_device, _fetch) )
+
+				if _pending == []:
+					break
+
+				if time.perf_counter() > _deadline:
+					raise pyvisa.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+
+				if _ready == []:
+					time.sleep(self._poll_interval)
+
+		except Exception:
+
+			for _device, _ in _pending:
+				_device.query_cancel()
+
+			raise
+
+		# Order of devices
+		return collections.OrderedDict( (_device.get_property("resource"), _responses[_device.get_property("resource")]) for _device, _, _ in _tasks )
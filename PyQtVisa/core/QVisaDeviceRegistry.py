@@ -0,0 +1,278 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaDeviceRegistry
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import threading
+import collections
+
+# Headless registry of initialized QVisaDevice objects. This is the device 
+# management part of QVisaConfigure without any Qt dependency, so it can be 
+# used from scripts and worker processes. QVisaConfigure wraps a registry
+# and exposes the same methods.
+#
+#	_registry = QVisaDeviceRegistry()
+#	_registry.add_device( keithley2400("GPIB0::24::INSTR") )
+#	_registry.get_device_by_name("Keithley GPIB0::24")
+#
+# Devices are indexed by resource string, name, type and bus when they are added,
+# so lookups are constant time and do not query device properties. The bus is
+# the interface part of the resource string (e.g. GPIB0 for GPIB0::24::INSTR).
+#
+# Listeners are called as _func(event, device) with event "added" or "removed"
+# whenever the registry changes, and with event "closing" before close_devices
+# shuts the devices down.
+#
+
+class QVisaDeviceRegistry:
+
+	def __init__(self):
+
+		# List of devices (in order of addition)
+		self.Devices = []
+
+		# Indexes
+		self._by_resource = collections.OrderedDict()
+		self._by_name = {}
+		self._by_type = collections.defaultdict(list)
+		self._by_bus = collections.defaultdict(list)
+		self._names = None
+
+		# Change listeners
+		self._listeners = []
+
+	# Number of devices
+	def __len__(self):
+		return len(self.Devices)
+
+	# Check if resource is registered
+	def __contains__(self, _resource):
+		return _resource in self._by_resource
+
+	# Get bus from resource string
+	@staticmethod
+	def get_bus(_resource):
+		return str(_resource).split("::")[0]
+
+	#####################################
+	#  ADD/REMOVE DEVICES
+	#
+
+	# Add QVisaDevice objects. A device registered on the same resource is replaced.
+	def add_device(self, _device):
+
+		_resource = _device.get_property("resource")
+
+		if _resource in self._by_resource:
+			self.remove_device(_resource)
+
+		self.Devices.append(_device)
+		self._by_resource[_resource] = _device
+		self._by_name[_device.get_property("name")] = _device
+		self._by_type[_device.get_property("type")].append(_device)
+		self._by_bus[self.get_bus(_resource)].append(_device)
+		self._names = None
+
+		self._notify("added", _device)
+
+	# Remove device by resource string or device object. Returns the removed
+	# device (or None). The device session is closed if close is set.
+	def remove_device(self, _device, close=False):
+
+		_resource = _device if isinstance(_device, str) else _device.get_property("resource")
+		_device = self._by_resource.pop(_resource, None)
+
+		if _device is None:
+			return None
+
+		self.Devices.remove(_device)
+		self._by_name.pop(_device.get_property("name"), None)
+		self._by_type[_device.get_property("type")].remove(_device)
+		self._by_bus[self.get_bus(_resource)].remove(_device)
+		self._names = None
+
+		# Notify before closing so that listeners can read device properties
+		self._notify("removed", _device)
+
+		if close:
+			_device.close()
+
+		return _device
+
+	#####################################
+	#  LOOKUPS
+	#
+
+	# Get all insturment handles
+	def get_devices(self):
+
+		if self.Devices != []:
+			return self.Devices
+		else:
+			return None
+
+	# Get all device names
+	def get_device_names(self):
+
+		if self.Devices == []:
+			return None
+
+		if self._names is None:
+			self._names = [ _.get_property("name") for _ in self.Devices ]
+
+		return list(self._names)
+
+	# Get device by resrouce string
+	def get_device(self, _resource):
+		return self._by_resource.get(_resource)
+
+	# Get device by name
+	def get_device_by_name(self, _name):
+		return self._by_name.get(_name)
+
+	# Get list of devices by type (e.g. "Keithley")
+	def get_devices_by_type(self, _type):
+		return list( self._by_type.get(_type, []) )
+
+	# Get list of devices by bus (e.g. "GPIB0")
+	def get_devices_by_bus(self, _bus):
+		return list( self._by_bus.get(_bus, []) )
+
+	#####################################
+	#  LISTENERS
+	#
+
+	def add_listener(self, _func):
+		self._listeners.append(_func)
+
+	def remove_listener(self, _func):
+
+		if _func in self._listeners:
+			self._listeners.remove(_func)
+
+	def _notify(self, _event, _device):
+
+		for _func in list(self._listeners):
+			_func(_event, _device)
+
+	#####################################
+	#  SHUTDOWN
+	#
+
+	# Close all devices and remove them from registry. Listeners are first 
+	# notified with event "closing" (supervisors stop their thread on this 
+	# event). Each device is then shut down in its own thread: streaming is 
+	# stopped, the VISA timeout is bounded to timeout, the device is put in a
+	# safe state (output_off for devices which implement it) and closed. 
+	# Steps are bounded by timeout (seconds per step). Returns a dictionary 
+	# of errors by resource:
+	#
+	#	[<resource>] = [(step, exception), ...]
+	#
+	# Devices which do not respond within timeout get a TimeoutError entry for
+	# the pending step. Their remaining steps finish in the background in 
+	# order, so a device is never closed while output_off is still running.
+	def close_devices(self, timeout=5.0, safe_state=True):
+
+		_devices = list(self.Devices)
+		_errors = collections.OrderedDict()
+
+		for _device in _devices:
+			self._notify("closing", _device)
+
+		# Resources are read before closing (close clears device properties)
+		_steps = [ ( _.get_property("resource"), self._shutdown_steps(_, timeout, safe_state) ) for _ in _devices ]
+
+		for _resource, _ in _steps:
+			self.remove_device(_resource)
+
+		self._run_parallel(_steps, timeout, _errors)
+		return _errors
+
+	# Shutdown steps of device as (step, function) pairs
+	def _shutdown_steps(self, _device, _timeout, _safe_state):
+
+		_steps = []
+
+		if getattr(_device, "is_streaming", None) is not None:
+			_steps.append( ("stream_stop", lambda: _device.stream_stop(_timeout) if _device.is_streaming() else None) )
+
+		_steps.append( ("timeout", lambda: self._bound_timeout(_device, _timeout)) )
+
+		if _safe_state and hasattr(_device, "output_off"):
+			_steps.append( ("output_off", _device.output_off) )
+
+		_steps.append( ("close", _device.close) )
+		return _steps
+
+	# Bound VISA timeout so that no single operation outlives the step
+	@staticmethod
+	def _bound_timeout(_device, _timeout):
+
+		_inst = _device.get_property("inst")
+
+		if _inst is not None and getattr(_inst, "timeout", None) is not None:
+			_inst.timeout = min(_inst.timeout, int(1000 * _timeout))
+
+	# Run steps of each resource in order in one daemon thread per resource 
+	# and collect errors. A failing step does not stop the following steps.
+	def _run_parallel(self, _steps, _timeout, _errors):
+
+		_lock = threading.Lock()
+		_pending = {}
+
+		def _call(_resource, _functions):
+
+			for _step, _func in _functions:
+
+				with _lock:
+					_pending[_resource] = _step
+
+				try:
+					_func()
+
+				except Exception as e:
+					with _lock:
+						_errors.setdefault(_resource, []).append( (_step, e) )
+
+		_threads = []
+		for _resource, _functions in _steps:
+
+			_thread = threading.Thread(target=_call, args=(_resource, _functions), daemon=True)
+			_thread.start()
+			_threads.append( (_resource, _thread, len(_functions)) )
+
+		_start = time.monotonic()
+		for _resource, _thread, _count in _threads:
+
+			_thread.join( max(0.0, _start + _count * _timeout - time.monotonic()) )
+
+			if _thread.is_alive():
+				with _lock:
+					_step = _pending[_resource]
+					_errors.setdefault(_resource, []).append( (_step, TimeoutError("%s timed out after %ss"%(_step, _timeout))) )
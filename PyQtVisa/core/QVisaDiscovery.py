@@ -0,0 +1,155 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaDiscovery
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
+
+import pyvisa
+
+# Import shared resource manager and driver registry
+from ..drivers.QVisaResourceManager import get_resource_manager
+from ..drivers.QVisaDriverRegistry import match_driver, get_driver
+from ..drivers.QVisaDevice import QVisaDevice
+
+# Parallel resource discovery. All resources of the resource manager (GPIB, 
+# ASRL, TCPIP, USB ...) are probed with *IDN? concurrently and with a short 
+# timeout, and each response is matched against the driver registry (see 
+# QVisaDriverRegistry). Results take the following format:
+#
+#	[<resource>]
+#		["idn"]		= (str) 	*IDN? response (None if the probe failed)
+#		["driver"]	= (str) 	name of matching driver (None if no match)
+#		["error"]	= (str) 	probe error (None on success)
+#
+# A station is populated in one parallel sweep with populate, which also 
+# initializes the matching drivers and adds them to a device registry:
+#
+#	_devices = QVisaDiscovery().populate( _config.get_registry() )
+#
+
+class QVisaDiscovery:
+
+	def __init__(self, timeout=500, max_workers=16, query=None):
+
+		# Probe timeout (milliseconds), worker threads and resource query. The 
+		# default query is that of the drivers (see QVisaDevice.parse_resource),
+		# so each discovered resource can be opened by its driver.
+		self._timeout = timeout
+		self._max_workers = max_workers
+		self._query = query if query is not None else QVisaDevice._resource_query
+
+	# List resources of the shared resource manager
+	def list_resources(self):
+		return list( get_resource_manager().list_resources(self._query) )
+
+	# Probe one resource with *IDN?. Returns (idn, error).
+	def probe(self, _resource):
+
+		try:
+			_inst = get_resource_manager().open_resource(_resource)
+
+		except (pyvisa.VisaIOError, ValueError) as e:
+			return None, str(e)
+
+		try:
+			_inst.timeout = self._timeout
+			return str( _inst.query("*IDN?") ).strip(), None
+
+		except Exception as e:
+			return None, str(e)
+
+		finally:
+			_inst.close()
+
+	# Probe resources concurrently (default all resources). Resources in 
+	# exclude are not probed, e.g. sessions which are already open.
+	def discover(self, resources=None, exclude=()):
+
+		_resources = [ _ for _ in ( resources if resources is not None else self.list_resources() ) if _ not in exclude ]
+		_results = collections.OrderedDict( (_resource, None) for _resource in _resources )
+
+		if _resources == []:
+			return _results
+
+		with concurrent.futures.ThreadPoolExecutor( max_workers=min(self._max_workers, len(_resources)) ) as _pool:
+
+			for _resource, ( _idn, _error ) in zip( _resources, _pool.map(self.probe, _resources) ):
+
+				_name = match_driver(_idn)[0] if _idn is not None else None
+				_results[_resource] = {"idn" : _idn, "driver" : _name, "error" : _error}
+
+		return _results
+
+	# Discover resources and initialize matching drivers concurrently. Devices
+	# are added to the registry (resources already in the registry are skipped).
+	# If reset is True, *RST is sent to each new device. Devices which fail to
+	# initialize or have no session (resource not listed by the driver query)
+	# are skipped. Returns list of devices.
+	def populate(self, _registry, resources=None, reset=False):
+
+		_exclude = [ _.get_property("resource") for _ in _registry.Devices ]
+		_matched = [ (_resource, _result["driver"]) for _resource, _result in self.discover(resources, _exclude).items() if _result["driver"] is not None ]
+
+		def _init(_item):
+
+			_device = None
+
+			try:
+				_device = get_driver(_item[1]).create(_item[0])
+
+				if _device.get_property("inst") is None:
+					return None
+
+				if reset:
+					_device.rst()
+
+				return _device
+
+			except Exception:
+
+				if _device is not None and _device.get_property("inst") is not None:
+
+					try:
+						_device.close()
+
+					except Exception:
+						pass
+
+				return None
+
+		if _matched == []:
+			return []
+
+		with concurrent.futures.ThreadPoolExecutor( max_workers=min(self._max_workers, len(_matched)) ) as _pool:
+			_devices = [ _ for _ in _pool.map(_init, _matched) if _ is not None ]
+
+		for _device in _devices:
+			_registry.add_device(_device)
+
+		return _devices
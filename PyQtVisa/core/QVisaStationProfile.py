@@ -0,0 +1,213 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaStationProfile
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import json
+import collections
+import concurrent.futures
+
+import pyvisa
+
+# Import driver registry
+from ..drivers.QVisaDriverRegistry import load_driver, get_driver_path, match_driver
+
+# Persistent station profile for warm startup. The profile stores for each 
+# device of a registry the resource string, the driver class, the *IDN? 
+# response (fingerprint) and the configuration commands written to the device
+# (QVisaDevice.get_station_config). Actions and output state are not stored.
+# The file takes the following format:
+#
+#	{
+#		"version" : (int),
+#		"devices" : [ {"resource" : (str), "driver" : "module:Class", "idn" : (str), "config" : [(str)]} ]
+#	}
+#
+# On warm start all sessions are reopened in parallel and verified with one 
+# *IDN? query. When the fingerprint matches, the configuration is replayed 
+# (one batched write) instead of a full *RST and outputs are switched off. 
+# Devices which do not match are initialized from scratch (driver detection 
+# and *RST).
+#
+#	_profile = QVisaStationProfile("station.json")
+#	_profile.save(_registry)
+#	...
+#	_status = _profile.warm_start(_registry)
+#
+# The status of each resource is one of "warm", "cold" or "failed".
+#
+
+class QVisaStationProfile:
+
+	# Profile format version
+	_version = 1
+
+	def __init__(self, _filename, timeout=500, max_workers=16):
+
+		self._filename = _filename
+
+		# Fingerprint timeout (milliseconds) and worker threads
+		self._timeout = timeout
+		self._max_workers = max_workers
+
+	# Get profile filename
+	def get_filename(self):
+		return self._filename
+
+	# Check if profile exists
+	def exists(self):
+		return os.path.isfile(self._filename)
+
+	# Save profile of devices in registry. Devices which do not answer *IDN?
+	# are not saved. Returns number of saved devices. The profile is written
+	# to a temporary file first so an interrupted save does not corrupt it.
+	def save(self, _registry):
+
+		_devices = []
+
+		for _device in list(_registry.Devices):
+
+			try:
+				with _device.use_timeout(self._timeout):
+					_idn = str( _device.query("*IDN?") ).strip()
+
+			except (pyvisa.VisaIOError, RuntimeError):
+				continue
+
+			_devices.append( collections.OrderedDict([
+				("resource", 	_device.get_property("resource")),
+				("driver", 		get_driver_path( type(_device) )),
+				("idn", 		_idn),
+				("config", 		_device.get_station_config()),
+			]) )
+
+		_tmp = "%s.tmp"%self._filename
+		with open(_tmp, 'w') as f:
+			json.dump({"version" : self._version, "devices" : _devices}, f, indent=1)
+
+		os.replace(_tmp, self._filename)
+		return len(_devices)
+
+	# Load profile. Returns list of device entries (empty if the profile does 
+	# not exist or was written in another format).
+	def load(self):
+
+		if not self.exists():
+			return []
+
+		try:
+			with open(self._filename, 'r') as f:
+				_profile = json.load(f)
+
+		except ValueError:
+			return []
+
+		if _profile.get("version") != self._version:
+			return []
+
+		return _profile["devices"]
+
+	# Reopen devices of profile in parallel and add them to the registry. 
+	# Resources already in the registry are skipped. Returns ordered 
+	# dictionary of status by resource.
+	def warm_start(self, _registry):
+
+		_open = [ _.get_property("resource") for _ in _registry.Devices ]
+		_entries = [ _ for _ in self.load() if _["resource"] not in _open ]
+		_status = collections.OrderedDict()
+
+		if _entries == []:
+			return _status
+
+		with concurrent.futures.ThreadPoolExecutor( max_workers=min(self._max_workers, len(_entries)) ) as _pool:
+			_results = list( _pool.map(self._start_device, _entries) )
+
+		for _entry, ( _device, _result ) in zip(_entries, _results):
+
+			_status[ _entry["resource"] ] = _result
+
+			if _device is not None:
+				_registry.add_device(_device)
+
+		return _status
+
+	# Open one device. Returns (device, status). Any error fails the device 
+	# (and closes its session), not the warm start.
+	def _start_device(self, _entry):
+
+		_resource = _entry["resource"]
+		_device = None
+
+		try:
+			_driver = load_driver(_entry["driver"])
+			_device = _driver.create(_resource)
+
+			# Resource not available
+			if _device.get_property("inst") is None:
+				return None, "failed"
+
+			with _device.use_timeout(self._timeout):
+				_idn = str( _device.query("*IDN?") ).strip()
+
+			# Fingerprint matches. Replay configuration with output off.
+			if _idn == _entry["idn"]:
+
+				with _device.batch():
+					_device.replay_config(_entry["config"])
+
+					if hasattr(_device, "output_off"):
+						_device.output_off()
+
+				return _device, "warm"
+
+			# Another device on resource. Full initialization.
+			if not _driver.match_idn(_idn):
+
+				_device.close()
+				_device = None
+				_driver = match_driver(_idn)[1]
+
+				if _driver is None:
+					return None, "failed"
+
+				_device = _driver.create(_resource)
+
+			_device.rst()
+			return _device, "cold"
+
+		except Exception:
+
+			if _device is not None and _device.get_property("inst") is not None:
+
+				try:
+					_device.close()
+
+				except Exception:
+					pass
+
+			return None, "failed"
@@ -0,0 +1,228 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaSupervisor
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import threading
+import collections
+
+import pyvisa
+
+# Connection supervisor for the devices in a QVisaDeviceRegistry. A background
+# thread pings devices which have been idle for a while (a cheap *STB? with a
+# short timeout). When a device does not answer, the supervisor reopens the 
+# session through the resource manager and replays the cached configuration
+# (QVisaDevice.reconnect), retrying with a growing delay.
+#
+#	_supervisor = QVisaSupervisor(_registry, interval=5.0)
+#	_supervisor.start()
+#
+# Acquisition code can resume after a bus fault by wrapping device calls:
+#
+#	_buffer = _supervisor.guard(_smu, _smu.meas)
+#
+# Listeners are called as _func(event, device) with event "fault", "reconnected",
+# "failed" or "error". Status per resource is one of "ok", "fault", "failed" or
+# "error". Errors other than bus faults (e.g. in a driver) are reported with 
+# event "error" and kept in get_error(); the supervisor keeps checking the 
+# other devices.
+#
+# The background thread is stopped when the registry closes its devices 
+# (QVisaDeviceRegistry.close_devices), so sessions are not reopened while or
+# after they are closed.
+#
+
+class QVisaSupervisor:
+
+	def __init__(self, _registry, interval=5.0, idle=1.0, ping_timeout=500, max_attempts=5, backoff=1.0):
+
+		self._registry = _registry
+
+		# Check interval and idle time before a device is pinged (seconds)
+		self._interval = interval
+		self._idle = idle
+
+		# Ping timeout (milliseconds) and reconnect attempts
+		self._ping_timeout = ping_timeout
+		self._max_attempts = max_attempts
+		self._backoff = backoff
+
+		self._status = collections.OrderedDict()
+		self._errors = {}
+		self._listeners = []
+
+		self._thread = None
+		self._stop = threading.Event()
+
+	#####################################
+	#  BACKGROUND THREAD
+	#
+
+	def start(self):
+
+		if self.is_running():
+			return
+
+		self._stop.clear()
+		self._registry.add_listener(self._on_registry)
+		self._thread = threading.Thread(target=self._run, daemon=True)
+		self._thread.start()
+
+	def stop(self, timeout=None):
+
+		self._stop.set()
+		self._registry.remove_listener(self._on_registry)
+
+		if self._thread is not None:
+			self._thread.join(timeout)
+			self._thread = None
+
+	# Stop before the registry closes devices. The join is bounded by the 
+	# ping timeout (a pending check finishes in the background).
+	def _on_registry(self, _event, _device):
+
+		if _event == "closing":
+			self.stop( 2.0 * self._ping_timeout / 1000. )
+
+	def is_running(self):
+		return self._thread is not None and self._thread.is_alive()
+
+	def _run(self):
+
+		while not self._stop.wait(self._interval):
+			self.check()
+
+	#####################################
+	#  HEALTH CHECKS
+	#
+
+	# Check all registered devices once. Returns status dictionary. Errors 
+	# of one device are reported and do not stop the checks.
+	def check(self):
+
+		for _device in list( self._registry.get_devices() or [] ):
+
+			try:
+				self.check_device(_device)
+
+			except Exception as e:
+
+				_resource = _device.get_property("resource")
+				self._status[_resource] = "error"
+				self._errors[_resource] = e
+
+				try:
+					self._notify("error", _device)
+
+				except Exception:
+					pass
+
+		return self.get_status()
+
+	# Check one device. Devices which are in use (lock held) or which have 
+	# recently communicated are considered healthy.
+	def check_device(self, _device):
+
+		_resource = _device.get_property("resource")
+
+		if _device.get_idle_time() < self._idle:
+			self._status[_resource] = "ok"
+			return True
+
+		_lock = _device.get_lock()
+		if not _lock.acquire(blocking=False):
+			return True
+
+		try:
+			if _device.ping(self._ping_timeout):
+				self._status[_resource] = "ok"
+				return True
+
+		finally:
+			_lock.release()
+
+		return self.recover(_device)
+
+	# Reconnect device. Returns True on success.
+	def recover(self, _device):
+
+		_resource = _device.get_property("resource")
+		self._status[_resource] = "fault"
+		self._notify("fault", _device)
+
+		for _attempt in range(self._max_attempts):
+
+			if _device.reconnect() and _device.ping(self._ping_timeout):
+				self._status[_resource] = "ok"
+				self._notify("reconnected", _device)
+				return True
+
+			if self._stop.wait( self._backoff * ( 2 ** _attempt ) ):
+				break
+
+		self._status[_resource] = "failed"
+		self._notify("failed", _device)
+		return False
+
+	# Call device method and resume after a bus fault. On VISA error the device
+	# is recovered and the call is repeated once.
+	def guard(self, _device, _func, *args, **kwargs):
+
+		try:
+			return _func(*args, **kwargs)
+
+		except pyvisa.VisaIOError:
+
+			if not self.recover(_device):
+				raise
+
+			return _func(*args, **kwargs)
+
+	#####################################
+	#  STATUS AND LISTENERS
+	#
+
+	def get_status(self, _resource=None):
+		return dict(self._status) if _resource is None else self._status.get(_resource)
+
+	# Last error on resource (None if no error occurred)
+	def get_error(self, _resource):
+		return self._errors.get(_resource)
+
+	def add_listener(self, _func):
+		self._listeners.append(_func)
+
+	def remove_listener(self, _func):
+
+		if _func in self._listeners:
+			self._listeners.remove(_func)
+
+	def _notify(self, _event, _device):
+
+		for _func in list(self._listeners):
+			_func(_event, _device)
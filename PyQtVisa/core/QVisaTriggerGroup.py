@@ -0,0 +1,138 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaTriggerGroup
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import collections
+
+import pyvisa
+
+# Synchronized acquisition on a group of devices. All devices are armed to wait 
+# for a bus trigger, one trigger is fired for the whole group and the readings 
+# are collected afterwards, so the devices measure at the same time and the 
+# total time is that of a single device.
+#
+#	_group = QVisaTriggerGroup( _config.get_devices_by_type("keithley2400") )
+#	_readings = _group.measure(count=10)
+#
+# The trigger is a GPIB group execute trigger. If a GPIB interface session is 
+# given (e.g. rm.open_resource("GPIB0::INTFC")), one GET is addressed to all 
+# devices at once. Otherwise a GET (or *TRG) is sent to each device in turn, 
+# which skews the devices by one bus transaction.
+#
+# Devices implement the trigger protocol:
+#
+#	trigger_arm(count) 		: wait for bus trigger, then take count readings
+#	trigger_complete()		: readings are complete (serial poll)
+#	trigger_fetch()			: return readings
+#	trigger_disarm()		: restore trigger model
+#
+
+class QVisaTriggerGroup:
+
+	def __init__(self, _devices, interface=None, poll_interval=1.0e-3):
+
+		self._devices = list(_devices)
+		self._interface = interface
+		self._poll_interval = poll_interval
+
+		for _device in self._devices:
+			if not hasattr(_device, "trigger_arm"):
+				raise TypeError("%s does not support triggered acquisition"%_device.get_property("resource"))
+
+	# Get devices in group
+	def get_devices(self):
+		return list(self._devices)
+
+	# Arm all devices
+	def arm(self, count=1):
+
+		for _device in self._devices:
+			_device.trigger_arm(count)
+
+	# Fire group trigger. Returns the time of the trigger (perf_counter)
+	def fire(self):
+
+		_t = time.perf_counter()
+
+		if self._interface is not None:
+			self._interface.group_execute_trigger( *[ _device.get_property("inst") for _device in self._devices ] )
+
+		else:
+			for _device in self._devices:
+				_device.assert_trigger()
+
+		return _t
+
+	# Wait until all devices have completed their readings. Raises a VISA 
+	# timeout error if the devices are not complete after timeout seconds.
+	def wait(self, timeout=None):
+
+		_pending = list(self._devices)
+		_deadline = None if timeout is None else time.perf_counter() + timeout
+
+		while True:
+
+			_pending = [ _device for _device in _pending if not _device.trigger_complete() ]
+
+			if _pending == []:
+				return
+
+			if _deadline is not None and time.perf_counter() > _deadline:
+				raise pyvisa.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+
+			time.sleep(self._poll_interval)
+
+	# Collect readings. Returns ordered dictionary of readings by resource.
+	def fetch(self):
+		return collections.OrderedDict( (_device.get_property("resource"), _device.trigger_fetch()) for _device in self._devices )
+
+	# Restore trigger model on all devices
+	def disarm(self):
+
+		for _device in self._devices:
+			_device.trigger_disarm()
+
+	# Arm, trigger, wait, fetch and disarm. The trigger model of the devices 
+	# is restored also on error, so no device is left waiting for a bus 
+	# trigger. The default timeout is the longest expected measurement time of
+	# the devices plus one second.
+	def measure(self, count=1, timeout=None):
+
+		if timeout is None:
+			timeout = 1.0 + max( [ count * _device.get_meas_time() / _device.get_value("trigger_count") 
+				for _device in self._devices if hasattr(_device, "get_meas_time") ] + [0.0] )
+
+		try:
+			self.arm(count)
+			self.fire()
+			self.wait(timeout)
+			return self.fetch()
+
+		finally:
+			self.disarm()
@@ -0,0 +1,48 @@
+# ---------------------------------------------------------------------------------
+# 	PyQtVisa.core
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import importlib
+
+# Modules are loaded on first attribute access (PEP 562), e.g. 
+# PyQtVisa.core.QVisaAcquisition after import PyQtVisa.
+_modules = (
+	"QVisaAcquisition", "QVisaBusScheduler", "QVisaDeviceRegistry",
+	"QVisaDiscovery", "QVisaStationProfile", "QVisaSupervisor",
+	"QVisaTriggerGroup",
+)
+
+def __getattr__(_name):
+
+	if _name in _modules:
+		return importlib.import_module("%s.%s"%(__name__, _name))
+
+	raise AttributeError("module %s has no attribute %s"%(__name__, _name))
+
+def __dir__():
+	return sorted( list( globals().keys() ) + list(_modules) )
@@ -0,0 +1,201 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaCommand
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Declarative SCPI command. Drivers list their commands in a _commands table
+# and the corresponding methods are generated once per class when the driver
+# class is defined (see gen_class_methods):
+#
+#	class mydevice(QVisaDevice):
+#
+#		_commands = {
+#			"nplc"		: QVisaCommand(":SENS:CURR:NPLC {}", ":SENS:CURR:NPLC?", float, range=(0.01, 10)),
+#			"output"	: QVisaCommand(":OUTP:STAT {}", ":OUTP:STAT?", bool),
+#			"terminals"	: QVisaCommand(":ROUT:TERM {}", ":ROUT:TERM?", str, values=("FRON", "REAR")),
+#			"init"		: QVisaCommand(":INIT"),
+#		}
+#
+# generates set_nplc(value), get_nplc(), set_output(value), get_output(),
+# set_terminals(value), get_terminals() and init(). Values are checked against
+# range or values before anything is written. Values may also be a dictionary 
+# which maps python values to SCPI strings. Cacheable values are kept in the 
+# device state so that repeated setters do not write and getters do not query
+# (see QVisaDevice.set_value and QVisaDevice.get_value). Writes which bypass
+# the setters drop the cached values of commands with the same header.
+#
+# Drivers can also declare class level aliases:
+#
+#	_aliases = {"rst" : "RST"}
+#
+
+class QVisaCommand:
+
+	def __init__(self, _write=None, _query=None, _type=str, range=None, values=None, cache=True):
+
+		# Write template ("{}" is replaced by the value) and query string
+		self.write = _write
+		self.query = _query
+
+		# Value type and constraints
+		self.type = _type
+		self.range = range
+		self.values = values
+
+		# Keep value in device state
+		self.cache = cache
+
+	# Check if command takes a value
+	def has_value(self):
+		return self.write is not None and "{}" in self.write
+
+	# Check value and convert to SCPI string
+	def encode(self, _value):
+
+		if isinstance(self.values, dict):
+
+			if _value not in self.values:
+				raise ValueError("%s is not one of %s"%(str(_value), list(self.values.keys())))
+
+			return str(self.values[_value])
+
+		if self.type is bool:
+			return "ON" if _value else "OFF"
+
+		_value = self.type(_value)
+
+		if self.values is not None and _value not in self.values:
+			raise ValueError("%s is not one of %s"%(str(_value), list(self.values)))
+
+		if self.range is not None and not ( self.range[0] <= _value <= self.range[1] ):
+			raise ValueError("%s is out of range %s"%(str(_value), str(self.range)))
+
+		return str(_value)
+
+	# Convert SCPI string to value
+	def decode(self, _string):
+
+		_string = str(_string).strip().strip('"\'')
+
+		if isinstance(self.values, dict):
+
+			for _value, _scpi in self.values.items():
+				if str(_scpi).upper() == _string.upper():
+					return _value
+
+			return _string
+
+		if self.type is bool:
+			return _string.upper() in ("1", "ON")
+
+		if self.type is int:
+			return int(float(_string))
+
+		return self.type(_string)
+
+	# Generate write message for value
+	def gen_write(self, _value=None):
+		return self.write.format( self.encode(_value) ) if self.has_value() else self.write
+
+	# Header of write message (upper case, without leading ':')
+	def get_header(self):
+		return self.write.split(None, 1)[0].lstrip(":").upper() if self.write is not None else None
+
+
+# Method generators. The generated methods only hold the command name and 
+# look the command up in the class table, so they are shared by subclasses.
+def _gen_setter(_name):
+
+	def _setter(self, _value):
+		self.set_value(_name, _value)
+
+	_setter.__name__ = "set_%s"%_name
+	return _setter
+
+def _gen_getter(_name):
+
+	def _getter(self, cached=True):
+		return self.get_value(_name, cached)
+
+	_getter.__name__ = "get_%s"%_name
+	return _getter
+
+def _gen_action(_name):
+
+	def _action(self):
+		self.run_command(_name)
+
+	_action.__name__ = _name
+	return _action
+
+def _gen_alias(_alias, _target):
+
+	# Dispatch at call time so that overrides of the target are used
+	def _method(self, *args, **kwargs):
+		return getattr(self, _target)(*args, **kwargs)
+
+	_method.__name__ = _alias
+	return _method
+
+# Generate command methods and aliases on class. Methods which are defined 
+# explicitly on the class are not replaced.
+def gen_class_methods(_cls):
+
+	# Merge command table with tables of base classes
+	_table = {}
+	for _base in reversed(_cls.__mro__):
+		_table.update( _base.__dict__.get("_commands", {}) )
+
+	_cls._command_table = _table
+
+	# Map write headers to commands (see QVisaDevice.write)
+	_cls._command_headers = {}
+	for _name, _command in _table.items():
+		if _command.write is not None:
+			_cls._command_headers.setdefault(_command.get_header(), []).append(_name)
+
+	for _name, _command in _cls.__dict__.get("_commands", {}).items():
+
+		_methods = {}
+
+		if _command.has_value():
+			_methods["set_%s"%_name] = _gen_setter(_name)
+
+		elif _command.write is not None:
+			_methods[_name] = _gen_action(_name)
+
+		if _command.query is not None:
+			_methods["get_%s"%_name] = _gen_getter(_name)
+
+		for _method, _func in _methods.items():
+			if _method not in _cls.__dict__:
+				setattr(_cls, _method, _func)
+
+	for _alias, _target in _cls.__dict__.get("_aliases", {}).items():
+		if _alias not in _cls.__dict__:
+			setattr(_cls, _alias, _gen_alias(_alias, _target))
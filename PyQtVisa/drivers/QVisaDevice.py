@@ -27,32 +27,145 @@
 #!/usr/bin/env python 
 # -*- coding: utf-8 -*-
 import pyvisa
+import time
 import re
+import threading
+import contextlib
+import collections
+
+# Import shared resource manager and I/O monitor
+from .QVisaResourceManager import get_resource_manager
+from .QVisaIOMonitor import QVisaIOMonitor
+from .QVisaTrace import QVisaTraceWriter
+
+# Import declarative command tables
+from .QVisaCommand import QVisaCommand, gen_class_methods
 
 # Basic driver file for insturment
 class QVisaDevice:
 
+	# Commands which are not cached or replayed after reconnect (actions, not
+	# configuration). Entries are either headers, which exclude the header with
+	# any argument, or complete commands (header and argument), which exclude
+	# only this argument (e.g. "SYST:AZER:STAT ONCE").
+	_volatile = ("*WAI", "*TRG", "*OPC", "*CLS", "INIT", "ABOR")
+
+	# Configuration commands which are replayed after reconnect but are not 
+	# saved to or replayed from station profiles (e.g. output state). Entries 
+	# as in _volatile.
+	_station_exclude = ()
+
+	# Substring of the *IDN? response which identifies devices of the driver 
+	# (see match_idn). None for drivers without auto-detection.
+	_idn_pattern = None
+
+	# Session timeouts (milliseconds). The default timeout is set when the 
+	# session is opened. Status queries use the fast timeout so that a dead
+	# device is detected quickly. Drivers derive longer timeouts for 
+	# measurements from their integration settings (see use_timeout).
+	_timeout_default = 2000
+	_timeout_fast = 500
+
+	# Resource query of the resource manager. Only listed resources are opened
+	# (see parse_resource). Discovery uses the same query.
+	_resource_query = "?*::INSTR"
+
+	# Command table (see QVisaCommand). Methods are generated per class.
+	_commands = {
+		"ese" 	: QVisaCommand("*ESE {}", "*ESE?", int, range=(0, 255)),
+		"sre" 	: QVisaCommand("*SRE {}", "*SRE?", int, range=(0, 255)),
+	}
+
+	# Lower case aliases for IEEE-488.2 methods
+	_aliases = {
+		"idn" 		: "IDN",
+		"rst" 		: "RST",
+		"tst" 		: "TST",
+		"wai" 		: "WAI",
+		"opc" 		: "OPC",
+		"opc_query" : "OPC_query",
+		"trg" 		: "TRG",
+		"ese" 		: "ESE",
+		"ese_query" : "ESE_query",
+		"esr_query" : "ESR_query",
+		"sre" 		: "SRE",
+		"sre_query" : "SRE_query",
+		"stb_query" : "STB_query",
+	}
+
+	# Generate command methods and aliases on driver classes
+	def __init_subclass__(cls, **kwargs):
+
+		super().__init_subclass__(**kwargs)
+		gen_class_methods(cls)
+
 	# Initialize
 	def __init__(self, _resource, _type="QVisaDevice"):
 
+		# I/O instrumentation and trace recording (disabled)
+		self._monitor = None
+		self._recorder = None
+
+		# Device lock (serializes I/O from acquisition and supervisor threads),
+		# time of last I/O and cache of configuration commands
+		self._lock = threading.RLock()
+		self._last_io = time.monotonic()
+		self._config_cache = collections.OrderedDict()
+
+		# Command state cache, pending batch and pending split phase query
+		self._state = {}
+		self._batch = None
+		self._pending = None
+
 		# Call parse resource
 		self.parse_resource(_resource, _type)
 
 		# Build alias table
 		self.alias_table()
 
+	# Create driver instance. If the constructor (e.g. of a driver subclass)
+	# raises after the session was opened, the session is closed before the 
+	# error is raised, so it does not leak with the unreachable object.
+	@classmethod
+	def create(cls, _resource, *args, **kwargs):
+
+		_device = cls.__new__(cls)
+
+		try:
+			_device.__init__(_resource, *args, **kwargs)
+			return _device
+
+		except Exception:
+
+			try:
+				_inst = _device.get_property("inst")
+
+				if _inst is not None:
+					_inst.close()
+
+			except Exception:
+				pass
+
+			raise
+
+	# Check if *IDN? response belongs to a device of this driver class
+	@classmethod
+	def match_idn(cls, _idn):
+		return cls._idn_pattern is not None and cls._idn_pattern in str(_idn)
+
 	def parse_resource(self, _resource, _type):
 
 		# Create data object
 		self.__resource = {}
 
 		# Extract insturment handle for Keithley
-		rm = pyvisa.ResourceManager()
+		rm = get_resource_manager()
 
 		# Check if resource is in driver table
-		if _resource in rm.list_resources():
+		if _resource in rm.list_resources(self._resource_query):
 		
 			self.__resource["inst"] = rm.open_resource(_resource)
+			self.__resource["inst"].timeout = self._timeout_default
 
 			# Standard serial port 
 			m = re.match(r'ASRL(\d+)::\w+$',  _resource, re.ASCII)
@@ -79,6 +192,32 @@ class QVisaDevice:
 				self.__resource["addr"] = m[2]
 				self.__resource["type"] = _type
 				self.__resource["name"] = "%s GPIB%s::%s"%(_type, str(m[1]), str(m[2]))
+
+			# LAN device (VXI-11, HiSLIP or raw socket)
+			m = re.match(r'TCPIP(\d*)::([^:]+)::.+$',  _resource, re.ASCII)
+			if m:
+
+				# Resource sting
+				self.__resource["resource"] = m[0]
+
+				# Resource data
+				self.__resource["comm"] = "TCPIP%s"%m[1]
+				self.__resource["addr"] = m[2]
+				self.__resource["type"] = _type
+				self.__resource["name"] = "%s TCPIP%s::%s"%(_type, str(m[1]), str(m[2]))
+
+			# USBTMC device (vendor, product and serial number)
+			m = re.match(r'USB(\d*)::(\w+)::(\w+)::(\w+)::.+$',  _resource, re.ASCII)
+			if m:
+
+				# Resource sting
+				self.__resource["resource"] = m[0]
+
+				# Resource data
+				self.__resource["comm"] = "USB%s"%m[1]
+				self.__resource["addr"] = m[4]
+				self.__resource["type"] = _type
+				self.__resource["name"] = "%s USB%s::%s"%(_type, str(m[1]), str(m[4]))
 	
 	
 	# Return resource dictionary
@@ -96,17 +235,58 @@ class QVisaDevice:
 
 	# Close instrument on program termination
 	def close(self): 
+		self.stop_recording()
 		self.__resource["inst"].close()
 		self.__resource = {}
 
-	# Write command
+	# Write command. Inside a batch the command is queued. Cached values of
+	# commands with the same header are dropped (set_value caches the value
+	# after the write).
 	def write(self, _data):
-		self.__resource["inst"].write(_data)
+
+		with self._lock:
+
+			for _header, _command in self._split_message(_data):
+				for _name in self._command_headers.get(_header, ()):
+					self._state.pop(_name, None)
+
+			if self._batch is not None:
+				self._batch.append(_data)
+				return
+
+			self._write(_data)
+			self._cache_config(_data)
+
+	def _write(self, _data):
+
+		if self._monitor is None and self._recorder is None:
+			self.__resource["inst"].write(_data)
+
+		else:
+			self._traced_io("write", _data)
+
+		self._last_io = time.monotonic()
 	
 	# Query command. Only use when reading data	
 	def query(self, _data, print_buffer=False):
 
-		_buffer = self.__resource["inst"].query(_data)
+		with self._lock:
+
+			# A pending response would be read instead
+			if self._pending is not None:
+				raise RuntimeError("Response to %s is pending"%self._pending)
+
+			# Queued commands must be applied first
+			if self._batch:
+				self._flush_batch()
+
+			if self._monitor is None and self._recorder is None:
+				_buffer = self.__resource["inst"].query(_data)
+
+			else:
+				_buffer = self._traced_io("query", _data)
+
+			self._last_io = time.monotonic()
 
 		# Option to print buffer
 		if print_buffer:
@@ -114,6 +294,493 @@ class QVisaDevice:
 
 		return _buffer
 
+	# Read response (see query_fetch)
+	def _read(self):
+
+		if self._monitor is None and self._recorder is None:
+			_buffer = self.__resource["inst"].read()
+
+		else:
+			_buffer = self._traced_io("read", "")
+
+		self._last_io = time.monotonic()
+		return _buffer
+
+	# Serial poll. Returns the status byte without waiting for pending 
+	# operations (unlike *STB?).
+	def read_stb(self):
+
+		with self._lock:
+
+			if self._monitor is None and self._recorder is None:
+				_stb = self.__resource["inst"].read_stb()
+
+			else:
+				_stb = int( self._traced_io("read_stb", "") )
+
+			self._last_io = time.monotonic()
+			return _stb
+
+	# Device trigger (GPIB GET addressed to this device)
+	def assert_trigger(self):
+
+		with self._lock:
+
+			if self._monitor is None and self._recorder is None:
+				self.__resource["inst"].assert_trigger()
+
+			else:
+				self._traced_io("assert_trigger", "")
+
+			self._last_io = time.monotonic()
+
+	# Bus operation (write, query, read, serial poll, trigger or clear) with 
+	# instrumentation and/or trace recording
+	def _traced_io(self, _op, _data):
+
+		_t = time.perf_counter()
+
+		try:
+			_inst = self.__resource["inst"]
+			_buffer = getattr(_inst, _op)(_data) if _op in ("write", "query") else getattr(_inst, _op)()
+
+		except pyvisa.VisaIOError as e:
+
+			if self._monitor is not None:
+				self._monitor.record_error(_op, _data, e.error_code == pyvisa.constants.StatusCode.error_timeout)
+
+			if self._recorder is not None:
+				self._recorder.record(_op, _data, _t, time.perf_counter() - _t, _error=e.error_code)
+
+			raise
+
+		_dt = time.perf_counter() - _t
+		_buffer = str(_buffer) if _op == "read_stb" else _buffer if _op in ("query", "read") else None
+
+		if self._monitor is not None:
+			self._monitor.record(_op, _data, _dt, len(_data), len(_buffer) if _buffer is not None else 0)
+
+		if self._recorder is not None:
+			self._recorder.record(_op, _data, _t, _dt, _buffer)
+
+		return _buffer
+
+
+	####################################
+	#	SPLIT PHASE QUERIES
+	#
+
+	# Start query without waiting for the response. The bus is free while the
+	# instrument works on the query. The response is read with query_fetch, 
+	# once the message available bit (MAV) of the status byte is set (see 
+	# query_ready). Only one query can be pending, and query() raises while 
+	# a response is pending.
+	def query_start(self, _data):
+
+		with self._lock:
+
+			if self._pending is not None:
+				raise RuntimeError("Response to %s is pending"%self._pending)
+
+			if self._batch:
+				self._flush_batch()
+
+			self._write(_data)
+			self._pending = _data
+
+	# Check if a response is pending
+	def is_pending(self):
+		return self._pending is not None
+
+	# Check if pending response is available (serial poll)
+	def query_ready(self):
+		return ( self.read_stb() & 0x10 ) != 0
+
+	# Read pending response. Blocks (up to the session timeout) if the response
+	# is not available yet.
+	def query_fetch(self):
+
+		with self._lock:
+
+			if self._pending is None:
+				raise RuntimeError("No query pending")
+
+			try:
+				return self._read()
+
+			finally:
+				self._pending = None
+
+	# Discard pending response (device clear)
+	def query_cancel(self):
+
+		with self._lock:
+
+			if self._pending is not None:
+
+				if self._monitor is None and self._recorder is None:
+					self.__resource["inst"].clear()
+
+				else:
+					self._traced_io("clear", "")
+
+				self._pending = None
+
+	####################################
+	#	COMMAND TABLE
+	#
+
+	# Set value of command. Cacheable values which are already set are not 
+	# written again.
+	def set_value(self, _name, _value):
+
+		_command = self._command_table[_name]
+		_data = _command.gen_write(_value)
+		_value = _command.decode( _command.encode(_value) )
+
+		with self._lock:
+
+			if _command.cache and _name in self._state and self._state[_name] == _value:
+				return
+
+			self.write(_data)
+
+			if _command.cache:
+				self._state[_name] = _value
+
+	# Get value of command. Cacheable values are only queried once unless
+	# cached is False.
+	def get_value(self, _name, cached=True):
+
+		_command = self._command_table[_name]
+
+		with self._lock:
+
+			if cached and _command.cache and _name in self._state:
+				return self._state[_name]
+
+			_value = _command.decode( self.query(_command.query) )
+
+			if _command.cache:
+				self._state[_name] = _value
+
+			return _value
+
+	# Get cached value of command (None if not known)
+	def get_cached_value(self, _name, _default=None):
+		return self._state.get(_name, _default)
+
+	# Run action command (no value)
+	def run_command(self, _name):
+		self.write( self._command_table[_name].gen_write() )
+
+	# Invalidate cached values (all values if no name is given)
+	def invalidate_state(self, _name=None):
+
+		if _name is None:
+			self._state.clear()
+
+		else:
+			self._state.pop(_name, None)
+
+	# Context manager to batch writes. Commands are queued and sent as one 
+	# message (joined by ';') on exit, or before the next query. On error the 
+	# queued commands are discarded and the state cache is invalidated.
+	@contextlib.contextmanager
+	def batch(self):
+
+		with self._lock:
+
+			# Nested batch
+			if self._batch is not None:
+				yield
+				return
+
+			self._batch = []
+
+			try:
+				yield
+
+			except Exception:
+				self._batch = None
+				self.invalidate_state()
+				raise
+
+			try:
+				self._flush_batch()
+
+			finally:
+				self._batch = None
+
+	# Send queued commands
+	def _flush_batch(self):
+
+		_batch, self._batch = self._batch, []
+
+		if _batch != []:
+
+			self._write( ";".join(_batch) )
+
+			for _data in _batch:
+				self._cache_config(_data)
+
+	####################################
+	#	CONNECTION HEALTH
+	#
+
+	# Split message into (header, command) pairs. Commands of ';' separated 
+	# messages which do not start at the root (':') continue the path of the
+	# previous command, as on the device.
+	@staticmethod
+	def _split_message(_data):
+
+		_commands, _path = [], ""
+
+		for _command in _data.split(";"):
+
+			_command = _command.strip()
+
+			if _command == "":
+				continue
+
+			if not _command.startswith((":", "*")):
+				_command = ":" + _path + _command
+
+			_header = _command.split(None, 1)[0].lstrip(":").upper()
+			_commands.append( (_header, _command) )
+
+			if not _header.startswith("*"):
+				_path = _header.rpartition(":")[0] + ":" if ":" in _header else ""
+
+		return _commands
+
+	# Check if command is in list of headers or commands (see _volatile)
+	@staticmethod
+	def _is_listed(_header, _command, _list):
+
+		if _header in _list:
+			return True
+
+		_args = _command.split(None, 1)[1:]
+		return " ".join( [_header] + [ _.upper() for _ in _args ] ) in _list
+
+	# Cache configuration commands. Commands are keyed on their header so that 
+	# only the last value is kept. *RST clears the cache.
+	def _cache_config(self, _data):
+
+		for _header, _command in self._split_message(_data):
+
+			if "?" in _header or self._is_listed(_header, _command, self._volatile):
+				continue
+
+			if _header == "*RST":
+				self._config_cache.clear()
+
+			self._config_cache.pop(_header, None)
+			self._config_cache[_header] = _command
+
+	# Get cached configuration commands (in order)
+	def get_config_cache(self):
+		return list( self._config_cache.values() )
+
+	# Get cached configuration commands for station profiles (without the 
+	# commands in _station_exclude)
+	def get_station_config(self):
+		return [ _command for _header, _command in self._config_cache.items() if not self._is_listed(_header, _command, self._station_exclude) ]
+
+	# Write configuration commands of a saved station profile as one batch. 
+	# *RST, actions and commands in _station_exclude are skipped, so the device
+	# is configured without a reset. The written values are decoded into the 
+	# state cache.
+	def replay_config(self, _commands):
+
+		with self.batch():
+
+			for _data in _commands:
+				for _header, _command in self._split_message(_data):
+
+					if "?" in _header or _header == "*RST" or self._is_listed(_header, _command, self._volatile + self._station_exclude):
+						continue
+
+					self.write(_command)
+					self._decode_config(_header, _command)
+
+	# Decode value of configuration command into state cache. Commands which 
+	# do not match their write template are left to be queried.
+	def _decode_config(self, _header, _command):
+
+		_args = _command.split(None, 1)[1:]
+
+		for _name in self._command_headers.get(_header, ()):
+
+			_table = self._command_table[_name]
+
+			if _args == [] or not ( _table.cache and _table.has_value() ):
+				continue
+
+			try:
+				_value = _table.decode(_args[0])
+
+				if _table.gen_write(_value).lstrip(":").upper() == _command.lstrip(":").upper():
+					self._state[_name] = _value
+
+			except (ValueError, TypeError):
+				pass
+
+	def clear_config_cache(self):
+		self._config_cache.clear()
+
+	# Get device lock. Hold it for multi-command sequences which must not be
+	# interleaved with other threads (e.g. supervisor health checks).
+	def get_lock(self):
+		return self._lock
+
+	# Seconds since last I/O
+	def get_idle_time(self):
+		return time.monotonic() - self._last_io
+
+	# Cheap health check. Returns True if the device answers the query within
+	# the timeout (milliseconds, defaults to the fast timeout).
+	def ping(self, _timeout=None, _query="*STB?"):
+
+		try:
+			with self.use_timeout( _timeout if _timeout is not None else self._timeout_fast ):
+
+				# Serial poll does not disturb a pending response
+				if self._pending is not None:
+					self.read_stb()
+
+				else:
+					self.query(_query)
+
+			return True
+
+		except pyvisa.VisaIOError:
+			return False
+
+	# Reopen session through the resource manager and replay cached configuration.
+	# Returns True on success. Errors of the old session (e.g. a session which 
+	# raises on attribute access) and of the reopen are not raised.
+	def reconnect(self):
+
+		with self._lock:
+
+			if "resource" not in self.__resource:
+				return False
+
+			_inst = self.__resource.get("inst")
+
+			try:
+				_timeout = _inst.timeout if _inst is not None else None
+
+			except Exception:
+				_timeout = None
+
+			try:
+				_inst.close()
+
+			except Exception:
+				pass
+
+			# Responses are lost with the session. Values may have changed 
+			# (e.g. power cycle), so they are queried again.
+			self._pending = None
+			self.invalidate_state()
+
+			try:
+				_inst = get_resource_manager().open_resource( self.__resource["resource"] )
+
+				if _timeout is not None:
+					_inst.timeout = _timeout
+
+				self.__resource["inst"] = _inst
+
+				for _data in self.get_config_cache():
+					self.write(_data)
+
+			except Exception:
+				return False
+
+			return True
+
+	####################################
+	#	TIMEOUTS
+	#
+
+	# Set session timeouts (milliseconds)
+	def set_timeouts(self, default=None, fast=None):
+
+		if default is not None:
+			self._timeout_default = int(default)
+			self.set_timeout(default)
+
+		if fast is not None:
+			self._timeout_fast = int(fast)
+
+	# Get/set session timeout (milliseconds)
+	def get_timeout(self):
+		return self.__resource["inst"].timeout
+
+	def set_timeout(self, _timeout):
+		self.__resource["inst"].timeout = int(_timeout)
+
+	# Context manager to run operations with a different session timeout. The
+	# device lock is held so that no other thread sees the changed timeout.
+	@contextlib.contextmanager
+	def use_timeout(self, _timeout):
+
+		with self._lock:
+
+			_saved = self.get_timeout()
+			self.set_timeout(_timeout)
+
+			try:
+				yield
+
+			# Session may have been replaced by reconnect
+			finally:
+				self.set_timeout(_saved)
+
+	# Query with fast timeout (status queries)
+	def query_status(self, _data):
+
+		with self.use_timeout(self._timeout_fast):
+			return self.query(_data)
+
+	####################################
+	#	INSTRUMENTATION
+	#
+
+	# Enable I/O instrumentation. Returns the QVisaIOMonitor object
+	def enable_instrumentation(self):
+
+		if self._monitor is None:
+			self._monitor = QVisaIOMonitor()
+
+		return self._monitor
+
+	# Disable I/O instrumentation
+	def disable_instrumentation(self):
+		self._monitor = None
+
+	# Get QVisaIOMonitor object (None if disabled)
+	def get_instrumentation(self):
+		return self._monitor
+
+	# Start recording SCPI traffic into binary trace file. The trace can be 
+	# replayed offline with PyQtVisa.sim.QVisaReplayResource
+	def start_recording(self, _filename):
+
+		self.stop_recording()
+		self._recorder = QVisaTraceWriter(_filename, self.get_property("resource"))
+
+	# Stop recording and close trace file
+	def stop_recording(self):
+
+		if self._recorder is not None:
+			self._recorder.close()
+			self._recorder = None
+
 	####################################
 	#	GENERAL
 	#	
@@ -125,6 +792,7 @@ class QVisaDevice:
 	# Reset command. Abort all activities and initialize the device
 	def RST(self):
 		self.write('*RST')
+		self.invalidate_state()
 
 	# Self test query. Perform a self-test. Returns ‘0'  if self test 
 	# completed without errors, all other values determine an error cause.
@@ -170,12 +838,12 @@ class QVisaDevice:
 
 	# Standard Event Status Enable query	
 	def ESE_query(self):
-		return self.query('*ESE?')
+		return self.query_status('*ESE?')
 
 	# Event Status Register: contains the actual status information 
 	# derived from the instrument. This register is read only
 	def ESR_query(self):
-		return self.query('*ESR?')
+		return self.query_status('*ESR?')
 
 	# Service Request Enable command. Modify the contents of the Service Request
 	# Enable Register.	
@@ -185,33 +853,21 @@ class QVisaDevice:
 	# Service Request Enable query. Return the contents of the Service Request 
 	# Enable Register	
 	def SRE_query(self):
-		return self.query('*SRE')
+		return self.query_status('*SRE?')
 
 	# Status Byte query. Return the contents of the Status Byte Register.
 	def STB_query(self):
-		return self.query('*STB?')
+		return self.query_status('*STB?')
 
 
 	####################################
 	#	ALIAS TABLE
-	#			
+	#
+
+	# Aliases are generated once per class from _aliases. This method is 
+	# kept as a hook for drivers which add aliases per instance.
 	def alias_table(self):
+		pass
 
-		# General shortcuts
-		self.idn = self.IDN
-		self.rst = self.RST
-		self.tst = self.TST
-		
-		# Synchronization 
-		self.wai = self.WAI 
-		self.opc = self.OPC 
-		self.opc_query = self.OPC_query
-		self.trg = self.TRG
-
-		# Insturment Status
-		self.ese = self.ESE
-		self.ese_query = self.ESE_query
-		self.esr_query = self.ESR_query
-		self.sre = self.SRE
-		self.sre_query = self.SRE_query
-		self.stb_query = self.STB_query
+# Generate command methods and aliases on base class
+gen_class_methods(QVisaDevice)
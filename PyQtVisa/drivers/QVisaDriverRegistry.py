@@ -0,0 +1,129 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaDriverRegistry
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import importlib
+import collections
+
+# Registry of QVisaDevice driver classes for device auto-detection. Drivers 
+# are registered by name as a class or as a "module:Class" string and are only
+# imported when they are first needed. Drivers of other packages are added 
+# through the "pyqtvisa.drivers" entry point group:
+#
+#	entry_points={"pyqtvisa.drivers" : ["k2450 = mypackage.keithley2450:keithley2450"]}
+#
+# A driver matches a device when the class method match_idn(idn) returns True
+# for the *IDN? response of the device (see QVisaDevice._idn_pattern).
+#
+
+_group = "pyqtvisa.drivers"
+
+# Built in drivers
+_drivers = collections.OrderedDict([
+	("keithley2400", "PyQtVisa.drivers.keithley2400:keithley2400"),
+])
+
+_entry_points_loaded = False
+
+# Register driver class (or "module:Class" string)
+def register_driver(_name, _driver):
+	_drivers[_name] = _driver
+
+# Get list of driver names (built in, registered and entry points)
+def get_driver_names():
+
+	_load_entry_points()
+	return list( _drivers.keys() )
+
+# Get driver class by name. Raises ImportError if the driver cannot be loaded.
+def get_driver(_name):
+
+	_load_entry_points()
+	_driver = _drivers[_name]
+
+	if isinstance(_driver, str):
+		_driver = load_driver(_driver)
+		_drivers[_name] = _driver
+
+	return _driver
+
+# Import driver class from "module:Class" string
+def load_driver(_path):
+
+	_module, _class = _path.split(":")
+	return getattr( importlib.import_module(_module), _class )
+
+# Get "module:Class" string of driver class
+def get_driver_path(_driver):
+	return "%s:%s"%(_driver.__module__, _driver.__name__)
+
+# Get (name, driver class) of first driver which matches *IDN? response. 
+# Returns (None, None) if no driver matches. Drivers which cannot be 
+# imported are skipped.
+def match_driver(_idn):
+
+	for _name in get_driver_names():
+
+		try:
+			_driver = get_driver(_name)
+
+		except ImportError:
+			continue
+
+		if hasattr(_driver, "match_idn") and _driver.match_idn(_idn):
+			return _name, _driver
+
+	return None, None
+
+# Add drivers of installed packages (entry points are read once)
+def _load_entry_points():
+
+	global _entry_points_loaded
+
+	if _entry_points_loaded:
+		return
+
+	_entry_points_loaded = True
+
+	try:
+		from importlib.metadata import entry_points
+
+	except ImportError:
+		return
+
+	_entry_points = entry_points()
+
+	# Selection interface (python 3.10) or dictionary of groups
+	if hasattr(_entry_points, "select"):
+		_entry_points = _entry_points.select(group=_group)
+
+	else:
+		_entry_points = _entry_points.get(_group, [])
+
+	for _entry_point in _entry_points:
+		_drivers.setdefault(_entry_point.name, _entry_point.value)
@@ -0,0 +1,208 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaIOMonitor
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import math
+import bisect
+import collections
+
+# Class to collect I/O statistics for QVisaDevice. Statistics are kept per 
+# (operation, command) where command is the SCPI header of the message (e.g. 
+# ":SOUR:VOLT:LEV"). For each entry the monitor keeps the call count, total and 
+# maximum latency, a latency histogram (log-spaced bins, 10 per decade from 
+# 1 us to 1000 s), byte counts and timeout/retry counts. Named timers collect 
+# time spent outside of the bus (e.g. the sleep loop in keithley2400.meas).
+#
+#	_monitor = device.enable_instrumentation()
+#	...
+#	print(_monitor.report())
+#	_monitor.write_json("io.json")
+#
+
+class QVisaIOMonitor:
+
+	# Histogram bin edges (seconds)
+	_edges = [ 10 ** ( _ / 10.0 ) for _ in range(-60, 31) ]
+
+	def __init__(self):
+		self.reset()
+
+	# Reset all statistics
+	def reset(self):
+
+		self._entries = collections.OrderedDict()
+		self._timers = collections.OrderedDict()
+
+	# Command key for message (first SCPI header, upper case)
+	@staticmethod
+	def command_key(_message):
+
+		_message = str(_message).strip()
+		return _message.split(None, 1)[0].split(";")[0].upper() if _message != "" else ""
+
+	# Get or create entry for operation and command
+	def _entry(self, _op, _command):
+
+		_key = (_op, _command)
+		if _key not in self._entries:
+
+			self._entries[_key] = {
+				"count" 	: 0,
+				"total" 	: 0.0,
+				"max" 		: 0.0,
+				"bytes_out" : 0,
+				"bytes_in" 	: 0,
+				"timeouts" 	: 0,
+				"retries" 	: 0,
+				"errors" 	: 0,
+				"hist" 		: [0] * ( len(self._edges) + 1 ),
+			}
+
+		return self._entries[_key]
+
+	#####################################
+	#  RECORDING
+	#
+
+	# Record completed operation
+	def record(self, _op, _message, _seconds, _bytes_out=0, _bytes_in=0):
+
+		_entry = self._entry(_op, self.command_key(_message))
+		_entry["count"] += 1
+		_entry["total"] += _seconds
+		_entry["max"] = max(_entry["max"], _seconds)
+		_entry["bytes_out"] += _bytes_out
+		_entry["bytes_in"] += _bytes_in
+		_entry["hist"][ bisect.bisect_right(self._edges, _seconds) ] += 1
+
+	# Record failed operation. Timeouts are counted separately.
+	def record_error(self, _op, _message, _timeout=False):
+
+		_entry = self._entry(_op, self.command_key(_message))
+		_entry["timeouts" if _timeout else "errors"] += 1
+
+	# Record retry of operation
+	def record_retry(self, _op, _message):
+		self._entry(_op, self.command_key(_message))["retries"] += 1
+
+	# Add time to named timer
+	def add_time(self, _name, _seconds):
+
+		_timer = self._timers.setdefault(_name, {"count" : 0, "total" : 0.0})
+		_timer["count"] += 1
+		_timer["total"] += _seconds
+
+	#####################################
+	#  EXPORT
+	#
+
+	# Latency quantile (upper bin edge) from histogram
+	def _quantile(self, _hist, _q):
+
+		_count = sum(_hist)
+		if _count == 0:
+			return None
+
+		_cumulative = 0
+		for _i, _n in enumerate(_hist):
+
+			_cumulative += _n
+			if _cumulative >= _q * _count:
+				return self._edges[_i] if _i < len(self._edges) else float("inf")
+
+	# Summary list with one row (dict) per operation and command
+	def summary(self):
+
+		_rows = []
+		for (_op, _command), _e in self._entries.items():
+
+			_rows.append( collections.OrderedDict([
+				("op", 			_op),
+				("command", 	_command),
+				("count", 		_e["count"]),
+				("total", 		_e["total"]),
+				("mean", 		_e["total"] / _e["count"] if _e["count"] > 0 else None),
+				("p50", 		self._quantile(_e["hist"], 0.50)),
+				("p95", 		self._quantile(_e["hist"], 0.95)),
+				("max", 		_e["max"]),
+				("bytes_out", 	_e["bytes_out"]),
+				("bytes_in", 	_e["bytes_in"]),
+				("timeouts", 	_e["timeouts"]),
+				("retries", 	_e["retries"]),
+				("errors", 		_e["errors"]),
+			]) )
+
+		return _rows
+
+	# Histogram for operation and command as list of (upper edge, count)
+	def histogram(self, _op, _command):
+
+		_hist = self._entries[ (_op, _command) ]["hist"]
+		return [ (self._edges[_i] if _i < len(self._edges) else float("inf"), _n) for _i, _n in enumerate(_hist) if _n > 0 ]
+
+	# Named timers
+	def timers(self):
+		return collections.OrderedDict( (_k, dict(_v)) for _k, _v in self._timers.items() )
+
+	# Format summary as table
+	def report(self):
+
+		_fmt = lambda _ : "%10.3f"%(1e3 * _) if _ is not None and not math.isinf(_) else "%10s"%"-"
+
+		_lines = [ "%-6s %-24s %8s %10s %10s %10s %10s %10s %10s %8s %8s"%(
+			"op", "command", "count", "total(ms)", "mean(ms)", "p50(ms)", "p95(ms)", "bytes_out", "bytes_in", "timeout", "retry") ]
+		_lines.append( "-" * len(_lines[0]) )
+
+		for _r in self.summary():
+			_lines.append( "%-6s %-24s %8d %s %s %s %s %10d %10d %8d %8d"%(
+				_r["op"], _r["command"], _r["count"], _fmt(_r["total"]), _fmt(_r["mean"]), _fmt(_r["p50"]), _fmt(_r["p95"]), 
+				_r["bytes_out"], _r["bytes_in"], _r["timeouts"], _r["retries"]) )
+
+		for _name, _t in self._timers.items():
+			_lines.append( "%-6s %-24s %8d %s"%("timer", _name, _t["count"], _fmt(_t["total"])) )
+
+		return "\n".join(_lines)
+
+	# Export as json string. The open ended histogram bin (upper edge inf) is
+	# exported as null, since inf is not valid json.
+	def to_json(self):
+
+		_value = lambda _ : None if isinstance(_, float) and math.isinf(_) else _
+
+		return json.dumps({
+			"summary" 	: [ collections.OrderedDict( (_k, _value(_v)) for _k, _v in _r.items() ) for _r in self.summary() ],
+			"timers" 	: self.timers(),
+			"histograms": { "%s %s"%_k : [ (_value(_e), _n) for _e, _n in self.histogram(*_k) ] for _k in self._entries.keys() },
+		}, indent=2, allow_nan=False)
+
+	# Write json to file
+	def write_json(self, _filename):
+
+		with open(_filename, 'w') as f:
+			f.write( self.to_json() )
@@ -0,0 +1,51 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaResourceManager
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pyvisa
+
+# Shared resource manager for QVisaDevice objects and resource widgets. By
+# default this is the pyvisa ResourceManager. Any object which implements
+# list_resources() and open_resource() can be installed instead, for example
+# pyvisa.ResourceManager("@sim") or PyQtVisa.sim.QVisaSimResourceManager.
+_resource_manager = None
+
+# Get shared resource manager (created on first use)
+def get_resource_manager():
+
+	global _resource_manager
+
+	if _resource_manager is None:
+		_resource_manager = pyvisa.ResourceManager()
+
+	return _resource_manager
+
+# Set shared resource manager. Passing None restores the pyvisa default.
+def set_resource_manager(_rm):
+
+	global _resource_manager
+	_resource_manager = _rm
@@ -0,0 +1,153 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaTrace
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import struct
+
+# Compact binary trace of SCPI traffic for one device. The file starts with
+# a header followed by one record per bus operation:
+#
+#	header	: b"QVTR" | version (u8) | resource length (u16) | resource (utf-8)
+#	record	: op (u8) | start (f64) | duration (f32) | message length (u32) |
+#			  response length (u32) | message (utf-8) | response (utf-8)
+#
+# Start times are seconds since the trace was opened. The op byte holds the
+# operation code and bit 7 is set when the operation raised a VISA error, in
+# which case the response holds the VISA status code. Version 1 files 
+# (message length u16) can still be read.
+#
+
+# Operation codes
+TRACE_WRITE = 0
+TRACE_QUERY = 1
+TRACE_STB = 2
+TRACE_READ = 3
+TRACE_TRIGGER = 4
+TRACE_CLEAR = 5
+TRACE_ERROR = 0x80
+
+_ops = {"write" : TRACE_WRITE, "query" : TRACE_QUERY, "read_stb" : TRACE_STB, "read" : TRACE_READ, 
+	"assert_trigger" : TRACE_TRIGGER, "clear" : TRACE_CLEAR}
+_names = { _v : _k for _k, _v in _ops.items() }
+
+_magic = b"QVTR"
+_version = 2
+_records = {1 : struct.Struct("<BdfHI"), 2 : struct.Struct("<BdfII")}
+_record = _records[_version]
+
+# Class to write trace files (see QVisaDevice.start_recording)
+class QVisaTraceWriter:
+
+	def __init__(self, _filename, _resource=""):
+
+		self._file = open(_filename, 'wb')
+		self._t0 = time.perf_counter()
+
+		_resource = str(_resource).encode()
+		self._file.write( _magic + struct.pack("<BH", _version, len(_resource)) + _resource )
+
+	# Get trace clock origin (perf_counter value)
+	def get_origin(self):
+		return self._t0
+
+	# Record operation. _start is a perf_counter value. _error is the VISA
+	# status code if the operation raised an error.
+	def record(self, _op, _message, _start, _duration, _response=None, _error=None):
+
+		_message = str(_message).encode()
+
+		if _error is not None:
+			_code = _ops[_op] | TRACE_ERROR
+			_response = str(int(_error)).encode()
+
+		else:
+			_code = _ops[_op]
+			_response = b"" if _response is None else str(_response).encode()
+
+		self._file.write( _record.pack(_code, _start - self._t0, _duration, len(_message), len(_response)) + _message + _response )
+
+	def flush(self):
+		self._file.flush()
+
+	def close(self):
+		self._file.close()
+
+
+# Class to read trace files. Records are returned as tuples:
+#	(op, start, duration, message, response, error)
+# where op is "write", "query", "read", "read_stb", "assert_trigger" or 
+# "clear" and error is the VISA status code or None.
+class QVisaTraceReader:
+
+	def __init__(self, _filename):
+
+		with open(_filename, 'rb') as f:
+			_buffer = f.read()
+
+		if _buffer[:4] != _magic:
+			raise ValueError("%s is not a QVisaTrace file"%_filename)
+
+		_version, _length = struct.unpack_from("<BH", _buffer, 4)
+
+		if _version not in _records:
+			raise ValueError("%s has unsupported trace version %d"%(_filename, _version))
+
+		self.resource = _buffer[7:7 + _length].decode()
+		self._records = self._parse(_buffer, 7 + _length, _records[_version])
+
+	# Parse records from buffer
+	@staticmethod
+	def _parse(_buffer, _offset, _record):
+
+		_records = []
+		while _offset < len(_buffer):
+
+			_code, _start, _duration, _nmsg, _nresp = _record.unpack_from(_buffer, _offset)
+			_offset += _record.size
+
+			_message = _buffer[_offset:_offset + _nmsg].decode()
+			_offset += _nmsg
+
+			_response = _buffer[_offset:_offset + _nresp].decode()
+			_offset += _nresp
+
+			_error = int(_response) if _code & TRACE_ERROR else None
+			_records.append( (_names[_code & ~TRACE_ERROR], _start, _duration, _message, None if _error is not None else _response, _error) )
+
+		return _records
+
+	# Get list of records
+	def records(self):
+		return self._records
+
+	def __len__(self):
+		return len(self._records)
+
+	def __iter__(self):
+		return iter(self._records)
@@ -27,92 +27,923 @@
 #!/usr/bin/env python 
 # -*- coding: utf-8 -*- 
 import time
+import threading
+import contextlib
+import collections
 import pyvisa
+import numpy as np
 
-# Import pyVisaDevice
+# Import pyVisaDevice and command tables
 from .QVisaDevice import QVisaDevice
+from .QVisaCommand import QVisaCommand
 
 class keithley2400(QVisaDevice):
 
+	# Command table. Generates set_<name>, get_<name> (see QVisaCommand)
+	_commands = {
+		"output" 				: QVisaCommand(":OUTP:STAT {}", ":OUTP:STAT?", bool, cache=False),
+		"remote_sense" 			: QVisaCommand(":SYST:RSEN {}", ":SYST:RSEN?", bool),
+		"terminals" 			: QVisaCommand(":ROUT:TERM {}", ":ROUT:TERM?", str, values=("FRON", "REAR")),
+		"source_function" 		: QVisaCommand(":SOUR:FUNC {}", ":SOUR:FUNC?", str, values=("VOLT", "CURR", "MEM")),
+		"sense_function" 		: QVisaCommand(":SENS:FUNC \"{}\"", ":SENS:FUNC?", str, values=("CURR", "VOLT", "RES")),
+		"voltage_mode" 			: QVisaCommand(":SOUR:VOLT:MODE {}", ":SOUR:VOLT:MODE?", str, values=("FIX", "LIST", "SWE")),
+		"current_mode" 			: QVisaCommand(":SOUR:CURR:MODE {}", ":SOUR:CURR:MODE?", str, values=("FIX", "LIST", "SWE")),
+		"voltage" 				: QVisaCommand(":SOUR:VOLT:LEV {}", ":SOUR:VOLT:LEV?", float, range=(-210.0, 210.0)),
+		"current" 				: QVisaCommand(":SOUR:CURR:LEV {}", ":SOUR:CURR:LEV?", float, range=(-1.05, 1.05)),
+		"current_protection" 	: QVisaCommand(":SENS:CURR:PROT {}", ":SENS:CURR:PROT?", float, range=(-1.05, 1.05)),
+		"voltage_protection" 	: QVisaCommand(":SENS:VOLT:PROT {}", ":SENS:VOLT:PROT?", float, range=(-210.0, 210.0)),
+		"current_autorange" 	: QVisaCommand(":SENS:CURR:RANG:AUTO {}", ":SENS:CURR:RANG:AUTO?", bool),
+		"voltage_autorange" 	: QVisaCommand(":SENS:VOLT:RANG:AUTO {}", ":SENS:VOLT:RANG:AUTO?", bool),
+		"current_nplc" 			: QVisaCommand(":SENS:CURR:NPLC {}", ":SENS:CURR:NPLC?", float, range=(0.01, 10.0)),
+		"voltage_nplc" 			: QVisaCommand(":SENS:VOLT:NPLC {}", ":SENS:VOLT:NPLC?", float, range=(0.01, 10.0)),
+		"trigger_count" 		: QVisaCommand(":TRIG:COUN {}", ":TRIG:COUN?", int, range=(1, 2500)),
+		"arm_source" 			: QVisaCommand(":ARM:SOUR {}", ":ARM:SOUR?", str, values=("IMM", "BUS", "TLIN", "TIM", "MAN")),
+		"current_range" 		: QVisaCommand(":SENS:CURR:RANG {}", ":SENS:CURR:RANG?", float, range=(0.0, 1.05)),
+		"voltage_range" 		: QVisaCommand(":SENS:VOLT:RANG {}", ":SENS:VOLT:RANG?", float, range=(0.0, 210.0)),
+		"autozero" 				: QVisaCommand(":SYST:AZER:STAT {}", ":SYST:AZER:STAT?", bool),
+		"autozero_once" 		: QVisaCommand(":SYST:AZER:STAT ONCE"),
+		"display" 				: QVisaCommand(":DISP:ENAB {}", ":DISP:ENAB?", bool),
+		"source_delay_auto" 	: QVisaCommand(":SOUR:DEL:AUTO {}", ":SOUR:DEL:AUTO?", bool),
+		"source_delay" 			: QVisaCommand(":SOUR:DEL {}", ":SOUR:DEL?", float, range=(0.0, 9999.999)),
+		"memory_start" 			: QVisaCommand(":SOUR:MEM:STAR {}", ":SOUR:MEM:STAR?", int, range=(1, 100)),
+		"memory_points" 		: QVisaCommand(":SOUR:MEM:POIN {}", ":SOUR:MEM:POIN?", int, range=(1, 100)),
+		"buffer_points" 		: QVisaCommand(":TRAC:POIN {}", ":TRAC:POIN?", int, range=(1, 2500)),
+		"buffer_feed" 			: QVisaCommand(":TRAC:FEED:CONT {}", ":TRAC:FEED:CONT?", str, values=("NEXT", "NEV"), cache=False),
+		"buffer_clear" 			: QVisaCommand(":TRAC:CLE"),
+		"abort" 				: QVisaCommand(":ABOR"),
+		"elements" 				: QVisaCommand(":FORM:ELEM {}", ":FORM:ELEM?", str),
+	}
+
+	# Reading elements in the order returned by :READ? and :TRAC:DATA?. All
+	# elements are returned after *RST.
+	_elements = ("VOLT", "CURR", "RES", "TIME", "STAT")
+
+	# Status word bits decoded into reading flags
+	_status_flags = {
+		"overflow" 			: 0x00001,
+		"compliance" 		: 0x00008,
+		"range_compliance" 	: 0x10000,
+	}
+
+	# Size of reading buffer
+	_buffer_size = 2500
+
+	# Device identification (see QVisaDevice.match_idn)
+	_idn_pattern = "KEITHLEY INSTRUMENTS INC.,MODEL 24"
+
+	# Source memory locations and the settings held by a location (see 
+	# upload_sequence).
+	_memory_size = 100
+	_memory_settings = (
+		"source_function", "sense_function", "voltage_mode", "current_mode", "voltage", "current", 
+		"current_protection", "voltage_protection", "current_autorange", "voltage_autorange", 
+		"current_range", "voltage_range", "current_nplc", "voltage_nplc", "autozero", 
+		"source_delay_auto", "source_delay", "remote_sense",
+	)
+
+	# Actions which are not cached or replayed (see QVisaDevice._volatile). 
+	# Saving and recalling setups, buffer actions and one-shot autozero.
+	_volatile = QVisaDevice._volatile + (
+		"SOUR:MEM:SAVE", "SOUR:MEM:REC", "TRAC:CLE", "TRAC:FEED:CONT NEXT", "SYST:AZER:STAT ONCE"
+	)
+
+	# Output state and bus arm source are not restored from station profiles 
+	# (see QVisaDevice._station_exclude). The output stays off on warm start.
+	_station_exclude = ("OUTP", "OUTP:STAT", "ARM:SOUR BUS")
+
+	# Measurement ranges (full scale) and command name prefix of sense functions
+	_ranges = {
+		"CURR" : (1.05e-6, 1.05e-5, 1.05e-4, 1.05e-3, 1.05e-2, 1.05e-1, 1.05),
+		"VOLT" : (0.21, 2.1, 21.0, 210.0),
+	}
+	_functions = {"CURR" : "current", "VOLT" : "voltage"}
+
+	# Sweep policies on failed device (see sweep)
+	_policies = ("continue", "skip", "abort")
+
+	# Acquisition profiles. Settings are applied in order and restored in 
+	# reverse order (see use_profile).
+	#
+	#	accuracy 		: instrument defaults (autozero, display, auto source delay, autorange)
+	#	balanced		: display off and no source delay 
+	#	max-throughput	: as balanced, autozero off (zeroed once on entry) and fixed ranges 
+	#
+	_profiles = {
+		"accuracy" : collections.OrderedDict([
+			("autozero", True), ("display", True), ("source_delay_auto", True), 
+			("current_autorange", True), ("voltage_autorange", True),
+		]),
+		"balanced" : collections.OrderedDict([
+			("autozero", True), ("display", False), ("source_delay_auto", False), ("source_delay", 0.0),
+			("current_autorange", True), ("voltage_autorange", True),
+		]),
+		"max-throughput" : collections.OrderedDict([
+			("autozero", False), ("display", False), ("source_delay_auto", False), ("source_delay", 0.0),
+			("current_autorange", False), ("voltage_autorange", False),
+		]),
+	}
+
 	# Initialize Driver
 	def __init__(self, _resource):
 
 		# Call super
 		super(keithley2400, self).__init__(_resource, "Keithley")
 
+		# The line frequency is used to derive measurement timeouts. It is not 
+		# queried and defaults to 50Hz (longer than 60Hz).
+		self._line_frequency = 50.0
+
+		# Streaming thread
+		self._stream = None
+
+		# Source memory sequence (locations and expected reading times)
+		self._sequence = []
+
+		# Arm source and trigger count to restore after triggered acquisition
+		self._trigger_restore = None
+
 	# Check idn command
 	def check_idn(self):
-		return False if "KEITHLEY INSTRUMENTS INC.,MODEL 24" not in str(self.IDN()) else True
+		return self.match_idn( self.IDN() )
 
-	# Trigger output state
+	# Trigger output state. The output state is not cached, so the command is 
+	# always written (e.g. safe state on shutdown).
 	def output_on(self): 
-		self.write(":OUTP:STAT ON")
+		self.set_output(True)
 
 	def output_off(self): 
-		self.write(":OUTP:STAT OFF")
+		self.set_output(False)
 
 	# Methods for two/four wire sense mode
 	def four_wire_sense_on(self):	
-		self.write(":SYST:RSEN ON")
+		self.set_remote_sense(True)
 
 	def four_wire_sense_off(self):	
-		self.write(":SYST:RSEN OFF")	
+		self.set_remote_sense(False)
 
 	# Front versus rear output
 	def output_route_front(self):
-		self.write(":ROUT:TERM FRON")
+		self.set_terminals("FRON")
 
 	def output_route_rear(self):
-		self.write(":ROUT:TERM REAR")
+		self.set_terminals("REAR")
 
 	# Set integration time nPLCs
 	# PLCs = power line cycles (50/60Hz)
 	def update_nplc(self, _value):
-		self.write(":SENS:CURR:NPLC %s"%str(_value))
-		self.write(":SENS:VOLT:NPLC %s"%str(_value))
+
+		with self.batch():
+			self.set_current_nplc(_value)
+			self.set_voltage_nplc(_value)
+
+	# Power line frequency (Hz) for timeout estimates
+	def set_line_frequency(self, _value):
+		self._line_frequency = float(_value)
+
+	# Expected duration of one :READ? in seconds. With autozero each reading
+	# takes up to three conversions (signal, reference and zero). The auto 
+	# source delay is taken as 5ms (worst case). Settings which are not cached
+	# (raw writes, reconnect or warm start) are queried once.
+	def get_meas_time(self):
+
+		_nplc = max( self.get_value("current_nplc"), self.get_value("voltage_nplc") )
+		_conversions = 3.0 if self.get_value("autozero") else 1.0
+		_delay = 5.0e-3 if self.get_value("source_delay_auto") else self.get_value("source_delay")
+
+		return self.get_value("trigger_count") * ( _conversions * _nplc / self._line_frequency + _delay + 2.0e-3 )
+
+	# Session timeout for :READ? in milliseconds. Twice the expected duration 
+	# on top of the default timeout, so long measurements are never cut short.
+	def get_meas_timeout(self):
+		return int( 2000.0 * self.get_meas_time() ) + self._timeout_default
 
 	# VOLTAGE SOURCE MODE FUNCTIONS
 	# Set fixed voltage level and compliance
 	def voltage_src(self):
-		self.write(':SOUR:FUNC VOLT')
-		self.write(':SOUR:VOLT:MODE FIX')
-		self.write(':SENS:FUNC \"CURR\"')
+
+		with self.batch():
+			self.set_source_function("VOLT")
+			self.set_voltage_mode("FIX")
+			self.set_sense_function("CURR")
 
 	# Set current compliance
 	def current_cmp(self, _level):
-		self.write(':SENS:CURR:PROT %s'%str(_level))
-		self.write(':SENS:CURR:RANG:AUTO ON')
+
+		with self.batch():
+			self.set_current_protection(_level)
+			self.set_current_autorange(True)
 
 	# CURRENT SOURCE MODE FUNCTIONS
 	# Set fixed current level and compliance
 	def current_src(self):
-		self.write(':SOUR:FUNC CURR')
-		self.write(':SOUR:CURR:MODE FIX')
-		self.write(':SENS:FUNC \"VOLT\"')
+
+		with self.batch():
+			self.set_source_function("CURR")
+			self.set_current_mode("FIX")
+			self.set_sense_function("VOLT")
 
 	def voltage_cmp(self, _level):
-		self.write(':SENS:VOLT:PROT %s'%str(_level))
-		self.write(':SENS:VOLT:RANG:AUTO ON')
 
-	# Set complicance value before applying bias
-	def set_voltage(self, _level):
-		self.write(':SOUR:VOLT:LEV %s'%str(_level))
+		with self.batch():
+			self.set_voltage_protection(_level)
+			self.set_voltage_autorange(True)
+
+	# Note that set_voltage and set_current are generated from the command table
+
+	#####################################
+	#  ACQUISITION PROFILES
+	#
+
+	# Get list of profile names
+	def get_profiles(self):
+		return list( self._profiles.keys() )
+
+	# Apply profile. Keyword arguments override profile settings or add 
+	# settings (e.g. current_range=1e-3 for a fixed range). Returns the 
+	# previous values, which can be passed to restore_profile.
+	def apply_profile(self, _profile, **_overrides):
 
-	# Set complicance value before applying bias
-	def set_current(self, _level):
-		self.write(':SOUR:CURR:LEV %s'%str(_level))
+		_settings = collections.OrderedDict(self._profiles[_profile])
+		_settings.update(_overrides)
 
-	# Initiate measurement	
-	def meas(self):
+		with self.get_lock():
+
+			_previous = collections.OrderedDict( (_name, self.get_value(_name)) for _name in _settings.keys() )
+
+			with self.batch():
+
+				for _name, _value in _settings.items():
+					self.set_value(_name, _value)
+
+				# Zero once when autozero is switched off
+				if _previous.get("autozero") and not _settings.get("autozero", True):
+					self.autozero_once()
+
+		return _previous
+
+	# Restore settings returned by apply_profile (in reverse order)
+	def restore_profile(self, _previous):
+
+		with self.batch():
+			for _name, _value in reversed( list( _previous.items() ) ):
+				self.set_value(_name, _value)
+
+	# Context manager to run with profile and restore the previous state on exit
+	#
+	#	with smu.use_profile("max-throughput", current_range=1e-3):
+	#		...
+	#
+	@contextlib.contextmanager
+	def use_profile(self, _profile, **_overrides):
+
+		_previous = self.apply_profile(_profile, **_overrides)
+
+		try:
+			yield _previous
+
+		finally:
+			self.restore_profile(_previous)
+
+	# Initiate measurement. The device lock is held for the whole sequence and
+	# the session timeout is derived from the integration settings. On timeout
+	# the response is waited for at most _retries more times. A retry reads the
+	# response of the same :READ? (a new :READ? would start another reading).
+	def meas(self, _retries=3):
+
+		with self.use_timeout( self.get_meas_timeout() ):
+			return self._meas(_retries)
+
+	def _meas(self, _retries):
+
+		_t = time.perf_counter()
 		self.write(":INIT")
 		self.WAI()
 
 		# Create server loop for data in order to 
 		# capture long integration times
-		while True:
+		for _attempt in range(_retries + 1):
+
+			try:
+				_buffer = self.query(":READ?") if _attempt == 0 else self._read()
+
+				if self._monitor is not None:
+					self._monitor.record("call", "meas", time.perf_counter() - _t)
+
+				return _buffer
+
+			except pyvisa.VisaIOError as e:
+
+				# Only timeouts are retried. Other errors (e.g. lost connection)
+				# are raised so that the session can be recovered.
+				if e.error_code != pyvisa.constants.StatusCode.error_timeout or _attempt == _retries:
+					raise
+
+				if self._monitor is None:
+					time.sleep(0.1)
+
+				else:
+					self._monitor.record_retry("query", ":READ?")
+					_s = time.perf_counter()
+					time.sleep(0.1)
+					self._monitor.add_time("meas_sleep", time.perf_counter() - _s)
+
+	#####################################
+	#  SWEEP PLANNING
+	#
+
+	# Get smallest measurement range of function (CURR or VOLT) which holds 
+	# value. Returns None if the value is beyond the largest range.
+	def select_range(self, _function, _value):
+		return next( ( _r for _r in self._ranges[_function] if abs(_value) <= _r ), None )
+
+	# Set fixed measurement range of function. None selects autorange. The 
+	# instrument changes the range on autorange, so the cached range is dropped.
+	def set_sense_range(self, _function, _range):
+
+		_name = self._functions[_function]
+
+		if _range is None:
+			self.set_value("%s_autorange"%_name, True)
+			self.invalidate_state("%s_range"%_name)
+
+		else:
+			self.set_value("%s_autorange"%_name, False)
+			self.set_value("%s_range"%_name, _range)
+
+	# Order in which sweep points are measured. With reorder, points are 
+	# measured in order of increasing magnitude so that the reading of a 
+	# monotonic device crosses each range boundary only once.
+	@staticmethod
+	def plan_sweep(_levels, reorder=False):
+
+		_levels = np.asarray(_levels, dtype=float)
+		return np.argsort(np.abs(_levels), kind="stable") if reorder else np.arange(len(_levels))
+
+	# Predict next reading from (level, reading) history. Readings are linearly
+	# extrapolated from the last two points, or scaled with the source level 
+	# after the first point. Returns None if there is no prediction.
+	@staticmethod
+	def predict_reading(_history, _level):
+
+		if len(_history) == 0:
+			return None
+
+		_l1, _v1 = _history[-1]
+
+		if len(_history) == 1 or _history[-2][0] == _l1:
+			return _v1 * _level / _l1 if _l1 != 0 else None
+
+		_l0, _v0 = _history[-2]
+		return _v1 + ( _v1 - _v0 ) * ( _level - _l1 ) / ( _l1 - _l0 )
+
+	# Range aware sweep. For each point the reading is predicted from the 
+	# previous readings and a fixed range holding the prediction (times 
+	# headroom) is set ahead of the measurement. Autorange is used when there 
+	# is no prediction, or when the prediction lies within the headroom of a 
+	# range boundary. Readings which overflow a fixed range are measured again
+	# with autorange. Points are measured in the order given by plan_sweep.
+	#
+	# Failed devices are detected from each reading. A reading fails on the 
+	# compliance bit of the status word (short) or if the magnitude of the 
+	# reading is below open_level (open). After failures consecutive failed 
+	# readings the policy is applied:
+	#
+	#	"continue"	: measure all points
+	#	"skip"		: skip remaining points of same polarity and larger magnitude
+	#	"abort"		: skip all remaining points
+	#
+	# Returns structured readings (see decode_readings) in the order of levels.
+	# Fields of skipped points are nan (False for flags). If data is given, 
+	# measured points are added to data[key] (with a level subkey) and the 
+	# outcome is stored in key metadata (see get_sweep_result). The range and
+	# autorange state of the sense function are restored after the sweep.
+	def sweep(self, _levels, reorder=False, headroom=1.2, policy="continue", failures=1, open_level=None, data=None, key=None):
+
+		_source, _sense = self.get_sweep_functions()
+		_source = self._functions[_source]
+
+		if _sense not in self.get_elements():
+			raise ValueError("Range planning requires %s readings"%_sense)
+
+		if policy not in self._policies:
+			raise ValueError("%s is not one of %s"%(policy, list(self._policies)))
+
+		if policy != "continue" and "STAT" not in self.get_elements():
+			raise ValueError("Compliance detection requires STAT readings")
+
+		_levels = np.asarray(_levels, dtype=float)
+		_readings = np.zeros(len(_levels), dtype=self.reading_dtype())
+		_measured = np.zeros(len(_levels), dtype=bool)
+
+		for _field in _readings.dtype.names:
+			if _readings.dtype[_field] == float:
+				_readings[_field] = np.nan
+
+		self._sweep_result = collections.OrderedDict([("points", len(_levels)), ("measured", 0), ("termination", None), ("termination_level", None)])
+
+		with self.get_lock():
+
+			_range = self._get_sense_range(_sense)
 
 			try:
-				return self.query(":READ?")
+				self._sweep_levels(_levels, reorder, _source, _sense, headroom, policy, failures, open_level, _readings, _measured)
+
+			finally:
+				self.set_sense_range(_sense, _range)
+
+		self._sweep_result["measured"] = int( _measured.sum() )
+
+		if data is not None:
+			self._sweep_to_data(data, key, _levels, _readings, _measured)
+
+		return _readings
+
+	# Measure sweep points in planned order and apply the policy on failed device
+	def _sweep_levels(self, _levels, _reorder, _source, _sense, _headroom, _policy, _failures, _open_level, _readings, _measured):
+
+		_skipped = np.zeros(len(_levels), dtype=bool)
+		_history, _failed = [], 0
+
+		for _index in self.plan_sweep(_levels, _reorder):
+
+			if _skipped[_index]:
+				continue
+
+			_level = _levels[_index]
+			_reading = self._sweep_point(_source, _sense, _level, _history, _headroom)
+			_readings[_index], _measured[_index] = _reading, True
+
+			# Failed device detection
+			_reason = self._check_reading(_reading, _sense, _open_level)
+			_failed = _failed + 1 if _reason is not None else 0
+
+			if _failed >= _failures and _policy != "continue":
+
+				self._sweep_result["termination"] = _reason
+				self._sweep_result["termination_level"] = float(_level)
+
+				if _policy == "abort":
+					_skipped[:] = True
+
+				else:
+					_skipped |= ( np.sign(_levels) == np.sign(_level) ) & ( np.abs(_levels) >= abs(_level) )
+
+				_failed = 0
+
+	# Source and sense function of a sweep ("VOLT" or "CURR"). Function 
+	# replies are normalized ("CURR:DC" and '"VOLT:DC","CURR:DC"' with 
+	# concurrent functions). Of several sense functions, the one which is not
+	# sourced is used. Raises ValueError on source memory or other functions.
+	def get_sweep_functions(self):
+
+		_source = self._parse_functions( self.get_value("source_function") )
+		_sense = self._parse_functions( self.get_value("sense_function") )
+
+		if len(_source) != 1 or _source[0] not in self._ranges:
+			raise ValueError("Sweep requires a %s source (source function is %s)"%(" or ".join(self._ranges.keys()), ",".join(_source)))
+
+		if len(_sense) > 1:
+			_sense = [ _ for _ in _sense if _ != _source[0] ]
+
+		if len(_sense) != 1 or _sense[0] not in self._ranges:
+			raise ValueError("Range planning requires a %s sense function (sense function is %s)"%(" or ".join(self._ranges.keys()), ",".join(_sense)))
+
+		return _source[0], _sense[0]
+
+	# Parse function reply into list of function names
+	@staticmethod
+	def _parse_functions(_reply):
+		return [ _.strip().strip('"').upper().split(":")[0] for _ in str(_reply).split(",") if _.strip().strip('"') ]
+
+	# Fixed range of function (None on autorange)
+	def _get_sense_range(self, _function):
+
+		_name = self._functions[_function]
+		return None if self.get_value("%s_autorange"%_name) else self.get_value("%s_range"%_name)
+
+	# Outcome of last sweep. Dictionary with number of points, number of 
+	# measured points, the termination reason ("compliance", "open" or None) 
+	# and the source level at which the policy was last applied.
+	def get_sweep_result(self):
+		return getattr(self, "_sweep_result", None)
+
+	# Measure one sweep point with range planning
+	def _sweep_point(self, _source, _sense, _level, _history, _headroom):
+
+		_predicted = self.predict_reading(_history, _level)
+		_range = None
+
+		if _predicted is not None:
+
+			_range = self.select_range(_sense, _headroom * _predicted)
+
+			# Too close to range boundary
+			if _range is not None and _headroom * _headroom * abs(_predicted) > _range:
+				_range = None
+
+		with self.batch():
+			self.set_value(_source, _level)
+			self.set_sense_range(_sense, _range)
+
+		_reading = self.meas_array()[-1]
+
+		if self._is_overflow(_reading, _sense) and _range is not None:
+			self.set_sense_range(_sense, None)
+			_reading = self.meas_array()[-1]
+
+		if not self._is_overflow(_reading, _sense):
+			_history.append( (_level, float( _reading[_sense.lower()] )) )
+
+		return _reading
+
+	# Check reading for failed device. Returns "compliance", "open" or None.
+	def _check_reading(self, _reading, _sense, _open_level):
+
+		if "compliance" in _reading.dtype.names and _reading["compliance"]:
+			return "compliance"
+
+		if _open_level is not None and abs( _reading[_sense.lower()] ) < _open_level:
+			return "open"
+
+		return None
+
+	# Store measured sweep points and sweep outcome in data object (the key
+	# is added if it does not exist)
+	def _sweep_to_data(self, _data, _key, _levels, _readings, _measured):
+
+		if _key is None:
+			_key = _data.add_hash_key("sweep")
+
+		elif _key not in _data.keys():
+			_data.add_key(_key)
+
+		_data.add_subkey(_key, "level")
+		_data.extend_subkey_data(_key, "level", _levels[_measured])
+
+		for _field in _readings.dtype.names:
+			_data.add_subkey(_key, _field)
+			_data.extend_subkey_data(_key, _field, _readings[_field][_measured].astype(float))
+
+		for _field, _value in self._sweep_result.items():
+			_data.set_metadata(_key, _field, _value)
+
+	# Check if reading overflows the measurement range
+	def _is_overflow(self, _reading, _sense):
+
+		if "overflow" in _reading.dtype.names and _reading["overflow"]:
+			return True
+
+		return abs( _reading[_sense.lower()] ) >= 9.9e37
+
+	# Split phase measurement. meas_start sends :READ? and returns at once, so
+	# the bus is free while the instrument integrates. The reading is read by 
+	# meas_fetch when query_ready is True (see QVisaBusScheduler).
+	def meas_start(self):
+		self.query_start(":READ?")
+
+	def meas_fetch(self):
+		return self.query_fetch()
+
+	#####################################
+	#  SOURCE MEMORY
+	#
+
+	# Save present setup to source memory location
+	def memory_save(self, _location):
+
+		if not ( 1 <= _location <= self._memory_size ):
+			raise ValueError("Memory location must be between 1 and %d"%self._memory_size)
+
+		self.write(":SOUR:MEM:SAVE %d"%_location)
+
+	# Recall setup from source memory location
+	def memory_recall(self, _location):
+
+		if not ( 1 <= _location <= self._memory_size ):
+			raise ValueError("Memory location must be between 1 and %d"%self._memory_size)
+
+		with self.get_lock():
+			self.write(":SOUR:MEM:REC %d"%_location)
+			self._invalidate_memory_settings()
+
+	# Upload sequence of configurations into consecutive source memory 
+	# locations (from start). Each configuration is a dictionary of command 
+	# table settings or a callable which configures the driver, e.g.
+	#
+	#	smu.upload_sequence([
+	#		{"source_function" : "VOLT", "sense_function" : "CURR", "voltage" : 1.0},
+	#		{"source_function" : "CURR", "sense_function" : "VOLT", "current" : 1e-3},
+	#	])
+	#
+	# A location holds the complete setup, so configurations only need to 
+	# give the settings which change. Returns the list of locations.
+	def upload_sequence(self, _configs, start=1):
+
+		if not ( 1 <= start and start + len(_configs) - 1 <= self._memory_size ):
+			raise ValueError("Sequence does not fit into source memory (%d locations)"%self._memory_size)
+
+		self._sequence = []
+
+		with self.get_lock():
+
+			for _location, _config in enumerate(_configs, start):
+
+				with self.batch():
+
+					if callable(_config):
+						_config(self)
+
+					else:
+						for _name, _value in _config.items():
+							self.set_value(_name, _value)
+
+					self.memory_save(_location)
+
+				self._sequence.append( (_location, self.get_meas_time() / self.get_value("trigger_count")) )
+
+		return [ _[0] for _ in self._sequence ]
+
+	# Run uploaded sequence as source memory sweep. The instrument steps 
+	# through the locations on its own (count readings, default one per 
+	# location) and the readings are returned by a single :READ? as a 
+	# structured array (see decode_readings). Afterwards the instrument holds 
+	# the setup of the last location. The source function (MEM during the 
+	# run) and the trigger count are restored to their values before the run.
+	def run_sequence(self, _count=None):
+
+		if self._sequence == []:
+			raise RuntimeError("No source memory sequence uploaded")
+
+		_count = _count if _count is not None else len(self._sequence)
+		_time = sum( self._sequence[_n % len(self._sequence)][1] for _n in range(_count) )
+
+		with self.get_lock():
+
+			_trigger_count = self.get_value("trigger_count")
+			_source = self._parse_functions( self.get_value("source_function") )
+
+			with self.batch():
+				self.set_memory_start(self._sequence[0][0])
+				self.set_memory_points(len(self._sequence))
+				self.set_source_function("MEM")
+				self.set_trigger_count(_count)
+
+			try:
+				with self.use_timeout( int(2000.0 * _time) + self._timeout_default ):
+					_buffer = self.query(":READ?")
+
+			finally:
+				self._invalidate_memory_settings()
+
+				with self.batch():
+					self.set_trigger_count(_trigger_count)
+
+					if _source != ["MEM"]:
+						self.set_source_function(_source[0])
+
+		return self.decode_readings(_buffer)
+
+	# Drop cached values of settings changed by a recall
+	def _invalidate_memory_settings(self):
+
+		for _name in self._memory_settings:
+			self.invalidate_state(_name)
+
+	#####################################
+	#  TRIGGERED ACQUISITION
+	#
+
+	# Arm for bus trigger (*TRG or GPIB GET) on the arm layer. After the 
+	# trigger, count readings are taken and operation complete is reported in 
+	# the event status summary bit (ESB) of the status byte. Used by 
+	# QVisaTriggerGroup for synchronized acquisition.
+	def trigger_arm(self, _count=1):
+
+		with self.get_lock():
+
+			if self._trigger_restore is None:
+				self._trigger_restore = ( self.get_value("arm_source"), self.get_value("trigger_count") )
+
+			with self.batch():
+				self.set_arm_source("BUS")
+				self.set_trigger_count(_count)
+				self.set_ese(1)
+				self.CLS()
+				self.write(":INIT")
+				self.OPC()
+
+	# Check if triggered readings are complete (serial poll)
+	def trigger_complete(self):
+		return ( self.read_stb() & 0x20 ) != 0
+
+	# Fetch triggered readings as structured array (see decode_readings)
+	def trigger_fetch(self):
+		return self.decode_readings( self.query(":FETC?") )
+
+	# Restore arm source and trigger count of the trigger model before arming
+	def trigger_disarm(self):
+
+		with self.get_lock():
+
+			_arm_source, _trigger_count = self._trigger_restore if self._trigger_restore is not None else ("IMM", None)
+
+			with self.batch():
+				self.abort()
+				self.set_arm_source(_arm_source)
+
+				if _trigger_count is not None:
+					self.set_trigger_count(_trigger_count)
+
+			self._trigger_restore = None
+
+	#####################################
+	#  READING FORMAT
+	#
+
+	# Select reading elements (:FORM:ELEM). Only the selected elements are 
+	# transferred, e.g. set_elements("CURR") for current only readings.
+	def set_elements(self, *_elements):
+
+		_selected = [ str(_).strip().upper()[:4] for _ in _elements ]
+
+		for _element in _selected:
+			if _element not in self._elements:
+				raise ValueError("%s is not one of %s"%(_element, list(self._elements)))
+
+		# Instrument returns elements in fixed order
+		_selected = tuple( _ for _ in self._elements if _ in _selected )
+
+		self.set_value("elements", ",".join(_selected))
+
+	# Get selected reading elements (tuple)
+	def get_elements(self):
+		return tuple( _.strip() for _ in self.get_value("elements").upper().split(",") )
+
+	# Reading dtype for selected elements. Element fields are lower case 
+	# (volt, curr, res, time, stat). If the status word is selected, it is 
+	# also decoded into boolean flags (overflow, compliance, range_compliance).
+	def reading_dtype(self):
+
+		_fields = [ (_.lower(), float) for _ in self.get_elements() ]
+
+		if "STAT" in self.get_elements():
+			_fields.extend( (_flag, bool) for _flag in self._status_flags.keys() )
+
+		return np.dtype(_fields)
+
+	# Decode reading string into structured array (one row per reading)
+	def decode_readings(self, _buffer):
+
+		_elements = self.get_elements()
+		_values = np.fromstring(_buffer, dtype=float, sep=",").reshape(-1, len(_elements))
+		_readings = np.empty(len(_values), dtype=self.reading_dtype())
+
+		for _i, _element in enumerate(_elements):
+			_readings[_element.lower()] = _values[:, _i]
+
+		if "STAT" in _elements:
+
+			_status = _readings["stat"].astype(np.int64)
+			for _flag, _bit in self._status_flags.items():
+				_readings[_flag] = ( _status & _bit ) != 0
+
+		return _readings
+
+	# Measure and decode readings into structured array
+	def meas_array(self, _retries=3):
+		return self.decode_readings( self.meas(_retries) )
+
+	#####################################
+	#  STREAMING
+	#
+
+	# Start continuous acquisition into the instrument buffer. Readings are 
+	# acquired in chunks of _chunk readings (at most the buffer size). A 
+	# background thread serial polls the instrument every _interval seconds, 
+	# drains a completed chunk with one :TRAC:DATA? and re-arms the next chunk
+	# immediately, so the bus is used once per chunk instead of once per 
+	# reading. Readings are passed to callback as a structured array (see 
+	# decode_readings) and/or appended to data[key] with one subkey per field.
+	# Returns the data key.
+	#
+	# Acquisition is not gapless. The buffer stops filling at the end of each
+	# chunk (feed control returns to NEVer) and the next chunk starts after 
+	# the chunk is detected (up to _interval), read and re-armed. Use a larger
+	# chunk or a shorter interval to reduce the share of the gaps, and the 
+	# TIME element (set_elements) to locate them.
+	def stream_start(self, _chunk=100, _interval=0.05, callback=None, data=None, key=None):
+
+		if self.is_streaming():
+			raise RuntimeError("Streaming is already running")
+
+		if not ( 1 <= _chunk <= self._buffer_size ):
+			raise ValueError("Chunk size must be between 1 and %d"%self._buffer_size)
+
+		if data is not None:
+
+			if key is None:
+				key = data.add_hash_key("stream")
+
+			elif key not in data.keys():
+				data.add_key(key)
+
+			for _field in self.reading_dtype().names:
+				data.add_subkey(key, _field)
+
+		self._stream_count = 0
+		self._stream_error = None
+		self._stream_halt = threading.Event()
+		self._stream_restore = ( self.get_value("trigger_count"), self.get_value("ese") )
+		self._stream_sink = ( callback, data, key )
+
+		self._stream = threading.Thread(target=self._stream_loop, args=(_chunk, _interval), daemon=True)
+		self._stream.start()
+
+		return key
+
+	# Stop streaming. Readings already stored of an incomplete chunk are 
+	# delivered, the trigger model and the event status enable register are
+	# restored. Returns the number of readings delivered. Errors of the 
+	# streaming thread are raised here.
+	def stream_stop(self, timeout=None):
+
+		if self._stream is None:
+			return 0
+
+		self._stream_halt.set()
+		self._stream.join(timeout)
+		_stopped = not self._stream.is_alive()
+		self._stream = None
+
+		_trigger_count, _ese = self._stream_restore
+
+		with self.get_lock():
+
+			self.abort()
+
+			# Partial chunk (only if the thread is not delivering a chunk)
+			if _stopped and self._stream_error is None and int( self.query(":TRAC:POIN:ACT?") ) > 0:
+				self._stream_deliver( self.query(":TRAC:DATA?") )
+
+			with self.batch():
+				self.set_buffer_feed("NEV")
+				self.buffer_clear()
+				self.set_trigger_count(_trigger_count)
+				self.set_ese(_ese)
+
+		if self._stream_error is not None:
+			raise self._stream_error
+
+		return self._stream_count
+
+	def is_streaming(self):
+		return self._stream is not None and self._stream.is_alive()
+
+	# Arm acquisition of one chunk. Operation complete is reported in 
+	# the event status summary bit (ESB) of the status byte.
+	def _stream_arm(self, _chunk):
+
+		with self.batch():
+			self.buffer_clear()
+			self.set_buffer_points(_chunk)
+			self.set_buffer_feed("NEXT")
+			self.set_trigger_count(_chunk)
+			self.set_ese(1)
+			self.CLS()
+			self.write(":INIT")
+			self.OPC()
+
+	def _stream_loop(self, _chunk, _interval):
+
+		try:
+			self._stream_arm(_chunk)
+
+			while not self._stream_halt.wait(_interval):
+
+				with self.get_lock():
+
+					if not ( self.read_stb() & 0x20 ):
+						continue
+
+					_buffer = self.query(":TRAC:DATA?")
+					self._stream_arm(_chunk)
+
+				self._stream_deliver(_buffer)
+
+		except Exception as e:
+			self._stream_error = e
+
+	# Decode buffer and pass readings to callback and/or data object
+	def _stream_deliver(self, _buffer):
+
+		_callback, _data, _key = self._stream_sink
+
+		_readings = self.decode_readings(_buffer)
+		self._stream_count += len(_readings)
+
+		if _data is not None:
+			for _field in _readings.dtype.names:
+				_data.extend_subkey_data(_key, _field, _readings[_field].astype(float))
 
-			except pyvisa.VisaIOError:
-				time.sleep(0.1)	
+		if _callback is not None:
+			_callback(_readings)
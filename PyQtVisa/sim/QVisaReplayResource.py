@@ -0,0 +1,146 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaReplayResource
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+
+import pyvisa
+from pyvisa.constants import StatusCode
+
+# Import QVisaTraceReader
+from ..drivers.QVisaTrace import QVisaTraceReader
+
+# Simulated resource which replays a trace recorded with QVisaDevice.start_recording.
+# Each operation (write, query, read, serial poll, trigger and clear) is 
+# matched against the next recorded operation and served with the recorded 
+# response (or VISA error) after the recorded duration multiplied by the 
+# time scale (0 replays as fast as possible). When timeline
+# is set, operations are also held back to their recorded start times so the
+# idle time between operations is reproduced.
+#
+#	_rm = QVisaSimResourceManager()
+#	_rm.add_resource( QVisaReplayResource("smu.trace", scale=1.0) )
+#	_rm.install()
+#
+# Operations which do not match the trace raise ValueError unless strict is
+# False, in which case the trace is searched forward for the next match.
+#
+
+class QVisaReplayResource:
+
+	def __init__(self, _filename, resource_name=None, scale=1.0, timeline=False, strict=True):
+
+		self._trace = QVisaTraceReader(_filename)
+		self.resource_name = resource_name if resource_name is not None else self._trace.resource
+
+		# Session timeout in milliseconds (not used for timing)
+		self.timeout = 2000
+
+		self.scale = scale
+		self.timeline = timeline
+		self.strict = strict
+
+		self._open = False
+		self.rewind()
+
+	# Restart replay from first record
+	def rewind(self):
+
+		self._cursor = 0
+		self._t0 = None
+
+	# Number of records which have not been replayed
+	def remaining(self):
+		return len(self._trace) - self._cursor
+
+	def open(self):
+		self._open = True
+
+	def close(self):
+		self._open = False
+
+	# Find next record matching operation and message
+	def _next(self, _op, _message):
+
+		_records = self._trace.records()
+
+		for _i in range(self._cursor, len(_records)):
+
+			if _records[_i][0] == _op and _records[_i][3] == str(_message):
+				self._cursor = _i + 1
+				return _records[_i]
+
+			if self.strict:
+				break
+
+		_expected = _records[self._cursor][:1] + _records[self._cursor][3:4] if self._cursor < len(_records) else "end of trace"
+		raise ValueError("Replay mismatch on %s %s (expected %s)"%(_op, _message, str(_expected)))
+
+	# Serve record with recorded timing
+	def _serve(self, _op, _message):
+
+		if not self._open:
+			raise pyvisa.errors.VisaIOError(StatusCode.error_invalid_object)
+
+		_op, _start, _duration, _, _response, _error = self._next(_op, _message)
+
+		if self._t0 is None:
+			self._t0 = time.perf_counter() - _start * self.scale
+
+		if self.timeline:
+			_wait = self._t0 + _start * self.scale - time.perf_counter()
+			if _wait > 0:
+				time.sleep(_wait)
+
+		if _duration > 0 and self.scale > 0:
+			time.sleep(_duration * self.scale)
+
+		if _error is not None:
+			raise pyvisa.errors.VisaIOError(_error)
+
+		return _response
+
+	def write(self, message, termination=None, encoding=None):
+
+		self._serve("write", message)
+		return len(message), StatusCode.success
+
+	def query(self, message, delay=None):
+		return self._serve("query", message)
+
+	def read(self, termination=None, encoding=None):
+		return self._serve("read", "")
+
+	def read_stb(self):
+		return int( self._serve("read_stb", "") )
+
+	def assert_trigger(self):
+		self._serve("assert_trigger", "")
+
+	def clear(self):
+		self._serve("clear", "")
@@ -0,0 +1,418 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaSimKeithley2400
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+
+# Import QVisaSimResource
+from .QVisaSimResource import QVisaSimResource
+
+# Simulated Keithley 2400 SourceMeter. The instrument sources into a resistive
+# load and implements the SCPI subset used by the keithley2400 driver. Each
+# reading costs the integration time (NPLC / line frequency) plus a fixed 
+# reading overhead, and autorange changes cost an additional settling time.
+# With autozero enabled each reading takes three conversions (signal, reference
+# and zero). The front panel display and the source delay add to each reading.
+#
+#	timing["line_frequency"]	= (float) 	Hz
+#	timing["reading_overhead"]	= (float) 	seconds per reading 
+#	timing["range_change"]		= (float) 	seconds per range change
+#	timing["autorange"]			= (float) 	seconds per reading with autorange enabled
+#	timing["display"]			= (float) 	seconds per reading with display enabled
+#	timing["source_delay"]		= (float) 	seconds per reading with auto source delay
+#
+# The load (ohms) can be changed at any time to model a short (0) or an 
+# open (float("inf")) device under test.
+#
+# The reading buffer (:TRACe subsystem) is filled on :INIT when the feed 
+# control is set to NEXT. The feed control returns to NEVer once the buffer
+# is full, as on the instrument.
+#
+# Source memory locations (:SOUR:MEM:SAVE) hold a copy of the source and 
+# measure setup. With :SOUR:FUNC MEM each reading of :INIT recalls the next 
+# location of the source memory sweep (:SOUR:MEM:STAR, :SOUR:MEM:POIN).
+# Source memory is not cleared by *RST.
+#
+# With :ARM:SOUR BUS, :INIT arms the instrument and the readings are taken on
+# the next bus trigger (*TRG or GET). Operation complete is pending until then.
+#
+
+class QVisaSimKeithley2400(QVisaSimResource):
+
+	# Default timing model
+	_timing = dict(QVisaSimResource._timing, **{
+		"line_frequency"	: 50.0,
+		"reading_overhead"	: 1.0e-3,
+		"range_change"		: 5.0e-3,
+		"autorange"			: 1.0e-3,
+		"display"			: 1.0e-3,
+		"source_delay"		: 1.0e-3,
+	})
+
+	# Measurement ranges
+	_ranges = {
+		"CURR" : [1.05e-6, 1.05e-5, 1.05e-4, 1.05e-3, 1.05e-2, 1.05e-1, 1.05],
+		"VOLT" : [0.21, 2.1, 21.0, 210.0],
+	}
+
+	# Default settings after *RST (normalized SCPI headers)
+	_defaults = {
+		"OUTP:STAT"				: "0",
+		"SYST:RSEN"				: "0",
+		"ROUT:TERM"				: "FRON",
+		"SOUR:FUNC"				: "VOLT",
+		"SOUR:VOLT:MODE"		: "FIX",
+		"SOUR:CURR:MODE"		: "FIX",
+		"SOUR:VOLT:LEV"			: "0",
+		"SOUR:CURR:LEV"			: "0",
+		"SENS:FUNC"				: "CURR",
+		"SENS:CURR:PROT"		: "1.05E-4",
+		"SENS:VOLT:PROT"		: "21",
+		"SENS:CURR:NPLC"		: "1",
+		"SENS:VOLT:NPLC"		: "1",
+		"SENS:CURR:RANG"		: "1.05E-4",
+		"SENS:CURR:RANG:AUTO"	: "1",
+		"SENS:VOLT:RANG"		: "21",
+		"SENS:VOLT:RANG:AUTO"	: "1",
+		"TRIG:COUN"				: "1",
+		"ARM:COUN"				: "1",
+		"ARM:SOUR"				: "IMM",
+		"FORM:ELEM"				: "VOLT,CURR,RES,TIME,STAT",
+		"TRAC:POIN"				: "100",
+		"TRAC:FEED"				: "SENS",
+		"TRAC:FEED:CONT"		: "NEV",
+		"SYST:AZER:STAT"		: "1",
+		"DISP:ENAB"				: "1",
+		"SOUR:DEL:AUTO"			: "1",
+		"SOUR:DEL"				: "0",
+		"SOUR:MEM:STAR"			: "1",
+		"SOUR:MEM:POIN"			: "1",
+	}
+
+	# Size of reading buffer
+	_buffer_size = 2500
+
+	# Source memory. Settings with these prefixes are not part of a setup.
+	_memory_size = 100
+	_memory_exclude = ("FORM:", "TRAC:", "TRIG:", "ARM:", "SOUR:MEM:")
+
+	# Header aliases (optional SCPI nodes)
+	_aliases = {
+		"OUTP"				: "OUTP:STAT",
+		"SOUR:VOLT"			: "SOUR:VOLT:LEV",
+		"SOUR:CURR"			: "SOUR:CURR:LEV",
+		"SOUR:VOLT:LEV:IMM"	: "SOUR:VOLT:LEV",
+		"SOUR:CURR:LEV:IMM"	: "SOUR:CURR:LEV",
+		"FORM:ELEM:SENS"	: "FORM:ELEM",
+		"SYST:AZER"			: "SYST:AZER:STAT",
+	}
+
+	def __init__(self, resource_name="GPIB0::24::INSTR", load=1.0e3, noise=1.0e-4, scale=1.0, **timing):
+
+		# Device under test
+		self.load = load
+		self.noise = noise
+
+		# Source memory locations
+		self._memory = {}
+
+		QVisaSimResource.__init__(self, resource_name, 
+			idn="KEITHLEY INSTRUMENTS INC.,MODEL 2400,0000000,C30   Mar 17 2006 09:29:29/A02  /K/J", 
+			scale=scale, **timing)
+
+	# Reset instrument state (*RST)
+	def reset(self):
+
+		QVisaSimResource.reset(self)
+		self.settings.update(self._defaults)
+
+		self._t0 = self._clock()
+		self._readings = []
+		self._buffer = []
+		self._armed = False
+
+	#####################################
+	#  COMMAND HANDLERS
+	#
+
+	def handle_command(self, _header, _args):
+
+		_header = self._aliases.get(_header, _header)
+
+		# Boolean arguments are stored as 1/0 (as returned by queries)
+		_args = {"ON" : "1", "OFF" : "0"}.get(_args.upper(), _args)
+
+		if _header == "INIT" and self.settings["ARM:SOUR"].upper().startswith("BUS"):
+			self._armed = True
+
+		elif _header == "INIT":
+			self.initiate()
+
+		elif _header == "ABOR":
+			self._armed = False
+
+		elif _header == "TRAC:CLE":
+			self._buffer = []
+
+		elif _header == "TRAC:POIN" and not ( 1 <= int(float(_args)) <= self._buffer_size ):
+			self.push_error(-222, "Data out of range")
+
+		# Zero once (autozero state is unchanged)
+		elif _header == "SYST:AZER:STAT" and _args.upper() == "ONCE":
+			self._busy_for( 2.0 * self._integration_time() )
+
+		# Selecting a range disables autorange. Range changes settle.
+		elif _header in ("SENS:CURR:RANG", "SENS:VOLT:RANG"):
+
+			_range = self.select_range(_header.split(":")[1], float(_args))
+
+			if abs( _range - self._get(_header) ) > 1e-12 * _range:
+				self._busy_for( self.timing["range_change"] )
+
+			self.settings[_header] = "%.3E"%_range
+			self.settings["%s:AUTO"%_header] = "0"
+
+		elif _header in ("SOUR:MEM:SAVE", "SOUR:MEM:REC") and not ( 1 <= int(float(_args)) <= self._memory_size ):
+			self.push_error(-222, "Data out of range")
+
+		elif _header == "SOUR:MEM:SAVE":
+			self._memory[int(float(_args))] = { _k : _v for _k, _v in self.settings.items() if not _k.startswith(self._memory_exclude) }
+
+		elif _header == "SOUR:MEM:REC":
+			self.recall(int(float(_args)))
+
+		# Selecting a delay disables auto delay
+		elif _header == "SOUR:DEL":
+			self.settings["SOUR:DEL:AUTO"] = "0"
+			QVisaSimResource.handle_command(self, _header, _args)
+
+		else:
+			QVisaSimResource.handle_command(self, _header, _args)
+
+	def handle_query(self, _header, _args):
+
+		_header = self._aliases.get(_header, _header)
+
+		if _header == "READ":
+			self.initiate()
+			return self.fetch()
+
+		if _header == "MEAS":
+			self.initiate()
+			return self.fetch()
+
+		if _header == "FETC":
+			return self.fetch()
+
+		if _header == "TRAC:DATA":
+			return self.format_readings(self._buffer)
+
+		if _header == "TRAC:POIN:ACT":
+			return str( len(self._buffer) )
+
+		return QVisaSimResource.handle_query(self, _header, _args)
+
+	#####################################
+	#  MEASUREMENT MODEL
+	#
+
+	# Get numeric setting
+	def _get(self, _header):
+		return float( self.settings[_header] )
+
+	# Source function and sense function
+	def _source(self):
+		return "CURR" if self.settings["SOUR:FUNC"].upper().startswith("CURR") else "VOLT"
+
+	def _sense(self):
+		return "VOLT" if self.settings["SENS:FUNC"].upper().startswith("VOLT") else "CURR"
+
+	# Integration time of one conversion
+	def _integration_time(self):
+		return self._get("SENS:%s:NPLC"%self._sense()) / self.timing["line_frequency"]
+
+	# Time of one reading
+	def reading_time(self):
+
+		_conversions = 3.0 if self.settings["SYST:AZER:STAT"] == "1" else 1.0
+		_display = self.timing["display"] if self.settings["DISP:ENAB"] == "1" else 0.0
+		_delay = self.timing["source_delay"] if self.settings["SOUR:DEL:AUTO"] == "1" else self._get("SOUR:DEL")
+
+		return _conversions * self._integration_time() + _display + _delay + self.timing["reading_overhead"]
+
+	# Number of readings per :INIT
+	def reading_count(self):
+		return int( self._get("TRIG:COUN") ) * int( self._get("ARM:COUN") )
+
+	# Bus trigger. Take readings if armed.
+	def trigger(self):
+
+		if self._armed:
+			self._armed = False
+			self.initiate()
+
+	# Operation complete is pending while armed
+	def event_status(self):
+		return self._esr if self._armed else QVisaSimResource.event_status(self)
+
+	# Recall source memory location (empty locations hold the *RST setup)
+	def recall(self, _location):
+		self.settings.update( self._memory.get(_location, { _k : _v for _k, _v in self._defaults.items() if not _k.startswith(self._memory_exclude) }) )
+
+	# Initiate measurement. The instrument is busy for the duration of all
+	# readings. Readings are computed up front and returned by :FETC?
+	def initiate(self):
+
+		_duration, self._readings = 0.0, []
+		_memory = self.settings["SOUR:FUNC"].upper().startswith("MEM")
+
+		for _n in range( self.reading_count() ):
+
+			# Source memory sweep
+			if _memory:
+				self.recall( int( self._get("SOUR:MEM:STAR") ) + _n % int( self._get("SOUR:MEM:POIN") ) )
+
+			_reading, _time = self.gen_reading()
+			_duration += _time
+
+			self._readings.append(_reading)
+
+		self._busy_for(_duration)
+
+		if _memory:
+			self.settings["SOUR:FUNC"] = "MEM"
+
+		# Store readings in buffer
+		if self.settings["TRAC:FEED:CONT"].upper().startswith("NEXT"):
+
+			_points = int( self._get("TRAC:POIN") )
+			self._buffer.extend( self._readings[:_points - len(self._buffer)] )
+
+			if len(self._buffer) >= _points:
+				self.settings["TRAC:FEED:CONT"] = "NEV"
+
+	# Return readings of last measurement in :FORM:ELEM order
+	def fetch(self):
+		return self.format_readings(self._readings)
+
+	# Format readings. Elements selected with :FORM:ELEM are always returned 
+	# in the fixed order VOLT, CURR, RES, TIME, STAT.
+	def format_readings(self, _readings):
+
+		_selected = [ _.strip().upper()[:4] for _ in self.settings["FORM:ELEM"].split(",") ]
+		_elements = [ _ for _ in ("VOLT", "CURR", "RES", "TIME", "STAT") if _ in _selected ]
+		_values = []
+
+		for _reading in _readings:
+			_values.extend( "%+.6E"%_reading[_element] for _element in _elements if _element in _reading )
+
+		return ",".join(_values)
+
+	# Generate one reading. Returns reading dictionary and reading time.
+	def gen_reading(self):
+
+		_time = self.reading_time()
+		_status = 0
+
+		# Source level (output off sources nothing)
+		_output = self.settings["OUTP:STAT"] == "1"
+		_level = self._get("SOUR:%s:LEV"%self._source()) if _output else 0.0
+
+		# Ohmic load with compliance
+		if self._source() == "VOLT":
+
+			_v = _level
+			_i = _v / self.load if self.load != 0 else float("inf") * (1 if _v >= 0 else -1)
+			_cmp = self._get("SENS:CURR:PROT")
+
+			if abs(_i) > _cmp:
+				_i = _cmp if _i > 0 else -_cmp
+				_v = _i * self.load if self.load != float("inf") else _v
+				_status |= 0x08
+
+		else:
+
+			_i = _level
+			_v = _i * self.load if self.load != float("inf") else float("inf") * (1 if _i >= 0 else -1)
+			_cmp = self._get("SENS:VOLT:PROT")
+
+			if abs(_v) > _cmp:
+				_v = _cmp if _v > 0 else -_cmp
+				_i = _v / self.load if self.load != 0 else _i
+				_status |= 0x08
+
+		# Measurement noise
+		_v *= 1.0 + random.gauss(0, self.noise)
+		_i *= 1.0 + random.gauss(0, self.noise)
+
+		# Measurement range on sense function
+		_sense = self._sense()
+		_value = _v if _sense == "VOLT" else _i
+		_value, _range_time = self._apply_range(_sense, _value)
+		_time += _range_time
+
+		if _sense == "VOLT":
+			_v = _value
+		else:
+			_i = _value
+
+		_reading = {
+			"VOLT" : _v,
+			"CURR" : _i,
+			"RES"  : _v / _i if _i != 0 else 9.91e37,
+			"TIME" : self._clock() - self._t0,
+			"STAT" : float(_status),
+		}
+
+		return _reading, _time
+
+	# Smallest range of function which holds value (largest range if none)
+	def select_range(self, _function, _value):
+		return next( ( _r for _r in self._ranges[_function] if abs(_value) <= _r ), self._ranges[_function][-1] )
+
+	# Apply measurement range. Autorange selects the smallest range which 
+	# holds the value (with settling time on range change). On a fixed range
+	# values beyond the range overflow (9.9E37).
+	def _apply_range(self, _sense, _value):
+
+		_current = self._get("SENS:%s:RANG"%_sense)
+
+		if self.settings["SENS:%s:RANG:AUTO"%_sense] == "1":
+
+			_range = self.select_range(_sense, _value)
+
+			if abs(_range - _current) > 1e-12 * _range:
+				self.settings["SENS:%s:RANG"%_sense] = "%.3E"%_range
+				return _value, self.timing["autorange"] + self.timing["range_change"]
+
+			return _value, self.timing["autorange"]
+
+		if abs(_value) > _current * 1.0001:
+			return 9.9e37, 0.0
+
+		return _value, 0.0
@@ -0,0 +1,367 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaSimResource
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+import time
+import collections
+
+import pyvisa
+from pyvisa.constants import StatusCode
+
+# In-process simulated VISA resource. Implements the subset of the pyvisa
+# resource interface used by QVisaDevice (write, read, query, read_stb, 
+# assert_trigger, clear, close and timeout) together with the IEEE-488.2 
+# common commands. Instrument models subclass this and implement 
+# handle_command() and handle_query().
+#
+# Timing is modelled without threads. Every bus transaction costs a fixed
+# overhead plus a per-command parse latency. Instrument operations (e.g. 
+# integration) set a busy time. Responses are queued with the time at which 
+# they become ready, and read() blocks until then or raises a VISA timeout 
+# when the response would not be ready within the session timeout. All
+# durations are multiplied by the time scale (0 disables sleeping).
+#
+#	timing["gpib_overhead"]		= (float) 	seconds per bus transaction
+#	timing["command_latency"]	= (float) 	seconds per parsed command
+#	timing["byte_time"]			= (float) 	seconds per transferred byte
+#
+# Bus faults can be injected with inject_fault(). The session then fails all
+# I/O until it is reopened (e.g. by QVisaDevice.reconnect).
+#
+
+class QVisaSimResource:
+
+	# Default timing model
+	_timing = {
+		"gpib_overhead"		: 1.0e-3,
+		"command_latency"	: 0.1e-3,
+		"byte_time"			: 1.0e-6,
+	}
+
+	def __init__(self, resource_name, idn="PyQtVisa,QVisaSimResource,0,1.0", scale=1.0, **timing):
+
+		self.resource_name = resource_name
+		self.idn = idn
+
+		# Session timeout in milliseconds (None = infinite)
+		self.timeout = 2000
+
+		# Timing model and time scale
+		self.timing = dict(self._timing)
+		self.timing.update(timing)
+		self.scale = scale
+
+		# Session state 
+		self._open = False
+		self._fault = None
+		self.reset()
+
+	#####################################
+	#  STATE
+	#
+
+	# Reset instrument state (*RST)
+	def reset(self):
+
+		self._output = collections.deque()
+		self._busy = self._clock()
+		self._esr = 0
+		self._ese = 0
+		self._sre = 0
+		self._opc_pending = False
+		self._errors = collections.deque()
+		self.settings = {}
+
+	# Clock in simulated seconds
+	def _clock(self):
+		return time.perf_counter()
+
+	# Wait for a simulated duration
+	def _delay(self, _seconds):
+
+		if _seconds > 0 and self.scale > 0:
+			time.sleep(_seconds * self.scale)
+
+	# Mark instrument busy for a simulated duration. Returns completion time
+	def _busy_for(self, _seconds):
+
+		self._busy = max(self._busy, self._clock()) + _seconds * self.scale
+		return self._busy
+
+	# Push error on error queue
+	def push_error(self, _code, _message):
+		self._errors.append( (_code, _message) )
+
+	#####################################
+	#  PYVISA INTERFACE
+	#
+
+	def open(self):
+		self._open = True
+		self._fault = None
+
+	def close(self):
+		self._open = False
+
+	# Inject bus fault. All I/O raises the VISA error until the session is
+	# reopened. If reset is set the instrument also loses its configuration 
+	# (e.g. power glitch).
+	def inject_fault(self, _error=StatusCode.error_connection_lost, reset=False):
+
+		self._fault = _error
+
+		if reset:
+			self.reset()
+
+	# Raise VISA error for closed or faulted session
+	def _check_open(self):
+
+		if not self._open:
+			raise pyvisa.errors.VisaIOError(StatusCode.error_invalid_object)
+
+		if self._fault is not None:
+			raise pyvisa.errors.VisaIOError(self._fault)
+
+	# Write message. Messages may contain several commands separated by ';'
+	def write(self, message, termination=None, encoding=None):
+
+		self._check_open()
+
+		_commands = [ _.strip() for _ in message.strip().split(";") if _.strip() != "" ]
+		self._delay( self.timing["gpib_overhead"] + self.timing["command_latency"] * len(_commands) + self.timing["byte_time"] * len(message) )
+
+		_responses = []
+		for _command in _commands:
+
+			_response = self._dispatch(_command)
+			if _response is not None:
+				_responses.append( str(_response) )
+
+		# Responses of queries in one message are joined (IEEE-488.2)
+		if _responses != []:
+			self._output.append( [max(self._busy, self._clock()), ";".join(_responses)] )
+
+		return len(message), StatusCode.success
+
+	# Read response. Blocks until the response is ready or raises a VISA 
+	# timeout error if the response would not be ready within the timeout
+	def read(self, termination=None, encoding=None):
+
+		self._check_open()
+
+		_timeout = None if self.timeout is None else self.timeout / 1000.0
+		_now = self._clock()
+
+		# Nothing queued. Wait for the full timeout.
+		if len(self._output) == 0:
+
+			self._delay( _timeout if _timeout is not None else 0 )
+			raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+
+		_ready, _response = self._output[0]
+		_wait = _ready - _now
+
+		# Response is not ready within the timeout (response stays queued)
+		if _timeout is not None and _wait > _timeout * self.scale:
+
+			self._delay(_timeout)
+			raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+
+		if _wait > 0:
+			time.sleep(_wait)
+
+		self._delay( self.timing["gpib_overhead"] + self.timing["byte_time"] * len(_response) )
+		self._output.popleft()
+		return _response
+
+	# Query (write followed by read)
+	def query(self, message, delay=None):
+
+		self.write(message)
+		return self.read()
+
+	# Serial poll. Status byte with MAV (bit 4) and ESB (bit 5) summaries.
+	def read_stb(self):
+
+		self._check_open()
+		self._delay( self.timing["gpib_overhead"] )
+		return self.status_byte()
+
+	# Device trigger (GPIB GET)
+	def assert_trigger(self):
+
+		self._check_open()
+		self._delay( self.timing["gpib_overhead"] )
+		self.trigger()
+
+	# Device clear
+	def clear(self):
+
+		self._check_open()
+		self._output.clear()
+
+	#####################################
+	#  STATUS MODEL
+	#
+
+	# Status byte register
+	def status_byte(self):
+
+		_now = self._clock()
+		_stb = 0
+
+		# Message available
+		if len(self._output) > 0 and self._output[0][0] <= _now:
+			_stb |= 0x10
+
+		# Event status summary. Operation complete (ESR bit 0) is set 
+		# once the instrument is no longer busy.
+		if ( self.event_status() & self._ese ) != 0:
+			_stb |= 0x20
+
+		# Request service
+		if ( _stb & self._sre ) != 0:
+			_stb |= 0x40
+
+		return _stb
+
+	# Event status register (without clearing)
+	def event_status(self):
+
+		if self._opc_pending and self._busy <= self._clock():
+			self._esr |= 0x01
+			self._opc_pending = False
+
+		return self._esr
+
+	#####################################
+	#  COMMAND DISPATCH
+	#
+
+	# Normalize SCPI header to upper case short form (e.g. :SENSe:CURRent:NPLCycles 
+	# -> SENS:CURR:NPLC). Short form is the first four characters of a node, or 
+	# three if the fourth character is a vowel.
+	@staticmethod
+	def normalize(_header):
+
+		_nodes = []
+		for _node in _header.strip().lstrip(":").upper().split(":"):
+
+			_query = _node.endswith("?")
+			_node = _node.rstrip("?")
+
+			m = re.match(r'^(\*?[A-Z]+)(\d*)$', _node)
+			if m and not m.group(1).startswith("*") and len(m.group(1)) > 4:
+				_node = m.group(1)[:3] if m.group(1)[3] in "AEIOU" else m.group(1)[:4]
+				_node += m.group(2)
+
+			_nodes.append( _node + ("?" if _query else "") )
+
+		return ":".join(_nodes)
+
+	# Dispatch one command. Returns response for queries.
+	def _dispatch(self, _command):
+
+		_parts = _command.split(None, 1)
+		_header = self.normalize(_parts[0])
+		_args = _parts[1].strip() if len(_parts) > 1 else ""
+
+		if _header.endswith("?"):
+			return self.handle_query(_header[:-1], _args)
+
+		self.handle_command(_header, _args)
+		return None
+
+	# Handle command. Common commands are handled here and everything else
+	# is stored in the settings dictionary.
+	def handle_command(self, _header, _args):
+
+		if _header == "*RST":
+			self.reset()
+
+		elif _header == "*CLS":
+			self._esr = 0
+			self._errors.clear()
+
+		elif _header == "*OPC":
+			self._opc_pending = True
+
+		elif _header == "*ESE":
+			self._ese = int(float(_args or 0))
+
+		elif _header == "*SRE":
+			self._sre = int(float(_args or 0))
+
+		elif _header == "*TRG":
+			self.trigger()
+
+		elif _header == "*WAI":
+			pass
+
+		else:
+			self.settings[_header] = _args.strip('"\'')
+
+	# Handle query. Returns the response string.
+	def handle_query(self, _header, _args):
+
+		if _header == "*IDN":
+			return self.idn
+
+		if _header == "*OPC":
+			return "1"
+
+		if _header == "*STB":
+			return str( self.status_byte() )
+
+		if _header == "*ESR":
+			_esr = self.event_status()
+			self._esr = 0
+			return str(_esr)
+
+		if _header == "*ESE":
+			return str(self._ese)
+
+		if _header == "*SRE":
+			return str(self._sre)
+
+		if _header == "*TST":
+			return "0"
+
+		if _header == "SYST:ERR":
+			return '%d,"%s"'%self._errors.popleft() if len(self._errors) > 0 else '0,"No error"'
+
+		if _header in self.settings:
+			return self.settings[_header]
+
+		self.push_error(-113, "Undefined header")
+		return ""
+
+	# Trigger event (*TRG or GET). Instrument models override this.
+	def trigger(self):
+		pass
@@ -0,0 +1,104 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaSimResourceManager
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import fnmatch
+import collections
+
+import pyvisa
+from pyvisa.constants import StatusCode
+
+# Import shared resource manager setter
+from ..drivers.QVisaResourceManager import set_resource_manager
+
+# In-process fake of the pyvisa ResourceManager which serves simulated 
+# resources (QVisaSimResource objects). Installing it as the shared resource 
+# manager makes QVisaDevice drivers and resource widgets use the simulated 
+# instruments instead of real hardware:
+#
+#	_rm = QVisaSimResourceManager()
+#	_rm.add_resource( QVisaSimKeithley2400("GPIB0::24::INSTR") )
+#	_rm.install()
+#
+#	_smu = keithley2400("GPIB0::24::INSTR")
+#
+
+class QVisaSimResourceManager:
+
+	def __init__(self):
+		self._resources = collections.OrderedDict()
+
+	# Add simulated resource
+	def add_resource(self, _resource):
+
+		self._resources[_resource.resource_name] = _resource
+		return _resource
+
+	# Get simulated resource (e.g. to change the load of a model)
+	def get_resource(self, _resource_name):
+		return self._resources[_resource_name]
+
+	# Remove simulated resource
+	def remove_resource(self, _resource_name):
+		self._resources.pop(_resource_name, None)
+
+	# List resources. VISA query wildcards (?*) are mapped to glob syntax.
+	def list_resources(self, query="?*::INSTR"):
+
+		_pattern = query.replace("?*", "*")
+		return tuple( _ for _ in self._resources.keys() if fnmatch.fnmatchcase(_, _pattern) )
+
+	# Open resource. Keyword arguments are set as resource attributes.
+	def open_resource(self, resource_name, **kwargs):
+
+		if resource_name not in self._resources:
+			raise pyvisa.errors.VisaIOError(StatusCode.error_resource_not_found)
+
+		_resource = self._resources[resource_name]
+		_resource.open()
+
+		for _key, _value in kwargs.items():
+			setattr(_resource, _key, _value)
+
+		return _resource
+
+	# Close all resources
+	def close(self):
+
+		for _resource in self._resources.values():
+			_resource.close()
+
+	# Install as shared resource manager
+	def install(self):
+
+		set_resource_manager(self)
+		return self
+
+	# Restore pyvisa resource manager
+	def uninstall(self):
+		set_resource_manager(None)
@@ -0,0 +1,368 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaDataIndex
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import json
+import fnmatch
+import collections
+
+# Import QVisaDataObject and QVisaMetaTable
+from .QVisaDataObject import QVisaDataObject
+from .QVisaMetaTable import QVisaMetaTable
+
+# Class to index a directory of saved QVisaDataObject files. Each file is scanned
+# once via QVisaDataObject.scan_file (no data values are parsed) and the result is
+# kept in a persistent catalog file in the directory. The catalog is updated
+# incrementally: only files whose size or modification time has changed are
+# scanned again. Catalog entries take the following format:
+#
+#	[<filename>]
+#		["mtime"]	= (int)
+#		["size"]	= (int)
+#		["hash"]	= (str) 	root hash (None if not a QVisaDataObject file)
+#		["note"]	= (str)
+#		["meta"]	= (dict)	toplevel metadata
+#		["keys"]	= { <key> : {"offset" : (int), "meta" : (dict), "subkeys" : (list), "rows" : (int)} }
+#
+# Filenames are stored relative to the indexed directory. Metadata values are
+# stored in the catalog with QVisaMetaTable.encode_value so they keep their types.
+#
+
+class QVisaDataIndex:
+
+	# Catalog format version
+	_version = 1
+
+	def __init__(self, _path, _catalog=None, _pattern="*", recursive=False):
+
+		# Indexed directory and catalog file
+		self._path = os.path.abspath(_path)
+		self._catalog = _catalog if _catalog is not None else os.path.join(self._path, ".qvisaindex")
+		self._pattern = _pattern
+		self._recursive = recursive
+
+		# Catalog entries and lookup tables
+		self._entries = collections.OrderedDict()
+		self._gen_lookup()
+
+		# Load existing catalog
+		self.load_catalog()
+
+	#####################################
+	#  CATALOG MAINTENANCE
+	#
+
+	# Scan directory and update catalog. Returns a dictionary with lists of
+	# added, updated and removed files.
+	def update(self, save=True):
+
+		_changes = {"added" : [], "updated" : [], "removed" : []}
+		_found = set()
+
+		for _filename, _stat in self._list_files():
+
+			_found.add(_filename)
+			_entry = self._entries.get(_filename)
+
+			# File has not changed
+			if _entry is not None and _entry["mtime"] == _stat.st_mtime_ns and _entry["size"] == _stat.st_size:
+				continue
+
+			self._entries[_filename] = self._gen_entry(_filename, _stat)
+			_changes["added" if _entry is None else "updated"].append(_filename)
+
+		# Drop files which no longer exist
+		for _filename in list( self._entries.keys() ):
+
+			if _filename not in _found:
+				del self._entries[_filename]
+				_changes["removed"].append(_filename)
+
+		# Regenerate lookup tables and save catalog
+		if any( _changes.values() ):
+
+			self._gen_lookup()
+
+			if save:
+				self.save_catalog()
+
+		return _changes
+
+	# Method to load catalog from file
+	def load_catalog(self):
+
+		if not os.path.isfile(self._catalog):
+			return False
+
+		try:
+			with open(self._catalog, 'r') as f:
+				_catalog = json.load(f)
+
+		except ValueError:
+			return False
+
+		# Discard catalogs written in another format
+		if _catalog.get("version") != self._version:
+			return False
+
+		self._entries = collections.OrderedDict()
+		for _filename, _entry in _catalog["files"].items():
+			self._entries[_filename] = self._decode_entry(_entry)
+
+		self._gen_lookup()
+		return True
+
+	# Method to save catalog to file. The catalog is written to a temporary
+	# file first so that an interrupted save does not corrupt the catalog.
+	def save_catalog(self):
+
+		_catalog = {
+			"version" 	: self._version,
+			"files" 	: collections.OrderedDict( (_f, self._encode_entry(_e)) for _f, _e in self._entries.items() )
+		}
+
+		_tmp = "%s.tmp"%self._catalog
+		with open(_tmp, 'w') as f:
+			json.dump(_catalog, f)
+
+		os.replace(_tmp, self._catalog)
+
+	#####################################
+	#  LOOKUPS
+	#
+
+	# Get indexed directory
+	def get_path(self):
+		return self._path
+
+	# Get list of indexed QVisaDataObject files
+	def files(self):
+		return [ _f for _f, _e in self._entries.items() if _e["hash"] is not None ]
+
+	# Get catalog entry for file
+	def get_entry(self, _filename):
+		return self._entries.get( self._relpath(_filename) )
+
+	# Get file by root hash
+	def find_hash(self, _hash):
+		return self._hashes.get(_hash)
+
+	# Get list of files by note. Matches on substring.
+	def find_note(self, _note):
+		return [ _f for _f in self.files() if self._entries[_f]["note"] is not None and str(_note) in str(self._entries[_f]["note"]) ]
+
+	# Get list of (filename, key) pairs. All given conditions must hold:
+	#	hash 	: root hash of file
+	#	note	: substring of file note
+	#	key		: data key
+	#	subkey	: data subkey present on key
+	#	**meta	: key metadata values (equality)
+	def find(self, hash=None, note=None, key=None, subkey=None, **meta):
+
+		# Candidate (filename, key) pairs
+		if key is not None:
+			_pairs = [ (_f, key) for _f in self._keys.get(key, []) ]
+
+		elif subkey is not None:
+			_pairs = list( self._subkeys.get(subkey, []) )
+
+		else:
+			_pairs = [ (_f, _k) for _f in self.files() for _k in self._entries[_f]["keys"].keys() ]
+
+		# Filter on file properties
+		if hash is not None:
+			_pairs = [ _ for _ in _pairs if self._entries[_[0]]["hash"] == hash ]
+
+		if note is not None:
+			_files = set( self.find_note(note) )
+			_pairs = [ _ for _ in _pairs if _[0] in _files ]
+
+		if subkey is not None:
+			_pairs = [ _ for _ in _pairs if subkey in self._entries[_[0]]["keys"][_[1]]["subkeys"] ]
+
+		# Filter on key metadata
+		for _field, _value in meta.items():
+			_pairs = [ _ for _ in _pairs if self._entries[_[0]]["keys"][_[1]]["meta"].get(_field) == _value ]
+
+		return _pairs
+
+	# Method to generate meta table over all indexed keys. Rows are keyed on
+	# (filename, key) tuples. In addition to the key metadata, the table has
+	# columns for __file__, __hash__, __note__ and __rows__ so keys can be
+	# selected with vectorized expressions.
+	def get_meta_table(self):
+
+		if self._table is None:
+
+			self._table = QVisaMetaTable()
+			for _filename in self.files():
+
+				_entry = self._entries[_filename]
+				for _key, _data in _entry["keys"].items():
+
+					_row = (_filename, _key)
+					self._table.add_row(_row)
+					self._table.set_value(_row, "__file__", _filename)
+					self._table.set_value(_row, "__hash__", _entry["hash"])
+					self._table.set_value(_row, "__note__", _entry["note"])
+					self._table.set_value(_row, "__rows__", _data["rows"])
+
+					for _field, _value in _data["meta"].items():
+						self._table.set_value(_row, _field, _value)
+
+		return self._table
+
+	#####################################
+	#  DATA ACCESS
+	#
+
+	# Method to load data. If key is given, only that data block is read
+	# using the byte offset stored in the catalog.
+	def load(self, _filename, _key=None):
+
+		_filename = self._relpath(_filename)
+		_data = QVisaDataObject()
+
+		if _key is None:
+			_data.read_from_file( os.path.join(self._path, _filename) )
+
+		else:
+			_data.read_key_from_file( os.path.join(self._path, _filename), _key, self._entries[_filename]["keys"][_key]["offset"] )
+
+		return _data
+
+	#####################################
+	#  INTERNAL METHODS
+	#
+
+	# Method to get path relative to indexed directory
+	def _relpath(self, _filename):
+		return os.path.relpath( os.path.join(self._path, _filename), self._path )
+
+	# Method to list candidate files with stat results
+	def _list_files(self):
+
+		_catalog = os.path.abspath(self._catalog)
+
+		for _root, _dirs, _files in os.walk(self._path):
+
+			for _name in sorted(_files):
+
+				_file = os.path.join(_root, _name)
+				if not fnmatch.fnmatch(_name, self._pattern) or _file in (_catalog, "%s.tmp"%_catalog):
+					continue
+
+				yield os.path.relpath(_file, self._path), os.stat(_file)
+
+			# Only walk subdirectories when recursive
+			if not self._recursive:
+				break
+
+			_dirs.sort()
+
+	# Method to generate catalog entry from file
+	def _gen_entry(self, _filename, _stat):
+
+		_entry = {"mtime" : _stat.st_mtime_ns, "size" : _stat.st_size, "hash" : None, "note" : None, "meta" : {}, "keys" : collections.OrderedDict()}
+
+		try:
+			_scan = QVisaDataObject.scan_file( os.path.join(self._path, _filename) )
+
+		except (IOError, OSError, UnicodeDecodeError):
+			_scan = None
+
+		# Files which are not QVisaDataObject files are kept in the catalog
+		# (without hash) so that they are not scanned again
+		if _scan is not None:
+			_entry.update(_scan)
+
+		return _entry
+
+	# Method to generate lookup tables from entries
+	def _gen_lookup(self):
+
+		self._hashes = {}
+		self._keys = collections.defaultdict(list)
+		self._subkeys = collections.defaultdict(list)
+		self._table = None
+
+		for _filename, _entry in self._entries.items():
+
+			if _entry["hash"] is None:
+				continue
+
+			self._hashes[_entry["hash"]] = _filename
+
+			for _key, _data in _entry["keys"].items():
+
+				self._keys[_key].append(_filename)
+				for _subkey in _data["subkeys"]:
+					self._subkeys[_subkey].append( (_filename, _key) )
+
+	# Method to encode entry for json
+	def _encode_entry(self, _entry):
+
+		_encode = QVisaMetaTable.encode_value
+
+		return {
+			"mtime" : _entry["mtime"],
+			"size" 	: _entry["size"],
+			"hash" 	: _entry["hash"],
+			"note" 	: _encode(_entry["note"]),
+			"meta" 	: [ [_f, _encode(_v)] for _f, _v in _entry["meta"].items() ],
+			"keys" 	: [
+				{
+					"key" 		: _key,
+					"offset" 	: _data["offset"],
+					"subkeys" 	: _data["subkeys"],
+					"rows" 		: _data["rows"],
+					"meta" 		: [ [_f, _encode(_v)] for _f, _v in _data["meta"].items() ],
+				} for _key, _data in _entry["keys"].items()
+			]
+		}
+
+	# Method to decode entry from json
+	def _decode_entry(self, _entry):
+
+		_decode = QVisaMetaTable.decode_value
+
+		return {
+			"mtime" : _entry["mtime"],
+			"size" 	: _entry["size"],
+			"hash" 	: _entry["hash"],
+			"note" 	: _decode(_entry["note"]),
+			"meta" 	: collections.OrderedDict( (_f, _decode(_v)) for _f, _v in _entry["meta"] ),
+			"keys" 	: collections.OrderedDict(
+				(_data["key"], {
+					"offset" 	: _data["offset"],
+					"subkeys" 	: _data["subkeys"],
+					"rows" 		: _data["rows"],
+					"meta" 		: collections.OrderedDict( (_f, _decode(_v)) for _f, _v in _data["meta"] ),
+				}) for _data in _entry["keys"]
+			)
+		}
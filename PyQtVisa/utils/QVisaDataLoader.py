@@ -0,0 +1,173 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaDataLoader
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import fnmatch
+import collections
+import concurrent.futures
+import numpy as np
+
+# Import QVisaDataObject
+from .QVisaDataObject import QVisaDataObject
+
+# Worker method to read data file. This is a module level function so that
+# it can be sent to worker processes. In columnar mode subkey data is returned
+# as numpy float arrays, which are also much cheaper to send between processes
+# than lists of floats. Parse errors name the file.
+def _read_data_file(_filename, _columnar):
+
+	_data = QVisaDataObject()
+
+	try:
+		_data.read_from_file(_filename)
+
+	except ValueError as e:
+		raise ValueError("Cannot read %s: %s"%(_filename, str(e))) from e
+
+	if _columnar:
+		_data.to_columnar()
+
+	return _filename, _data
+
+
+# Class to read many QVisaDataObject files in parallel. Parsing is distributed
+# over a process pool and results are streamed back as they complete.
+#
+#	_loader = QVisaDataLoader()
+#	for _filename, _data in _loader.iter_load("./campaign"):
+#		...
+#
+# Results can also be collected into one long-format table (dictionary of numpy
+# columns) with the file, key and subkey of every value as index columns:
+#
+#	["file"]	= (object array)
+#	["key"]		= (object array)
+#	["subkey"]	= (object array)
+#	["index"]	= (int array) 	position of value in subkey data
+#	["value"]	= (float array)
+#
+
+class QVisaDataLoader:
+
+	def __init__(self, max_workers=None, columnar=True):
+
+		# Number of worker processes (defaults to number of cores)
+		self._max_workers = max_workers if max_workers is not None else ( os.cpu_count() or 1 )
+
+		# Return subkey data as numpy arrays
+		self._columnar = columnar
+
+	# Method to list data files. Accepts a directory or a list of files.
+	@staticmethod
+	def list_files(_files, _pattern="*"):
+
+		if isinstance(_files, str) and os.path.isdir(_files):
+
+			return [ os.path.join(_files, _name) for _name in sorted( os.listdir(_files) )
+				if fnmatch.fnmatch(_name, _pattern) and os.path.isfile( os.path.join(_files, _name) ) ]
+
+		if isinstance(_files, str):
+			return [_files]
+
+		return list(_files)
+
+	# Generator which yields (filename, QVisaDataObject) as files complete.
+	# Results are not ordered.
+	def iter_load(self, _files, _pattern="*"):
+
+		_files = self.list_files(_files, _pattern)
+
+		# Single worker or single file. Skip the process pool.
+		if self._max_workers <= 1 or len(_files) <= 1:
+
+			for _filename in _files:
+				yield _read_data_file(_filename, self._columnar)
+
+			return
+
+		with concurrent.futures.ProcessPoolExecutor( max_workers=min(self._max_workers, len(_files)) ) as _pool:
+
+			_futures = [ _pool.submit(_read_data_file, _filename, self._columnar) for _filename in _files ]
+
+			try:
+				for _future in concurrent.futures.as_completed(_futures):
+					yield _future.result()
+
+			# Do not parse remaining files if the consumer stops early
+			finally:
+				for _future in _futures:
+					_future.cancel()
+
+	# Method to load files into an ordered dictionary (filename -> QVisaDataObject)
+	# Dictionary order follows the order of the input files.
+	def load(self, _files, _pattern="*"):
+
+		_files = self.list_files(_files, _pattern)
+		_results = dict( self.iter_load(_files) )
+
+		return collections.OrderedDict( (_filename, _results[_filename]) for _filename in _files )
+
+	# Method to load files into one long-format table
+	def load_table(self, _files, _pattern="*"):
+
+		_files = self.list_files(_files, _pattern)
+		_results = dict( self.iter_load(_files) )
+
+		return self.gen_table( ( _filename, _results[_filename] ) for _filename in _files )
+
+	# Method to generate long-format table from (filename, QVisaDataObject) pairs
+	@staticmethod
+	def gen_table(_results):
+
+		_labels, _lengths, _values = [], [], []
+
+		for _filename, _data in _results:
+			for _key in _data.keys():
+				for _subkey, _subdata in _data.subitems(_key):
+
+					_subdata = np.asarray(_subdata, dtype=float)
+					_labels.append( (_filename, _key, _subkey) )
+					_lengths.append( len(_subdata) )
+					_values.append( _subdata )
+
+		_lengths = np.asarray(_lengths, dtype=int)
+		_table = collections.OrderedDict()
+
+		# Index columns: repeat each label over the length of its segment
+		for _i, _column in enumerate( ["file", "key", "subkey"] ):
+
+			_segment = np.empty(len(_labels), dtype=object)
+			_segment[:] = [ _[_i] for _ in _labels ]
+			_table[_column] = np.repeat(_segment, _lengths)
+
+		# Position within each segment
+		_starts = np.repeat( np.cumsum(_lengths) - _lengths, _lengths )
+		_table["index"] = np.arange( _lengths.sum() ) - _starts
+		_table["value"] = np.concatenate(_values) if _values != [] else np.empty(0, dtype=float)
+
+		return _table
@@ -28,7 +28,13 @@
 # -*- coding: utf-8 -*-
 import time
 import hashlib 
+import itertools
 import collections
+import numpy as np
+
+# Import QVisaMetaTable and QVisaRunningStats
+from .QVisaMetaTable import QVisaMetaTable
+from .QVisaRunningStats import QVisaRunningStats
 
 # Class to manage measurement data collected by PyQtVisa applications. Data always 
 # takes the following format: 
@@ -44,14 +50,28 @@ import collections
 # The class contains methods to generate such data structures in software, to write
 # data objects into files and to read back data from files losslessly.
 #
+# Metadata is stored in a QVisaMetaTable (one row per key, one column per field).
+# Metadata values keep their types when written to file (v1.2). Files written in
+# the v1.1 format are still read, with values parsed as python literals where 
+# possible and as strings otherwise.
+#
+# Running statistics (QVisaRunningStats) can be enabled per subkey. These are 
+# updated in append_subkey_data so that status displays do not need to re-read
+# the data lists.
+#
 
 class QVisaDataObject:
 
 	def __init__(self):
 
-		# Initialize data and meta dictionaries
+		# Initialize data dictionary and meta table
 		self.data = collections.OrderedDict()
-		self.meta = collections.OrderedDict()
+		self.meta = QVisaMetaTable()
+
+		# Running statistics on (key, subkey) and statistics which are rebuilt
+		# on next access because the data was replaced (see _sync_stats)
+		self.stats = {}
+		self._stale = set()
 
 		# Generate hash for data object
 		self.hash = self._gen_root_key()
@@ -85,9 +105,14 @@ class QVisaDataObject:
 	def empty(self):
 		return True if self.data == {} else False
 
-	# Method to reset data dictionaty
+	# Method to reset data dictionaty. Enabled statistics are kept (and 
+	# reset), so they continue on keys which are added again.
 	def reset(self):
 		self.data = {}
+		self._stale = set()
+
+		for _stats in self.stats.values():
+			_stats.reset()
 
 
 	#####################################
@@ -105,7 +130,8 @@ class QVisaDataObject:
 	def add_key(self, _key=""):
 		
 		self.data[_key] = {}
-		self.meta[_key] = {}
+		self.meta.add_row(_key)
+		self._sync_stats(_key)
 		return _key
 
 	# Initialize hash for data key
@@ -113,7 +139,7 @@ class QVisaDataObject:
 
 		_hash = self.gen_hash(_salt)
 		self.data[_hash] = {}
-		self.meta[_hash] = {}
+		self.meta.add_row(_hash)
 		return _hash 
 
 	# Return data method 
@@ -123,13 +149,8 @@ class QVisaDataObject:
 	# Method to delete key
 	def del_key(self, _key):
 		
-		# Need to loop through all keys to flag for deletion
-		keylist = []
-		for k in self.data.keys():
-
-			if ( k == _key ) or ( self.get_metadata(k, "__root__") == _key ):
-				
-				keylist.append(k)
+		# Flag key and all keys rooted on key for deletion
+		keylist = [_key] + self.meta.where( self.meta.column("__root__") == _key )
 
 		# Loop through keylist to delete keys
 		for k in keylist:
@@ -137,7 +158,8 @@ class QVisaDataObject:
 			if k in self.data.keys():
 
 				del self.data[k]
-				del self.meta[k]		
+				self.meta.del_row(k)
+				self._sync_stats(k, _drop=True)
 
 	# Method to check if all keys are empty		
 	def keys_empty(self):
@@ -157,10 +179,12 @@ class QVisaDataObject:
 	def add_subkey(self, _key, _subkey):
 		if _subkey not in self.data[_key].keys():
 			self.data[_key][_subkey] = []
+			self._sync_stats(_key, _subkey)
 
 	# Method to set subkeys
 	def set_subkeys(self, _key, _subkeys):
 		self.data[_key] = {_ : [] for _ in _subkeys} 
+		self._sync_stats(_key)
 
 	# Method to get data field
 	def get_subkey_data(self, _key, _subkey):
@@ -169,15 +193,238 @@ class QVisaDataObject:
 	# Method to set data value (directly)
 	def set_subkey_data(self, _key, _subkey, _data):
 		self.data[_key][_subkey] = _data
+		self._sync_stats(_key, _subkey)
 
-	# Method to append data to field
+	# Method to append data to field. Columnar (numpy) fields are reallocated.
+	# Running statistics are updated first, so values which are not numeric 
+	# are rejected before they are stored.
 	def append_subkey_data(self, _key, _subkey, _data):
-		self.data[_key][_subkey].append(_data)
+
+		if self.stats:
+
+			_stats = self.stats.get( (_key, _subkey) )
+			if _stats is not None:
+
+				if ( _key, _subkey ) in self._stale:
+					float(_data)
+
+				else:
+					_stats.update(_data)
+
+		try:
+			self.data[_key][_subkey].append(_data)
+
+		except AttributeError:
+			self.data[_key][_subkey] = np.append(self.data[_key][_subkey], _data)
+
+	# Method to append a sequence of values to field (bulk append). Numpy 
+	# arrays are converted to python values for list fields.
+	def extend_subkey_data(self, _key, _subkey, _data):
+
+		if self.stats:
+
+			_stats = self.stats.get( (_key, _subkey) )
+			if _stats is not None:
+
+				if ( _key, _subkey ) in self._stale:
+					np.asarray(_data, dtype=float)
+
+				else:
+					_stats.update_array(_data)
+
+		try:
+			self.data[_key][_subkey].extend( _data.tolist() if hasattr(_data, "tolist") else _data )
+
+		except AttributeError:
+			self.data[_key][_subkey] = np.concatenate( (self.data[_key][_subkey], np.asarray(_data, dtype=float)) )
 
 	# Method to delete subkey
 	def del_subkey(self, _key, _subkey):
 		if _subkey in self.data[_key].keys():		
 			del self.data[_key][_subkey]
+			self._sync_stats(_key, _subkey, _drop=True)
+
+
+	#####################################
+	#  DATA INTERACTION - STATISTICS
+	#
+
+	# Method to enable running statistics on subkey. Existing data on the 
+	# subkey is included. Optional ewma is the EWMA smoothing factor.
+	def enable_subkey_stats(self, _key, _subkey, ewma=None):
+
+		_stats = QVisaRunningStats(ewma)
+		self.stats[ (_key, _subkey) ] = _stats
+		self._stale.discard( (_key, _subkey) )
+
+		if _key in self.data and _subkey in self.data[_key]:
+			_stats.update_array( self.data[_key][_subkey] )
+
+		return _stats
+
+	# Method to disable running statistics on subkey
+	def disable_subkey_stats(self, _key, _subkey):
+		self.stats.pop( (_key, _subkey), None )
+		self._stale.discard( (_key, _subkey) )
+
+	# Method to get running statistics on subkey (None if not enabled). Stale
+	# statistics are rebuilt from the data.
+	def get_subkey_stats(self, _key, _subkey):
+
+		_stats = self.stats.get( (_key, _subkey) )
+
+		if _stats is not None and ( _key, _subkey ) in self._stale:
+
+			self._stale.discard( (_key, _subkey) )
+			_stats.reset()
+			_stats.update_array( self.data[_key][_subkey] )
+
+		return _stats
+
+	# Method to resynchronize statistics after data on key (or subkey) has been
+	# replaced. Statistics on existing subkeys are marked stale and rebuilt on 
+	# next access. Statistics on subkeys which do not exist are reset (or 
+	# dropped if _drop).
+	def _sync_stats(self, _key, _subkey=None, _drop=False):
+
+		if not self.stats:
+			return
+
+		if _subkey is None:
+			_pairs = [ _ for _ in self.stats.keys() if _[0] == _key ]
+
+		else:
+			_pairs = [ (_key, _subkey) ] if (_key, _subkey) in self.stats else []
+
+		for _pair in _pairs:
+
+			if _key in self.data and _pair[1] in self.data[_key]:
+				self._stale.add(_pair)
+				continue
+
+			self._stale.discard(_pair)
+
+			if _drop:
+				del self.stats[_pair]
+
+			else:
+				self.stats[_pair].reset()
+
+
+	#####################################
+	#  DATA INTERACTION - COMBINE
+	#
+	# Merged keys copy the buffers of the other object (one list or array copy
+	# per subkey), so later appends on either object are independent. Slices 
+	# of columnar (numpy) data are views. Slices of list data are copies, so 
+	# call to_columnar() first to avoid copying long traces.
+	#
+
+	# Method to convert subkey data to numpy float arrays (all keys if None)
+	def to_columnar(self, _key=None):
+
+		for _k in ( self.data.keys() if _key is None else [_key] ):
+			for _subkey, _data in list( self.data[_k].items() ):
+				self.data[_k][_subkey] = np.asarray(_data, dtype=float)
+
+	# Method to merge keys from another data object. Subkey buffers are 
+	# copied. Keys rooted on the root hash of the other object are re-rooted 
+	# on this object. Optional rename maps keys of the other object to new 
+	# keys (also applied to "__root__"). Running statistics enabled on the 
+	# merged keys (on either object) are rebuilt from the merged data. 
+	# Returns merged keys.
+	def merge(self, _other, overwrite=False, rename=None):
+
+		_rename = rename if rename is not None else {}
+		_keys = [ ( _key, _rename.get(_key, _key) ) for _key in _other.keys() ]
+
+		# Check for key collisions before modifying anything
+		if len( set( _new for _, _new in _keys ) ) != len(_keys):
+			raise KeyError("Renamed keys are not unique")
+
+		if not overwrite:
+			for _, _new in _keys:
+				if _new in self.data:
+					raise KeyError("Key %s exists in data object. Use merge(_other, overwrite=True) to overwrite"%str(_new))
+
+		for _key, _new in _keys:
+
+			self.data[_new] = { _subkey : self._copy_buffer(_data) for _subkey, _data in _other.subitems(_key) }
+			self.meta.add_row(_new)
+
+			for ( _k, _subkey ), _stats in _other.stats.items():
+				if _k == _key and ( _new, _subkey ) not in self.stats:
+					self.stats[ (_new, _subkey) ] = QVisaRunningStats( _stats.get_alpha() )
+
+			self._sync_stats(_new)
+
+			for _subkey, _value in _other.meta.row(_key).items():
+
+				if _subkey == "__root__":
+					_value = self.hash if _value == _other.roothash() else _rename.get(_value, _value)
+
+				self.meta.set_value(_new, _subkey, _value)
+
+		return [ _new for _, _new in _keys ]
+
+	# Method to copy subkey buffer (lists stay lists)
+	@staticmethod
+	def _copy_buffer(_data):
+		return list(_data) if isinstance(_data, list) else np.array(_data, copy=True)
+
+	# Method to concatenate data on several keys into a new key. Only subkeys 
+	# common to all keys are concatenated. Metadata is taken from the first 
+	# key and the source keys are recorded in "__source__".
+	def concat_keys(self, _keys, _new_key=None):
+
+		_keys = list(_keys)
+
+		if _keys == []:
+			raise ValueError("No keys to concatenate")
+		_subkeys = [ _ for _ in self.subkeys(_keys[0]) if all( _ in self.data[_k] for _k in _keys ) ]
+
+		_new_key = self.add_hash_key("concat") if _new_key is None else self.add_key(_new_key)
+
+		for _subkey in _subkeys:
+
+			_buffers = [ self.data[_k][_subkey] for _k in _keys ]
+
+			# Lists are chained, anything else is concatenated by numpy
+			if all( isinstance(_, list) for _ in _buffers ):
+				self.data[_new_key][_subkey] = list( itertools.chain.from_iterable(_buffers) )
+
+			else:
+				self.data[_new_key][_subkey] = np.concatenate( [ np.asarray(_) for _ in _buffers ] )
+
+		self._sync_stats(_new_key)
+		self._copy_metadata(_keys[0], _new_key)
+		self.meta.set_value(_new_key, "__source__", _keys)
+		return _new_key
+
+	# Method to take a range out of data on key into a new key. Metadata is 
+	# copied from the key and the source key and range are recorded in 
+	# "__source__" and "__range__".
+	def slice(self, _key, _start=None, _stop=None, _step=None, _new_key=None):
+
+		_range = slice(_start, _stop, _step)
+		_data = self.data[_key]
+
+		_new_key = self.add_hash_key("slice") if _new_key is None else self.add_key(_new_key)
+		self.data[_new_key] = { _subkey : _buffer[_range] for _subkey, _buffer in _data.items() }
+		self._sync_stats(_new_key)
+
+		self._copy_metadata(_key, _new_key)
+		self.meta.set_value(_new_key, "__source__", _key)
+		self.meta.set_value(_new_key, "__range__", (_start, _stop, _step))
+		return _new_key
+
+	# Method to copy metadata between keys
+	def _copy_metadata(self, _key, _new_key):
+
+		for _subkey, _value in self.meta.row(_key).items():
+
+			if _subkey not in ("__source__", "__range__"):
+				self.meta.set_value(_new_key, _subkey, _value)
 
 
 	#####################################
@@ -187,9 +434,18 @@ class QVisaDataObject:
 	# Add generic metadata
 	def _gen_root_key(self):
 		_hash = self.gen_hash("_root")
-		self.meta[ _hash ] = {}
+		self.meta.add_row(_hash)
 		return _hash 
 
+	# Method to get the meta table. Columns of the table can be used 
+	# to select keys with vectorized expressions 
+	def get_meta_table(self):
+		return self.meta
+
+	# Method to select data keys by metadata values (equality)
+	def find_keys(self, **_fields):
+		return [ _ for _ in self.meta.match(**_fields) if _ in self.data ]
+
 	# Add meta method
 	def set_metadata(self, _key, _subkey, _data):
 
@@ -197,7 +453,7 @@ class QVisaDataObject:
 		if _key == "__self__":
 			_key = self.hash
 
-		self.meta[_key][_subkey] = _data
+		self.meta.set_value(_key, _subkey, _data)
 
 	# Get meta method
 	def get_metadata(self, _key, _subkey):
@@ -206,17 +462,8 @@ class QVisaDataObject:
 		if _key == "__self__":
 			_key = self.hash
 
-		# If key exists in meta keys
-		if _key in self.meta.keys():
-
-			if _subkey in self.meta[_key].keys():
-	
-				return self.meta[_key][_subkey]
-
 		# Return none if metadata has not been set
-		else:
-
-			return None		
+		return self.meta.get_value(_key, _subkey)
 
 	#####################################
 	#  FILE IO
@@ -231,13 +478,19 @@ class QVisaDataObject:
 		with f:	
 		
 			# Write data header
-			f.write("*! QVisaDataObject v1.1\n")
+			f.write("*! QVisaDataObject v1.2\n")
 			
 			# If a note exists write it
 			if self.get_metadata(self.hash, "__note__") is not None:
 
-				f.write( "*! note %s\n"%self.get_metadata(self.hash, "__note__") )
-			
+				f.write( "*! note %s\n"%self.meta.encode_value( self.get_metadata(self.hash, "__note__") ) )
+
+			# Write remaining toplevel metadata
+			for _subkey, _data in self.meta.row(self.hash).items():
+
+				if _subkey != "__note__":
+					f.write( "*! meta %s %s\n"%( str(_subkey), self.meta.encode_value(_data) ) )
+
 			# Write root hash
 			f.write("*! hash %s\n\n"%self.hash)
 
@@ -252,8 +505,8 @@ class QVisaDataObject:
 					f.write( "#! __data__ %s\n"%( str(_key) ) )	
 
 					# Write measurement metadata into header
-					for _subkey, _data in self.meta[_key].items():
-						f.write( "#! %s %s\n"%( str(_subkey), str(_data) ) ) 
+					for _subkey, _data in self.meta.row(_key).items():
+						f.write( "#! %s %s\n"%( str(_subkey), self.meta.encode_value(_data) ) ) 
 					
 					# Write data keys
 					for _subkey in _dict.keys():
@@ -290,9 +543,12 @@ class QVisaDataObject:
 			if self.data != {} and overwrite == False:
 				raise PermissionError
 
-			# Unless explicitly specified 
+			# Unless explicitly specified. Metadata of the old keys is dropped
+			# with the data (the root hash is kept until the file sets it).
 			else: 
 				self.data = {}
+				self.meta = QVisaMetaTable()
+				self.meta.add_row(self.hash)
 
 			
 			# Open file pointer	
@@ -313,68 +569,192 @@ class QVisaDataObject:
 
 						continue
 
-					# Otherwise we have reached a data block
-					else:
+					# Toplevel header lines (note, metadata and root hash)
+					elif _line[0] == "*!" and len(_line) > 2:
 
+						if _line[1] == "note":
 
-						# Check for data header before entering datablock subloop
-						if _line[0] == "#!" and _line[1] == "__data__":
+							self.set_metadata(self.hash, "__note__", self.meta.decode_value( _.split(None, 2)[2] ) )
 
-							# Cache key on __data__ 
-							_key = _line[2]
-							self.add_key(_key)
+						elif _line[1] == "meta" and len(_line) > 3:
 
-							# Need to check when we exit metadata sub-block key subkeys
-							_in_meta = True
+							self.set_metadata(self.hash, _line[2], self.meta.decode_value( _.split(None, 3)[3] ) )
 
-							# Subloop for data block.
-							while True: 
+						elif _line[1] == "hash":
 
-								# Read datablock line
-								_ = f.readline()
-								_line = _.split()
+							self.meta.rename_row(self.hash, _line[2])
+							self.hash = _line[2]
 
-								# If line is empty end of data block has been reached
-								if _line == []:
+					# Check for data header before entering datablock subloop
+					elif _line[0] == "#!" and len(_line) > 2 and _line[1] == "__data__":
 
-									break
+						self._read_data_block(f.readline, _line[2])
 
-								# Otherwise process the line
-								else: 
 
-									# If this is true, it is a metadata line
-									if _line[0] == "#!":
+		except PermissionError:
 
-										self.meta[_key][_line[1]] = _line[2]
+			print("Overwriting existing data is protected. Use read_from_file(_filename, overwrite=True) to overwrite")
 
-									# Otherwise it is the subkey line or a data line
-									else:															
 
-										# If if is the first non #! line, we have reached the subkey 
-										# line. Treat as a special case of w.r.t. the parser.
-										if _in_meta == True:
+	# Method to read a single data block from data file. If the byte offset of 
+	# the block (as returned by scan_file) is given the file is not searched.
+	def read_key_from_file(self, filename, _key, _offset = None):
 
-											# Initiaize empty list for each measurement key
-											# via the class set_subkeys method
-											_subkeys = _line
-											self.set_subkeys(_key, _subkeys)
-											
-											# Flip the switch and start processing data lines
-											_in_meta = False
+		# Locate the data block
+		if _offset is None:
 
+			_keys = self.scan_file(filename)["keys"]
+			if _key not in _keys:
+				raise KeyError(_key)
 
-										# Case of ordinary data lines
-										else:	
+			_offset = _keys[_key]["offset"]
 
-											# Next line should not be empty
-											if _line != []:	
+		# Seek to data block and read. Offsets point at the "#! __data__" line
+		with open(filename, 'rb') as f:
 
-												# Read data into 
-												for _subkey, _value in zip(_subkeys, _line):
-												
-													self.data[_key][_subkey].append( float(_value) )
+			f.seek(_offset)
+			_line = f.readline().decode().split()
 
+			if _line[:3] != ["#!", "__data__", str(_key)]:
+				raise KeyError(_key)
 
-		except PermissionError:
+			self._read_data_block(lambda : f.readline().decode(), _key)
 
-			print("Overwriting existing data is protected. Use read_from_file(_filename, overwrite=True) to overwrite")
+		return _key
+
+
+	# Method to read data block (metadata, subkeys and data lines) on key. 
+	# Called after the "#! __data__ <key>" line has been consumed.
+	def _read_data_block(self, _readline, _key):
+
+		# Cache key on __data__ 
+		self.add_key(_key)
+
+		# Need to check when we exit metadata sub-block key subkeys
+		_in_meta = True
+
+		# Subloop for data block.
+		while True: 
+
+			# Read datablock line
+			_ = _readline()
+			_line = _.split()
+
+			# If line is empty end of data block has been reached
+			if _line == []:
+
+				break
+
+			# Otherwise process the line
+			else: 
+
+				# If this is true, it is a metadata line. The value is the 
+				# remainder of the line (values may contain whitespace)
+				if _line[0] == "#!":
+
+					_value = _.split(None, 2)[2] if len(_line) > 2 else ""
+					self.set_metadata(_key, _line[1], self.meta.decode_value(_value) )
+
+				# Otherwise it is the subkey line or a data line
+				else:															
+
+					# If if is the first non #! line, we have reached the subkey 
+					# line. Treat as a special case of w.r.t. the parser.
+					if _in_meta == True:
+
+						# Initiaize empty list for each measurement key
+						# via the class set_subkeys method
+						_subkeys = _line
+						self.set_subkeys(_key, _subkeys)
+						
+						# Flip the switch and start processing data lines
+						_in_meta = False
+
+
+					# Case of ordinary data lines
+					else:	
+
+						# Read data into 
+						for _subkey, _value in zip(_subkeys, _line):
+						
+							self.data[_key][_subkey].append( float(_value) )
+
+
+	# Method to scan data file without reading data values. Returns the root 
+	# hash, note and metadata of the file and for each key the byte offset of 
+	# the data block, the key metadata, subkeys and number of data rows.
+	#
+	#	{
+	#		"hash" 	: (str),
+	#		"note"	: (str),
+	#		"meta"	: (dict), 
+	#		"keys"	: { <key> : {"offset" : (int), "meta" : (dict), "subkeys" : (list), "rows" : (int)} }
+	#	}
+	#
+	@staticmethod
+	def scan_file(filename):
+
+		_scan = {"hash" : None, "note" : None, "meta" : collections.OrderedDict(), "keys" : collections.OrderedDict()}
+		_entry, _in_meta = None, False
+
+		with open(filename, 'rb') as f:
+
+			# Header line identifies QVisaDataObject files
+			_ = f.readline().decode(errors="replace")
+			if not _.startswith("*! QVisaDataObject"):
+				return None
+
+			while True:
+
+				_offset = f.tell()
+				_ = f.readline()
+
+				if _ == b'':
+					break
+
+				_ = _.decode(errors="replace")
+				_line = _.split()
+
+				# Empty line terminates a data block
+				if _line == []:
+
+					_entry = None
+					continue
+
+				# Inside data block
+				if _entry is not None:
+
+					if _in_meta and _line[0] == "#!":
+
+						_value = _.split(None, 2)[2] if len(_line) > 2 else ""
+						_entry["meta"][_line[1]] = QVisaMetaTable.decode_value(_value)
+
+					elif _in_meta:
+
+						_entry["subkeys"] = _line
+						_in_meta = False
+
+					else:
+
+						_entry["rows"] += 1
+
+				# Toplevel header lines
+				elif _line[0] == "*!" and len(_line) > 2:
+
+					if _line[1] == "note":
+						_scan["note"] = QVisaMetaTable.decode_value( _.split(None, 2)[2] )
+
+					elif _line[1] == "meta" and len(_line) > 3:
+						_scan["meta"][_line[2]] = QVisaMetaTable.decode_value( _.split(None, 3)[3] )
+
+					elif _line[1] == "hash":
+						_scan["hash"] = _line[2]
+
+				# Data block header
+				elif _line[0] == "#!" and len(_line) > 2 and _line[1] == "__data__":
+
+					_entry = {"offset" : _offset, "meta" : collections.OrderedDict(), "subkeys" : [], "rows" : 0}
+					_scan["keys"][_line[2]] = _entry
+					_in_meta = True
+
+		return _scan
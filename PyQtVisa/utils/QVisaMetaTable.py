@@ -0,0 +1,315 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaMetaTable
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import ast
+import numbers
+import collections
+import numpy as np
+
+# Class to manage metadata for QVisaDataObject. Metadata is stored as a table
+# with one row per data key and one column per metadata field.
+#
+#				field0		field1		field2
+#	<key0>		value		value		None
+#	<key1>		value		None		value
+#
+# Values keep their python types. Columns are exposed as numpy arrays so that
+# keys can be selected with vectorized expressions, e.g.
+#
+#	_mask = (meta.column("nplc") > 1) & (meta.column("__root__") == _hash)
+#	_keys = meta.where(_mask)
+#
+
+class QVisaMetaTable:
+
+	def __init__(self):
+
+		# Row index and column storage. Deleted rows leave empty slots in the 
+		# columns which are removed on the next column access (see _compact), 
+		# so deleting many rows is linear.
+		self._rows = collections.OrderedDict()
+		self._columns = collections.OrderedDict()
+		self._size = 0
+		self._deleted = 0
+
+		# Cache for numpy column and key arrays
+		self._arrays = {}
+		self._keys = None
+
+	#####################################
+	#  ROW METHODS
+	#
+
+	# Wrap keys method (row keys)
+	def keys(self):
+		return self._rows.keys()
+
+	# Number of rows
+	def __len__(self):
+		return len(self._rows)
+
+	# Check if key is a row
+	def __contains__(self, _key):
+		return _key in self._rows
+
+	# Dictionary style read access to row
+	def __getitem__(self, _key):
+		return self.row(_key)
+
+	# Wrap items method (row key, row dict)
+	def items(self):
+		return [ (_key, self.row(_key)) for _key in self._rows.keys() ]
+
+	# Add empty row for key. An existing row is cleared.
+	def add_row(self, _key):
+
+		if _key in self._rows:
+			self.clear_row(_key)
+
+		else:
+			self._rows[_key] = self._size
+			self._size += 1
+			self._keys = None
+
+			for _field in self._columns.keys():
+				self._columns[_field].append(None)
+				self._arrays.pop(_field, None)
+
+	# Clear all values on row
+	def clear_row(self, _key):
+
+		_index = self._rows[_key]
+		for _field, _column in self._columns.items():
+
+			if _column[_index] is not None:
+				_column[_index] = None
+				self._arrays.pop(_field, None)
+
+	# Delete row for key. The slot of the row is cleared and removed later.
+	def del_row(self, _key):
+
+		if _key in self._rows:
+
+			_index = self._rows.pop(_key)
+
+			for _column in self._columns.values():
+				_column[_index] = None
+
+			self._deleted += 1
+			self._arrays = {}
+			self._keys = None
+
+	# Remove slots of deleted rows from columns (row order is preserved)
+	def _compact(self):
+
+		if self._deleted == 0:
+			return
+
+		_indices = list( self._rows.values() )
+
+		for _field, _column in self._columns.items():
+			self._columns[_field] = [ _column[_i] for _i in _indices ]
+
+		self._rows = collections.OrderedDict( (_k, _i) for _i, _k in enumerate(self._rows.keys()) )
+		self._size = len(self._rows)
+		self._deleted = 0
+
+	# Rename row key in place (row order is preserved)
+	def rename_row(self, _key, _new_key):
+
+		if _key == _new_key:
+			return
+
+		# Existing row on new key is replaced
+		self.del_row(_new_key)
+
+		self._rows = collections.OrderedDict(
+			(_new_key if _k == _key else _k, _i) for _k, _i in self._rows.items()
+		)
+		self._keys = None
+
+	# Get row as dictionary of fields which have been set
+	def row(self, _key):
+
+		_index = self._rows[_key]
+		return collections.OrderedDict(
+			(_field, _column[_index]) for _field, _column in self._columns.items() if _column[_index] is not None
+		)
+
+	#####################################
+	#  VALUE METHODS
+	#
+
+	# Set value on key (row) and field (column)
+	def set_value(self, _key, _field, _value):
+
+		# Will raise KeyError for unknown row
+		_index = self._rows[_key]
+
+		# Add column if it does not exist
+		if _field not in self._columns:
+			self._columns[_field] = [None] * self._size
+
+		self._columns[_field][_index] = _value
+		self._arrays.pop(_field, None)
+
+	# Get value on key and field. Returns None if not set
+	def get_value(self, _key, _field):
+
+		if ( _key in self._rows ) and ( _field in self._columns ):
+			return self._columns[_field][ self._rows[_key] ]
+
+		return None
+
+	# Delete value on key and field
+	def del_value(self, _key, _field):
+
+		if ( _key in self._rows ) and ( _field in self._columns ):
+			self._columns[_field][ self._rows[_key] ] = None
+			self._arrays.pop(_field, None)
+
+	#####################################
+	#  COLUMN METHODS
+	#
+
+	# Get list of fields
+	def fields(self):
+		return list( self._columns.keys() )
+
+	# Get column as numpy array. Numeric columns are returned as float arrays
+	# with missing values as nan. Boolean columns are returned as boolean arrays
+	# with missing values as False. All other columns are object arrays.
+	def column(self, _field):
+
+		self._compact()
+
+		if _field not in self._columns:
+			return np.full(len(self._rows), None, dtype=object)
+
+		if _field not in self._arrays:
+			self._arrays[_field] = self._gen_array( self._columns[_field] )
+
+		return self._arrays[_field]
+
+	# Get keys as object array (aligned with columns)
+	def keys_array(self):
+
+		if self._keys is None:
+			self._keys = self._gen_object_array( self._rows.keys() )
+
+		return self._keys
+
+	# Select keys from a boolean mask
+	def where(self, _mask):
+		return list( self.keys_array()[ np.asarray(_mask, dtype=bool) ] )
+
+	# Select keys on which all fields equal the given values
+	def match(self, **_fields):
+
+		_mask = np.ones(len(self._rows), dtype=bool)
+		for _field, _value in _fields.items():
+			_mask &= ( self.column(_field) == _value )
+
+		return self.where(_mask)
+
+	# Method to generate typed numpy array from column
+	def _gen_array(self, _column):
+
+		_values = [ _ for _ in _column if _ is not None ]
+
+		# Boolean columns
+		if _values != [] and all( isinstance(_, (bool, np.bool_)) for _ in _values ):
+			return np.array( [ bool(_) for _ in _column ], dtype=bool )
+
+		# Numeric columns
+		if _values != [] and all( isinstance(_, numbers.Real) for _ in _values ):
+			return np.array( [ np.nan if _ is None else _ for _ in _column ], dtype=float )
+
+		# Everything else
+		return self._gen_object_array(_column)
+
+	# Method to generate 1D object array. Elements are assigned one at a time 
+	# so that tuple and list values are not broadcast by numpy
+	@staticmethod
+	def _gen_object_array(_values):
+
+		_values = list(_values)
+		_array = np.empty(len(_values), dtype=object)
+		for _i, _value in enumerate(_values):
+			_array[_i] = _value
+
+		return _array
+
+	#####################################
+	#  VALUE ENCODING
+	#
+
+	# Encode metadata value as string for file IO. Numpy scalars and arrays
+	# are converted to python types so that they can be read back. Non-finite
+	# floats are written as the bare names nan, inf and -inf (also inside 
+	# containers), which decode_value maps back to floats. The strings 'nan'
+	# and 'inf' are quoted, so they are not confused with floats.
+	@staticmethod
+	def encode_value(_value):
+
+		if hasattr(_value, "tolist"):
+			_value = _value.tolist()
+
+		return repr(_value)
+
+	# Decode metadata value from file IO. Values which cannot be evaluated
+	# as a python literal (e.g. files written by QVisaDataObject v1.1) are
+	# returned as stripped strings.
+	@staticmethod
+	def decode_value(_string):
+
+		_string = _string.strip()
+
+		try:
+			return ast.literal_eval( QVisaMetaTable._parse_literal(_string) )
+
+		except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+			return _string
+
+	# Parse literal expression. The names nan and inf are replaced by float
+	# constants, so literal_eval accepts non-finite floats.
+	@staticmethod
+	def _parse_literal(_string):
+
+		_tree = ast.parse(_string, mode="eval")
+
+		for _node in ast.walk(_tree):
+			for _field, _value in ast.iter_fields(_node):
+
+				if isinstance(_value, ast.Name) and _value.id in ("nan", "inf"):
+					setattr(_node, _field, ast.Constant( float(_value.id) ))
+
+				elif isinstance(_value, list):
+					_value[:] = [ ast.Constant( float(_.id) ) if isinstance(_, ast.Name) and _.id in ("nan", "inf") else _ for _ in _value ]
+
+		return _tree
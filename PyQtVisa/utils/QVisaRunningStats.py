@@ -0,0 +1,166 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaRunningStats
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import math
+import collections
+import numpy as np
+
+# Running aggregates for a stream of values. Count, mean and variance are kept
+# with Welford's algorithm, together with min/max, the last value and an optional
+# exponentially weighted moving average (EWMA). Updates and queries are O(1).
+#
+#	_stats = QVisaRunningStats(ewma=0.1)
+#	_stats.update(1.0)
+#	_stats.get_mean()
+#
+
+class QVisaRunningStats:
+
+	def __init__(self, ewma=None):
+
+		# EWMA smoothing factor (0 < alpha <= 1) or None
+		if ewma is not None and not ( 0.0 < ewma <= 1.0 ):
+			raise ValueError("EWMA factor %s is out of range (0, 1]"%str(ewma))
+
+		self._alpha = ewma
+		self.reset()
+
+	# Reset all aggregates
+	def reset(self):
+
+		self._count = 0
+		self._mean = 0.0
+		self._m2 = 0.0
+		self._min = None
+		self._max = None
+		self._last = None
+		self._ewma = None
+
+	# Update aggregates with one value
+	def update(self, _value):
+
+		_value = float(_value)
+
+		# Welford update
+		self._count += 1
+		_delta = _value - self._mean
+		self._mean += _delta / self._count
+		self._m2 += _delta * ( _value - self._mean )
+
+		# Extrema and last value
+		self._min = _value if self._min is None or _value < self._min else self._min
+		self._max = _value if self._max is None or _value > self._max else self._max
+		self._last = _value
+
+		# Exponentially weighted moving average
+		if self._alpha is not None:
+			self._ewma = _value if self._ewma is None else self._alpha * _value + ( 1.0 - self._alpha ) * self._ewma
+
+	# Update aggregates with an array of values. The batch is reduced with numpy
+	# and combined with the running aggregates (Chan et al. parallel update).
+	def update_array(self, _values):
+
+		_values = np.asarray(_values, dtype=float).ravel()
+		_n = len(_values)
+
+		if _n == 0:
+			return
+
+		_mean = float( _values.mean() )
+		_m2 = float( ( ( _values - _mean ) ** 2 ).sum() )
+		_count = self._count + _n
+		_delta = _mean - self._mean
+
+		self._mean += _delta * _n / _count
+		self._m2 += _m2 + _delta ** 2 * self._count * _n / _count
+		self._count = _count
+
+		_min, _max = float( _values.min() ), float( _values.max() )
+		self._min = _min if self._min is None else min(self._min, _min)
+		self._max = _max if self._max is None else max(self._max, _max)
+		self._last = float( _values[-1] )
+
+		# EWMA is order dependent. Weights of the batch decay geometrically.
+		if self._alpha is not None:
+
+			_weights = self._alpha * ( 1.0 - self._alpha ) ** np.arange(_n - 1, -1, -1)
+
+			# First value seeds the average when no history exists
+			if self._ewma is None:
+				_weights[0] = ( 1.0 - self._alpha ) ** (_n - 1)
+				self._ewma = float( np.dot(_weights, _values) )
+
+			else:
+				self._ewma = float( np.dot(_weights, _values) + ( 1.0 - self._alpha ) ** _n * self._ewma )
+
+	#####################################
+	#  GETTERS
+	#
+
+	# EWMA smoothing factor (None if disabled)
+	def get_alpha(self):
+		return self._alpha
+
+	def get_count(self):
+		return self._count
+
+	def get_mean(self):
+		return self._mean if self._count > 0 else None
+
+	# Variance (ddof=0 population variance, ddof=1 sample variance)
+	def get_var(self, ddof=0):
+		return self._m2 / ( self._count - ddof ) if self._count > ddof else None
+
+	def get_std(self, ddof=0):
+		_var = self.get_var(ddof)
+		return math.sqrt(_var) if _var is not None else None
+
+	def get_min(self):
+		return self._min
+
+	def get_max(self):
+		return self._max
+
+	def get_last(self):
+		return self._last
+
+	def get_ewma(self):
+		return self._ewma
+
+	# Summary dictionary of all aggregates
+	def summary(self):
+
+		return collections.OrderedDict([
+			("count", 	self.get_count()),
+			("mean", 	self.get_mean()),
+			("std", 	self.get_std()),
+			("min", 	self.get_min()),
+			("max", 	self.get_max()),
+			("last", 	self.get_last()),
+			("ewma", 	self.get_ewma()),
+		])
@@ -38,6 +38,10 @@ from PyQt5.QtGui import QIcon
 from .QVisaDeviceSelect import QVisaDeviceSelect
 from .QVisaResourceList import QVisaResourceList
 
+# Import discovery and driver registry for driver auto-detection
+from ..core.QVisaDiscovery import QVisaDiscovery
+from ..drivers.QVisaDriverRegistry import match_driver
+
 # This widget provides a mechanism to initialize QVisaDevice objects in the 
 # context of a QVisaConfigure object.
 class QVisaDeviceControl(QWidget):
@@ -125,12 +129,32 @@ class QVisaDeviceControl(QWidget):
 		self.device_select.refresh( self._config )
 		self.device_select.blockSignals(False)
 
-	# initalize Insturment
-	def init(self, __QVisaDevice__):
+	# initalize Insturment. If no driver class is given, the driver is
+	# detected from the *IDN? response (see QVisaDriverRegistry)
+	def init(self, __QVisaDevice__=None):
 
 		# Check if insturement has been initialized in calling application
 		_resource = self.resource_list.get_current_device()
 
+		# Driver auto-detection
+		if __QVisaDevice__ is None and self._config.get_device(_resource) is None:
+
+			_idn, _error = QVisaDiscovery().probe(_resource)
+			__QVisaDevice__ = match_driver(_idn)[1] if _idn is not None else None
+
+			if __QVisaDevice__ is None:
+
+				# Message box to display error
+				msg = QMessageBox()
+				msg.setIcon(QMessageBox.Warning)
+				msg.setText("Driver Error: no driver for %s (%s)"%(_resource, _idn if _idn is not None else _error))
+				msg.setWindowTitle("pyVISA Error")
+				msg.setWindowIcon(self.get_icon())
+				msg.setStandardButtons(QMessageBox.Ok)
+				msg.exec_()
+
+				return None
+
 		if self._config.get_device(_resource) is None:
 
 			# Try to initialize device
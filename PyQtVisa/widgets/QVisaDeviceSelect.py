@@ -54,6 +54,7 @@ class QVisaDeviceSelect(QWidget):
 		# Widget select add items
 		if _app.get_device_names() is not None:
 			self._select.addItems( _app.get_device_names() )
+			self._registered.extend( _app.get_device_names() )
 
 		# Add widgets to layout
 		self._layout.addWidget(self._select)
@@ -65,11 +66,32 @@ class QVisaDeviceSelect(QWidget):
 		# Callback function on text changed
 		self._callback = None
 
+		# Incremental updates on device changes (QVisaConfigure and 
+		# QVisaApplication emit deviceAdded and deviceRemoved)
+		if hasattr(_app, "deviceAdded"):
+			_app.deviceAdded.connect(self._device_added)
+			_app.deviceRemoved.connect(self._device_removed)
+
+	# Slot for deviceAdded
+	def _device_added(self, _device):
+
+		_name = _device.get_property("name")
+		if self.isRegistered(_name) == False:
+			self.registerInst(_name)
+
+	# Slot for deviceRemoved
+	def _device_removed(self, _device):
+
+		_name = _device.get_property("name")
+		if self.isRegistered(_name):
+			self._registered.remove(_name)
+			self._select.removeItem( self._select.findText(_name) )
+
 	# Method to sync instrument widget to app
 	def refresh(self, _app):
 	
 		# Get current list of names registered to app
-		for _name in _app.get_device_names():
+		for _name in ( _app.get_device_names() or [] ):
 			
 			# If name is not registered
 			if self.isRegistered(_name) == False:
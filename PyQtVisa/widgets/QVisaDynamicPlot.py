@@ -37,7 +37,7 @@ from PyQt5.QtGui import QIcon
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.ticker import FormatStrFormatter
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 # Import QVisaColorMap class
 from ..utils.QVisaColorMap import QVisaColorMap
@@ -104,7 +104,7 @@ class QVisaDynamicPlot(QWidget):
 	def _gen_mpl_widgets(self):
 	
 		# Generate matplotlib figure and canvas
-		self.mpl_figure  = plt.figure(figsize=(8,5))
+		self.mpl_figure  = Figure(figsize=(8,5))
 		self.mpl_canvas  = FigureCanvas(self.mpl_figure)
 		self.mpl_toolbar = NavigationToolbar(self.mpl_canvas, self)		
 
@@ -290,7 +290,7 @@ class QVisaDynamicPlot(QWidget):
 	def update_canvas(self):
 
 		# Adjust subplots	
-		plt.subplots_adjust(
+		self.mpl_figure.subplots_adjust(
 			left 	= self._adjust['l'], 
 			right 	= self._adjust['r'], 
 			top  	= self._adjust['t'],
@@ -31,9 +31,11 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QComboBox, QLabel
 
 
-import pyvisa
 import re
 
+# Import shared resource manager
+from ..drivers.QVisaResourceManager import get_resource_manager
+
 
 
 class QVisaResourceList(QWidget):
@@ -58,7 +60,7 @@ class QVisaResourceList(QWidget):
 		self.resources = {}
 
 		# Get resource manger
-		rm = pyvisa.ResourceManager()
+		rm = get_resource_manager()
 		
 		# Look through resource list
 		for _resource in rm.list_resources():
@@ -73,6 +75,16 @@ class QVisaResourceList(QWidget):
 			if m:
 				self.resources[ _resource ] = [ "GPIB", m[1] , m[2] ]				
 
+			# Regex match for LAN devices (board and host)
+			m = re.match(r'TCPIP(\d*)::([^:]+)::', _resource, re.ASCII)
+			if m:
+				self.resources[ _resource ] = [ "TCPIP", m[1] or "0", m[2] ]
+
+			# Regex match for USB devices (board and serial number)
+			m = re.match(r'USB(\d*)::\w+::\w+::(\w+)::', _resource, re.ASCII)
+			if m:
+				self.resources[ _resource ] = [ "USB", m[1] or "0", m[2] ]
+
 
 	# Get interfaces
 	def _get_interfaces(self):
@@ -100,6 +112,8 @@ class QVisaResourceList(QWidget):
 		# Need a method to generate series of widgets for each interace type
 		self.interface_pages.addWidget( self.gen_widgets("RS-232") )
 		self.interface_pages.addWidget( self.gen_widgets("GPIB") )
+		self.interface_pages.addWidget( self.gen_widgets("TCPIP") )
+		self.interface_pages.addWidget( self.gen_widgets("USB") )
 
 		# Add widgets to layout
 		self.layout.addWidget(self._config._gen_vbox_widget( [self.interface_label, self.interface_select] ) ,1)
@@ -119,6 +133,12 @@ class QVisaResourceList(QWidget):
 		if self.interface_select.currentText() == "GPIB":
 			self.interface_pages.setCurrentIndex(1)
 
+		if self.interface_select.currentText() == "TCPIP":
+			self.interface_pages.setCurrentIndex(2)
+
+		if self.interface_select.currentText() == "USB":
+			self.interface_pages.setCurrentIndex(3)
+
 
 	# Method to get resource string out of widgets
 	def get_current_device(self):
@@ -159,23 +179,23 @@ class QVisaResourceList(QWidget):
 			return _widget
 
 
-		# GPIB Widgets
-		if (_type == "GPIB"):
+		# GPIB, LAN and USB widgets (board and address)
+		if (_type in ("GPIB", "TCPIP", "USB")):
 
 			# Create address combobox
 			_board_label = QLabel("<b>Board</b>")
 			_board = QComboBox()
 
-			# Create address combobox
-			_addr_label = QLabel("<b>Address</b>")
+			# Create address combobox (host for LAN, serial number for USB)
+			_addr_label = QLabel( "<b>%s</b>"%{"GPIB" : "Address", "TCPIP" : "Host", "USB" : "Serial"}[_type] )
 			_addr = QComboBox()
 
 
 			# Loop through all resources
 			for _resource, _data in self.resources.items():
 
-				# If data field is "RS-232"
-				if _data[0] == "GPIB":
+				# If data field matches interface
+				if _data[0] == _type:
 
 					# Add board and address to combobox
 					_board.addItem(_data[1])					
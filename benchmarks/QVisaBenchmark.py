@@ -0,0 +1,142 @@
+# ---------------------------------------------------------------------------------
+# 	QVisaBenchmark
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import time
+import collections
+import numpy as np
+
+# Import simulated backend
+from PyQtVisa.sim.QVisaSimResourceManager import QVisaSimResourceManager
+from PyQtVisa.sim.QVisaSimKeithley2400 import QVisaSimKeithley2400
+
+# Small benchmark harness. Each case is a callable which is timed over a 
+# number of repeats. Results are kept per case as:
+#
+#	["n"]		= (int) 	number of timed calls
+#	["mean"]	= (float)	seconds per call
+#	["median"]	= (float)	seconds per call
+#	["p95"]		= (float)	seconds per call
+#	["min"]		= (float)	seconds per call
+#	["rate"]	= (float)	units per second (units = items processed per call)
+#
+# Results can be written to json and compared against a baseline to catch
+# performance regressions.
+#
+
+class QVisaBenchmark:
+
+	def __init__(self, _name="PyQtVisa"):
+
+		self._name = _name
+		self._results = collections.OrderedDict()
+
+	# Time callable. _units is the number of items (points, readings, ...) 
+	# processed per call and is used to compute the rate.
+	def run(self, _case, _func, repeat=10, warmup=1, _units=1):
+
+		for _ in range(warmup):
+			_func()
+
+		_times = []
+		for _ in range(repeat):
+
+			_t = time.perf_counter()
+			_func()
+			_times.append( time.perf_counter() - _t )
+
+		_times = np.asarray(_times)
+		self._results[_case] = collections.OrderedDict([
+			("n", 		int(repeat)),
+			("mean", 	float( _times.mean() )),
+			("median", 	float( np.median(_times) )),
+			("p95", 	float( np.percentile(_times, 95) )),
+			("min", 	float( _times.min() )),
+			("rate", 	float( _units / _times.mean() ) if _times.mean() > 0 else float("inf")),
+		])
+
+		return self._results[_case]
+
+	# Record externally measured result (e.g. subprocess timings)
+	def add_result(self, _case, _seconds, _units=1):
+
+		self._results[_case] = collections.OrderedDict([
+			("n", 1), ("mean", _seconds), ("median", _seconds), ("p95", _seconds), ("min", _seconds),
+			("rate", float( _units / _seconds ) if _seconds > 0 else float("inf")),
+		])
+
+	def get_results(self):
+		return self._results
+
+	# Format results as table
+	def report(self):
+
+		_width = max( [32] + [ len(_case) for _case in self._results.keys() ] )
+
+		_lines = [ "%-*s %8s %12s %12s %12s %12s"%(_width, "case", "n", "mean (ms)", "median (ms)", "p95 (ms)", "rate (1/s)") ]
+		_lines.append( "-" * len(_lines[0]) )
+
+		for _case, _r in self._results.items():
+			_lines.append( "%-*s %8d %12.3f %12.3f %12.3f %12.1f"%(
+				_width, _case, _r["n"], 1e3 * _r["mean"], 1e3 * _r["median"], 1e3 * _r["p95"], _r["rate"]) )
+
+		return "\n".join(_lines)
+
+	# Write results to json
+	def write_json(self, _filename):
+
+		with open(_filename, 'w') as f:
+			json.dump( {"name" : self._name, "results" : self._results}, f, indent=2 )
+
+	# Compare median times against baseline json. Returns list of cases which
+	# are slower than the baseline by more than the tolerance (fraction).
+	def compare(self, _filename, _tolerance=0.2):
+
+		with open(_filename, 'r') as f:
+			_baseline = json.load(f)["results"]
+
+		_regressions = []
+		for _case, _r in self._results.items():
+
+			if _case in _baseline and _r["median"] > _baseline[_case]["median"] * ( 1.0 + _tolerance ):
+				_regressions.append( (_case, _baseline[_case]["median"], _r["median"]) )
+
+		return _regressions
+
+
+# Method to install a simulated station. Returns the simulated resource 
+# manager with one Keithley 2400 per resource name.
+def gen_sim_station(_resources=("GPIB0::24::INSTR",), **_kwargs):
+
+	_rm = QVisaSimResourceManager()
+
+	for _resource in _resources:
+		_rm.add_resource( QVisaSimKeithley2400(_resource, **_kwargs) )
+
+	return _rm.install()
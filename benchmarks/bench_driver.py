@@ -0,0 +1,238 @@
+# ---------------------------------------------------------------------------------
+# 	bench_driver
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+# Import drivers and data object
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# Import harness
+from .QVisaBenchmark import QVisaBenchmark, gen_sim_station
+
+# Benchmark suite for the driver stack on the simulated backend. Measures
+# device initialization, per-point meas() latency (also per acquisition profile),
+# sweep throughput (also with range planning), data save/load and (if Qt and matplotlib are available) 
+# plot refresh.
+#
+#	python -m benchmarks.bench_driver --nplc 0.1 --points 100
+#	python -m benchmarks.bench_driver --json results.json
+#	python -m benchmarks.bench_driver --baseline results.json --tolerance 0.2
+#
+
+_resource = "GPIB0::24::INSTR"
+
+# Initialize SMU for voltage source measurement
+def _setup_smu(_nplc):
+
+	_smu = keithley2400(_resource)
+	_smu.rst()
+	_smu.voltage_src()
+	_smu.current_cmp(0.1)
+	_smu.update_nplc(_nplc)
+	_smu.output_on()
+	return _smu
+
+# Device initialization (open, *IDN? check and *RST)
+def bench_init(_bench, _args):
+
+	def _init():
+		_smu = keithley2400(_resource)
+		_smu.check_idn()
+		_smu.rst()
+		_smu.close()
+
+	_bench.run("init", _init, repeat=_args.repeat)
+
+# Per-point measurement latency
+def bench_meas(_bench, _args):
+
+	_smu = _setup_smu(_args.nplc)
+	_smu.set_voltage(0.1)
+	_bench.run("meas (nplc=%s)"%_args.nplc, _smu.meas, repeat=_args.points)
+	_smu.close()
+
+# Per-point measurement latency for each acquisition profile
+def bench_profiles(_bench, _args):
+
+	_smu = _setup_smu(_args.nplc)
+	_smu.set_voltage(0.1)
+
+	for _profile in _smu.get_profiles():
+
+		# Fixed range holding 0.1V over the 1k simulated load
+		_ranges = {"current_range" : 1.05e-4} if _profile == "max-throughput" else {}
+
+		with _smu.use_profile(_profile, **_ranges):
+			_bench.run("meas (%s)"%_profile, _smu.meas, repeat=_args.points)
+
+	_smu.close()
+
+# Sweep throughput (set level, measure, parse)
+def bench_sweep(_bench, _args):
+
+	_smu = _setup_smu(_args.nplc)
+	_levels = [ 1.0 * _ / _args.points for _ in range(_args.points) ]
+
+	def _sweep():
+		for _level in _levels:
+			_smu.set_voltage(_level)
+			[ float(_) for _ in _smu.meas().split(",") ]
+
+	_bench.run("sweep (%d points)"%_args.points, _sweep, repeat=max(1, _args.repeat // 5), _units=_args.points)
+	_smu.close()
+
+# Wide dynamic range sweep (four decades, bipolar) with autorange against
+# range planned sweeps (see keithley2400.sweep). The difference is the 
+# simulated autorange and range change time, so compare at --scale 1.0 (at
+# small scales the wall time is dominated by python overhead).
+def bench_sweep_ranges(_bench, _args):
+
+	_smu = _setup_smu(_args.nplc)
+	_smu.current_cmp(1.0)
+
+	_decades = np.logspace(-3, 1, _args.points // 2)
+	_levels = np.concatenate([_decades, -_decades[::-1]])
+
+	def _autorange():
+		_smu.set_sense_range("CURR", None)
+		for _level in _levels:
+			_smu.set_voltage(_level)
+			_smu.meas_array()
+
+	_repeat = max(1, _args.repeat // 5)
+	_bench.run("sweep autorange (%d points)"%len(_levels), _autorange, repeat=_repeat, _units=len(_levels))
+	_bench.run("sweep planned (%d points)"%len(_levels), lambda : _smu.sweep(_levels), repeat=_repeat, _units=len(_levels))
+	_bench.run("sweep reordered (%d points)"%len(_levels), lambda : _smu.sweep(_levels, reorder=True), repeat=_repeat, _units=len(_levels))
+	_smu.close()
+
+# Save and load of data objects
+def bench_save_load(_bench, _args):
+
+	_data = QVisaDataObject()
+	for _n in range(10):
+
+		_key = _data.add_key("key%d"%_n)
+		_data.set_subkeys(_key, ["t", "V", "I"])
+		_data.set_metadata(_key, "nplc", _args.nplc)
+
+		for _i in range(_args.rows):
+			_data.append_subkey_data(_key, "t", 1e-3 * _i)
+			_data.append_subkey_data(_key, "V", 1e-2 * _i)
+			_data.append_subkey_data(_key, "I", 1e-6 * _i)
+
+	_dir = tempfile.mkdtemp()
+	_file = os.path.join(_dir, "bench.dat")
+
+	try:
+		_bench.run("save (%d rows)"%(10 * _args.rows), lambda : _data.write_to_file(_file), repeat=_args.repeat, _units=10 * _args.rows)
+		_bench.run("load (%d rows)"%(10 * _args.rows), lambda : QVisaDataObject().read_from_file(_file), repeat=_args.repeat, _units=10 * _args.rows)
+
+	finally:
+		shutil.rmtree(_dir)
+
+# Plot refresh. Requires PyQt5 and matplotlib (offscreen platform).
+def bench_plot(_bench, _args):
+
+	try:
+		os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+		from PyQt5.QtWidgets import QApplication
+		from PyQtVisa.widgets.QVisaDynamicPlot import QVisaDynamicPlot
+
+	except ImportError as e:
+		print("Skipping plot benchmark (%s)"%str(e))
+		return
+
+	_qapp = QApplication.instance() or QApplication(sys.argv)
+
+	_plot = QVisaDynamicPlot(None)
+	_plot.add_subplot(111)
+	_plot.add_axes_handle("111", "trace")
+
+	def _refresh():
+		_plot.append_handle_data("111", "trace", 0.0, 0.0)
+		_plot.update_canvas()
+
+	_bench.run("plot refresh", _refresh, repeat=_args.repeat)
+
+# Benchmark cases
+_cases = {
+	"init" 		: bench_init,
+	"meas" 		: bench_meas,
+	"profiles" 	: bench_profiles,
+	"sweep" 	: bench_sweep,
+	"sweep_ranges" : bench_sweep_ranges,
+	"save_load" : bench_save_load,
+	"plot" 		: bench_plot,
+}
+
+def main(argv=None):
+
+	_parser = argparse.ArgumentParser(description="PyQtVisa driver benchmarks (simulated backend)")
+	_parser.add_argument("cases", nargs="*", default=list(_cases.keys()), help="cases to run (%s)"%", ".join(_cases.keys()))
+	_parser.add_argument("--nplc", type=float, default=0.1, help="integration time (power line cycles)")
+	_parser.add_argument("--points", type=int, default=50, help="points per meas/sweep case")
+	_parser.add_argument("--rows", type=int, default=1000, help="rows per key in save/load case")
+	_parser.add_argument("--repeat", type=int, default=10, help="repeats per case")
+	_parser.add_argument("--scale", type=float, default=1.0, help="simulator time scale")
+	_parser.add_argument("--gpib-overhead", type=float, default=1.0e-3, help="simulated seconds per bus transaction")
+	_parser.add_argument("--command-latency", type=float, default=0.1e-3, help="simulated seconds per command")
+	_parser.add_argument("--json", help="write results to json file")
+	_parser.add_argument("--baseline", help="compare against baseline json file")
+	_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against baseline (fraction)")
+	_args = _parser.parse_args(argv)
+
+	gen_sim_station( (_resource,), scale=_args.scale, gpib_overhead=_args.gpib_overhead, command_latency=_args.command_latency )
+
+	_bench = QVisaBenchmark("bench_driver")
+	for _case in _args.cases:
+		_cases[_case](_bench, _args)
+
+	print(_bench.report())
+
+	if _args.json:
+		_bench.write_json(_args.json)
+
+	if _args.baseline:
+
+		_regressions = _bench.compare(_args.baseline, _args.tolerance)
+		for _case, _base, _now in _regressions:
+			print("REGRESSION %s: %.3f ms -> %.3f ms"%(_case, 1e3 * _base, 1e3 * _now))
+
+		return 1 if _regressions else 0
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,125 @@
+# ---------------------------------------------------------------------------------
+# 	bench_import
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+import json
+import argparse
+import subprocess
+
+# Import harness
+from .QVisaBenchmark import QVisaBenchmark
+
+# Benchmark for package import cost. Each import is run in a fresh interpreter
+# with -X importtime. The cumulative import time of the target module is taken
+# from the importtime report, and the interpreter checks which heavy packages
+# (Qt, matplotlib) ended up in sys.modules. Headless imports which pull in Qt
+# or matplotlib are reported as failures.
+#
+#	python -m benchmarks.bench_import
+#	python -m benchmarks.bench_import --json results.json
+#
+
+_heavy = ("PyQt5", "matplotlib")
+
+# Import cases: (module, headless)
+_cases = [
+	("PyQtVisa", 									True),
+	("PyQtVisa.drivers.keithley2400", 				True),
+	("PyQtVisa.utils.QVisaDataObject", 				True),
+	("PyQtVisa.sim.QVisaSimResourceManager", 		True),
+	("PyQtVisa.QVisaConfigure", 					False),
+	("PyQtVisa.QVisaApplication", 					False),
+	("PyQtVisa.widgets.QVisaDynamicPlot", 			False),
+]
+
+# Script executed in the subprocess. Prints loaded heavy packages as json.
+_script = "import sys, json; import %s; print(json.dumps([_ for _ in %r if _ in sys.modules]))"
+
+# Import module in fresh interpreter. Returns (seconds, heavy modules) or
+# (None, error message) if the import fails.
+def measure_import(_module):
+
+	_proc = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", _script%(_module, _heavy)],
+		stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+	)
+
+	if _proc.returncode != 0:
+		return None, _proc.stderr.strip().splitlines()[-1]
+
+	# importtime lines: "import time: self [us] | cumulative | imported package"
+	_cumulative = 0
+	for _line in _proc.stderr.splitlines():
+
+		_fields = _line.split("|")
+		if len(_fields) == 3 and _fields[2].strip() == _module:
+			_cumulative = int( _fields[1] )
+
+	return 1e-6 * _cumulative, json.loads( _proc.stdout.strip().splitlines()[-1] )
+
+def main(argv=None):
+
+	_parser = argparse.ArgumentParser(description="PyQtVisa import benchmarks")
+	_parser.add_argument("--json", help="write results to json file")
+	_parser.add_argument("--baseline", help="compare against baseline json file")
+	_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against baseline (fraction)")
+	_args = _parser.parse_args(argv)
+
+	_bench = QVisaBenchmark("bench_import")
+	_failed = []
+
+	for _module, _headless in _cases:
+
+		_seconds, _loaded = measure_import(_module)
+
+		if _seconds is None:
+			print("Skipping %s (%s)"%(_module, _loaded))
+			continue
+
+		_bench.add_result(_module, _seconds)
+
+		if _headless and _loaded != []:
+			_failed.append( (_module, _loaded) )
+
+	print(_bench.report())
+
+	for _module, _loaded in _failed:
+		print("HEADLESS IMPORT %s loaded %s"%(_module, ", ".join(_loaded)))
+
+	if _args.json:
+		_bench.write_json(_args.json)
+
+	_regressions = _bench.compare(_args.baseline, _args.tolerance) if _args.baseline else []
+	for _case, _base, _now in _regressions:
+		print("REGRESSION %s: %.3f ms -> %.3f ms"%(_case, 1e3 * _base, 1e3 * _now))
+
+	return 1 if ( _failed or _regressions ) else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -42,8 +42,8 @@ setup(name='PyQtVisa',
 		url="https://github.com/mesoic/PyQtVisa",
 		keywords='Qt VISA GPIB USB serial RS232 measurement acquisition',
 		license='MIT License',
-		python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*',
-		install_requires=['visa', 'matplotlib', 'PyQt5'],
+		python_requires='>=3.7',
+		install_requires=['pyvisa', 'numpy', 'matplotlib', 'PyQt5'],
 		classifiers=[
 			'Development Status :: 5 - Production/Stable',
 			'Intended Audience :: Developers',
@@ -55,15 +55,16 @@ setup(name='PyQtVisa',
 			'Programming Language :: Python',
 			'Topic :: Scientific/Engineering :: Interface Engine/Protocol Translator',
 			'Topic :: Software Development :: Libraries :: Python Modules',
-			'Programming Language :: Python :: 2',
-			'Programming Language :: Python :: 2.7',
 			'Programming Language :: Python :: 3',
-			'Programming Language :: Python :: 3.4',
-			'Programming Language :: Python :: 3.5',
-			'Programming Language :: Python :: 3.6',
+			'Programming Language :: Python :: 3 :: Only',
 			'Programming Language :: Python :: 3.7',
+			'Programming Language :: Python :: 3.8',
+			'Programming Language :: Python :: 3.9',
+			'Programming Language :: Python :: 3.10',
+			'Programming Language :: Python :: 3.11',
 			],
-		packages=['PyQtVisa', 'PyQtVisa.widgets','PyQtVisa.drivers', 'PyQtVisa.utils'],
+		packages=['PyQtVisa', 'PyQtVisa.widgets','PyQtVisa.drivers', 'PyQtVisa.utils', 'PyQtVisa.sim', 'PyQtVisa.core'],
+		entry_points={'pyqtvisa.drivers': ['keithley2400 = PyQtVisa.drivers.keithley2400:keithley2400']},
 		platforms="Linux, Windows, Mac",
 		use_2to3=False,
 		zip_safe=False,
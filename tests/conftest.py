@@ -0,0 +1,49 @@
+# ---------------------------------------------------------------------------------
+# 	conftest
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+# Import simulated backend
+from PyQtVisa.sim.QVisaSimResourceManager import QVisaSimResourceManager
+from PyQtVisa.sim.QVisaSimKeithley2400 import QVisaSimKeithley2400
+
+# Simulated station with two Keithley 2400 SourceMeters. The time scale is 
+# zero, so simulated instruments never sleep. The fixture returns the 
+# simulated resource manager (use get_resource to access a model).
+@pytest.fixture
+def station():
+
+	_rm = QVisaSimResourceManager()
+
+	for _resource in ("GPIB0::24::INSTR", "GPIB0::25::INSTR"):
+		_rm.add_resource( QVisaSimKeithley2400(_resource, scale=0.0) )
+
+	_rm.install()
+	yield _rm
+	_rm.uninstall()
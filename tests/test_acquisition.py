@@ -0,0 +1,102 @@
+# ---------------------------------------------------------------------------------
+# 	test_acquisition
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+# Import headless core and driver
+from PyQtVisa.core.QVisaAcquisition import QVisaAcquisition
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# Voltage sweep procedure. Stops on abort.
+def _iv_sweep(_acq, _voltages):
+
+	_smu = _acq.get_device_by_name("Keithley GPIB0::24")
+	_smu.voltage_src()
+	_smu.output_on()
+
+	_data = _acq.get_data_object()
+	_key = _data.add_hash_key("iv")
+	_data.add_subkey(_key, "V")
+
+	for _voltage in _voltages:
+
+		if _acq.is_aborted():
+			break
+
+		_smu.set_voltage(_voltage)
+		_smu.meas()
+		_data.append_subkey_data(_key, "V", _voltage)
+
+	_smu.output_off()
+	return _key
+
+# Procedures run on the registry without Qt
+def test_run_procedure(station):
+
+	_registry = QVisaDeviceRegistry()
+	_registry.add_device( keithley2400("GPIB0::24::INSTR") )
+
+	_acq = QVisaAcquisition(_registry)
+	_key = _acq.run(_iv_sweep, [0.0, 0.1, 0.2])
+
+	assert list( _acq.get_data_object().get_subkey_data(_key, "V") ) == [0.0, 0.1, 0.2]
+	assert not _acq.is_running()
+
+# Abort ends waits of the running procedure. A stale abort is cleared on run.
+def test_abort():
+
+	_acq = QVisaAcquisition()
+	_acq.abort()
+	assert _acq.run(lambda _acq: _acq.is_aborted()) is False
+
+	threading.Timer(0.05, _acq.abort).start()
+	assert _acq.run(lambda _acq: _acq.wait(5.0)) is True
+
+# Results of batch jobs are merged in job order. Workers returning the same 
+# key do not collide.
+def _worker(_job):
+
+	_data = QVisaDataObject()
+	_key = _data.add_key("job")
+	_data.add_subkey(_key, "job")
+	_data.append_subkey_data(_key, "job", _job)
+	return _data
+
+@pytest.mark.parametrize("_max_workers", [1, 2])
+def test_run_batch(_max_workers):
+
+	_data = QVisaAcquisition().run_batch(_worker, [3, 1, 2], max_workers=_max_workers)
+
+	assert list( _data.keys() ) == ["job_0", "job_1", "job_2"]
+	assert [ _data.get_subkey_data(_key, "job")[0] for _key in _data.keys() ] == [3, 1, 2]
+	assert [ _data.get_metadata(_key, "__job__") for _key in _data.keys() ] == [0, 1, 2]
@@ -0,0 +1,104 @@
+# ---------------------------------------------------------------------------------
+# 	test_bus_scheduler
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+import pyvisa
+
+# Import scheduler and driver
+from PyQtVisa.core.QVisaBusScheduler import QVisaBusScheduler
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+_resources = ("GPIB0::24::INSTR", "GPIB0::25::INSTR")
+
+# Voltage sources at different levels
+def _setup_smus(_station, _nplc=1.0):
+
+	_smus = []
+	for _resource, _level in zip(_resources, (0.1, 0.2)):
+
+		_smu = keithley2400(_resource)
+		_smu.rst()
+		_smu.voltage_src()
+		_smu.current_cmp(0.1)
+		_smu.update_nplc(_nplc)
+		_smu.set_voltage(_level)
+		_smu.output_on()
+		_smus.append(_smu)
+
+	return _smus
+
+# Responses are returned in device order keyed on resource
+def test_scheduler_meas_query(station):
+
+	_smus = _setup_smus(station)
+	_scheduler = QVisaBusScheduler()
+
+	_buffers = _scheduler.meas( reversed(_smus) )
+	assert list(_buffers) == list( reversed(_resources) )
+	assert [ _smus[_n].decode_readings(_buffers[_r])["volt"][0] for _n, _r in enumerate(_resources) ] == pytest.approx([0.1, 0.2], rel=1e-2)
+
+	_responses = _scheduler.query( [ (_smu, "*IDN?") for _smu in _smus ] )
+	assert all( _.startswith("KEITHLEY INSTRUMENTS INC.,MODEL 24") for _ in _responses.values() )
+	assert not any( _smu.is_pending() for _smu in _smus )
+
+# Integration times of devices on the bus overlap
+def test_scheduler_overlap(station):
+
+	for _resource in _resources:
+		station.get_resource(_resource).scale = 1.0
+
+	_smus = _setup_smus(station, 2.0)
+	_scheduler = QVisaBusScheduler()
+
+	_start = time.perf_counter()
+	for _smu in _smus:
+		_smu.meas()
+	_sequential = time.perf_counter() - _start
+
+	_start = time.perf_counter()
+	_scheduler.meas(_smus)
+	_scheduled = time.perf_counter() - _start
+
+	assert _scheduled < 0.75 * _sequential
+
+# Pending queries are cancelled on timeout and the devices stay usable
+def test_scheduler_timeout(station):
+
+	for _resource in _resources:
+		station.get_resource(_resource).scale = 1.0
+
+	_smus = _setup_smus(station, 10.0)
+
+	with pytest.raises(pyvisa.VisaIOError):
+		QVisaBusScheduler().meas(_smus, timeout=0.01)
+
+	assert not any( _smu.is_pending() for _smu in _smus )
+	assert _smus[0].query("*IDN?").startswith("KEITHLEY")
@@ -0,0 +1,63 @@
+# ---------------------------------------------------------------------------------
+# 	test_config_cache
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import driver
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+# Actions are not cached and ';' messages are cached per header
+def test_config_cache_actions(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+
+	_smu.write(":SYST:AZER:STAT ON")
+	_smu.write(":SYST:AZER:STAT ONCE")
+	_smu.write(":TRAC:CLE;:TRAC:FEED:CONT NEXT")
+	_smu.memory_save(1)
+
+	for _ in range(10):
+		_smu.write(":SOUR:VOLT 0.1;CURR 0.2;:SENS:CURR:PROT 0.01")
+
+	assert _smu.get_config_cache() == [ 
+		"*RST", ":SYST:AZER:STAT ON", ":SOUR:VOLT 0.1", ":SOUR:CURR 0.2", ":SENS:CURR:PROT 0.01"
+	]
+
+# Reconnect replays configuration and drops cached values
+def test_reconnect_invalidates_state(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_smu.set_voltage(0.5)
+
+	station.get_resource("GPIB0::24::INSTR").settings["SOUR:VOLT"] = "0"
+	assert _smu.reconnect()
+
+	assert _smu.get_cached_value("voltage") is None
+	assert _smu.get_voltage() == 0.5
@@ -0,0 +1,120 @@
+# ---------------------------------------------------------------------------------
+# 	test_data_combine
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+# Import data object
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# Data object with list data on "a" and columnar data on "b"
+def _gen_data():
+
+	_data = QVisaDataObject()
+
+	for _key, _values in ( ("a", [1.0, 2.0, 3.0]), ("b", [4.0, 5.0]) ):
+		_data.add_key(_key)
+		_data.set_subkeys(_key, ["V", "I"])
+		_data.extend_subkey_data(_key, "V", _values)
+		_data.extend_subkey_data(_key, "I", [ 1.0e-3 * _ for _ in _values ])
+		_data.set_metadata(_key, "__root__", _data.roothash())
+		_data.set_metadata(_key, "nplc", 1.0)
+
+	_data.to_columnar("b")
+	return _data
+
+# Merged buffers are independent of the other object
+def test_merge_copies():
+
+	_other = _gen_data()
+	_data = QVisaDataObject()
+	_data.enable_subkey_stats("a", "V")
+
+	assert _data.merge(_other) == ["a", "b"]
+	assert _data.get_metadata("a", "__root__") == _data.roothash()
+	assert _data.get_subkey_stats("a", "V").get_count() == 3
+
+	_data.append_subkey_data("a", "V", 10.0)
+	_other.append_subkey_data("a", "V", 20.0)
+	_other.get_subkey_data("b", "V")[0] = -1.0
+
+	assert _data.get_subkey_data("a", "V") == [1.0, 2.0, 3.0, 10.0]
+	assert _other.get_subkey_data("a", "V") == [1.0, 2.0, 3.0, 20.0]
+	assert list( _data.get_subkey_data("b", "V") ) == [4.0, 5.0]
+	assert _data.get_subkey_stats("a", "V").get_mean() == 4.0
+
+	with pytest.raises(KeyError):
+		_data.merge(_other)
+
+# Renamed keys keep their data, statistics and roots
+def test_merge_rename():
+
+	_other = _gen_data()
+	_other.set_metadata("b", "__root__", "a")
+	_other.enable_subkey_stats("a", "V")
+
+	_data = _gen_data()
+	assert _data.merge(_other, rename={"a" : "a_1", "b" : "b_1"}) == ["a_1", "b_1"]
+
+	assert _data.get_subkey_data("a_1", "V") == [1.0, 2.0, 3.0]
+	assert _data.get_metadata("a_1", "__root__") == _data.roothash()
+	assert _data.get_metadata("b_1", "__root__") == "a_1"
+	assert _data.get_subkey_stats("a_1", "V").get_count() == 3
+
+	with pytest.raises(KeyError):
+		_data.merge(_other, rename={"a" : "c", "b" : "c"})
+
+# Statistics enabled on the other object are rebuilt on merge
+def test_merge_stats():
+
+	_other = _gen_data()
+	_other.enable_subkey_stats("b", "V", ewma=0.5)
+
+	_data = QVisaDataObject()
+	_data.merge(_other)
+
+	_stats = _data.get_subkey_stats("b", "V")
+	assert _stats is not _other.get_subkey_stats("b", "V")
+	assert _stats.get_alpha() == 0.5 and _stats.get_mean() == 4.5
+
+# Concatenation of list and columnar keys and slices
+def test_concat_slice():
+
+	_data = _gen_data()
+
+	_key = _data.concat_keys(["a", "b"], "ab")
+	assert list( _data.get_subkey_data(_key, "V") ) == [1.0, 2.0, 3.0, 4.0, 5.0]
+	assert _data.get_metadata(_key, "__source__") == ["a", "b"]
+	assert _data.get_metadata(_key, "nplc") == 1.0
+
+	_key = _data.slice("b", 1, None, None, "b1")
+	assert list( _data.get_subkey_data(_key, "I") ) == [5.0e-3]
+	assert _data.get_metadata(_key, "__range__") == (1, None, None)
+
+	with pytest.raises(ValueError):
+		_data.concat_keys([])
@@ -0,0 +1,98 @@
+# ---------------------------------------------------------------------------------
+# 	test_data_index
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+
+# Import data object and index
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+from PyQtVisa.utils.QVisaDataIndex import QVisaDataIndex
+
+# Write data object with one key per sweep
+def _write(_filename, _note, _sweeps):
+
+	_data = QVisaDataObject()
+	_data.set_metadata("__self__", "__note__", _note)
+
+	for _name, _nplc, _points in _sweeps:
+
+		_key = _data.add_key(_name)
+		_data.set_subkeys(_key, ["V", "I"])
+		_data.set_metadata(_key, "nplc", _nplc)
+
+		for _n in range(_points):
+			_data.append_subkey_data(_key, "V", float(_n))
+			_data.append_subkey_data(_key, "I", 1.0e-6 * _n)
+
+	_data.write_to_file(_filename)
+	return _data.roothash()
+
+# Lookups by hash, note, key, subkey and metadata
+def test_index_lookup(tmp_path):
+
+	_hash = _write( str(tmp_path / "a.dat"), "diode", [("iv", 1.0, 5), ("cv", 10.0, 3)] )
+	_write( str(tmp_path / "b.dat"), "resistor", [("iv", 10.0, 4)] )
+	(tmp_path / "notes.txt").write_text("not a data file\n")
+
+	_index = QVisaDataIndex( str(tmp_path) )
+	assert _index.update()["added"] == ["a.dat", "b.dat", "notes.txt"]
+
+	assert _index.files() == ["a.dat", "b.dat"]
+	assert _index.find_hash(_hash) == "a.dat"
+	assert _index.find_note("resis") == ["b.dat"]
+	assert _index.find(key="iv") == [("a.dat", "iv"), ("b.dat", "iv")]
+	assert _index.find(subkey="I", nplc=10.0) == [("a.dat", "cv"), ("b.dat", "iv")]
+	assert _index.get_entry("a.dat")["keys"]["cv"]["rows"] == 3
+
+	_table = _index.get_meta_table()
+	assert _table.where( _table.column("__rows__") > 3 ) == [("a.dat", "iv"), ("b.dat", "iv")]
+
+	# Single block read through the catalog offset
+	_data = _index.load("a.dat", "cv")
+	assert list( _data.keys() ) == ["cv"]
+	assert _data.get_subkey_data("cv", "V") == [0.0, 1.0, 2.0]
+
+# Only changed files are scanned again and the catalog persists
+def test_index_incremental(tmp_path):
+
+	for _name in ("a", "b", "c"):
+		_write( str(tmp_path / ("%s.dat"%_name)), _name, [("iv", 1.0, 2)] )
+
+	QVisaDataIndex( str(tmp_path) ).update()
+
+	_index = QVisaDataIndex( str(tmp_path) )
+	assert _index.files() == ["a.dat", "b.dat", "c.dat"]
+	assert _index.update() == {"added" : [], "updated" : [], "removed" : []}
+
+	_write( str(tmp_path / "b.dat"), "b", [("iv", 2.0, 6)] )
+	os.remove( str(tmp_path / "c.dat") )
+	_write( str(tmp_path / "d.dat"), "d", [("iv", 1.0, 2)] )
+
+	assert _index.update() == {"added" : ["d.dat"], "updated" : ["b.dat"], "removed" : ["c.dat"]}
+	assert _index.find(nplc=2.0) == [("b.dat", "iv")]
+	assert QVisaDataIndex( str(tmp_path) ).find(nplc=2.0) == [("b.dat", "iv")]
@@ -0,0 +1,75 @@
+# ---------------------------------------------------------------------------------
+# 	test_data_loader
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import pytest
+
+# Import data object and loader
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+from PyQtVisa.utils.QVisaDataLoader import QVisaDataLoader
+
+# Write data files with n values on key "iv"
+def _write_files(_path, _count):
+
+	for _n in range(_count):
+
+		_data = QVisaDataObject()
+		_key = _data.add_key("iv")
+		_data.set_subkeys(_key, ["V"])
+		_data.extend_subkey_data(_key, "V", [float(_) for _ in range(_n + 1)])
+		_data.write_to_file( str(_path / ("%02d.dat"%_n)) )
+
+# Files are loaded in input order, in parallel and as one table
+@pytest.mark.parametrize("_workers", [1, 2])
+def test_load(tmp_path, _workers):
+
+	_write_files(tmp_path, 4)
+	_loader = QVisaDataLoader(max_workers=_workers)
+
+	_results = _loader.load( str(tmp_path), "*.dat" )
+	assert [ os.path.basename(_) for _ in _results.keys() ] == ["00.dat", "01.dat", "02.dat", "03.dat"]
+	assert list( _results[ str(tmp_path / "03.dat") ].get_subkey_data("iv", "V") ) == [0.0, 1.0, 2.0, 3.0]
+
+	_table = _loader.load_table( str(tmp_path), "*.dat" )
+	assert len(_table["value"]) == 10
+	assert list( _table["index"][-4:] ) == [0, 1, 2, 3]
+	assert _table["file"][-1] == str(tmp_path / "03.dat")
+
+# Corrupt files raise an error which names the file
+@pytest.mark.parametrize("_workers", [1, 2])
+def test_load_error(tmp_path, _workers):
+
+	_write_files(tmp_path, 2)
+	(tmp_path / "01.dat").write_text("*! QVisaDataObject v1.2\n*! hash 1234567\n\n#! __data__ iv\nV\nnot-a-number\n\n")
+
+	with pytest.raises(ValueError, match="01.dat"):
+		QVisaDataLoader(max_workers=_workers).load( str(tmp_path), "*.dat" )
+
+	with pytest.raises(FileNotFoundError):
+		QVisaDataLoader(max_workers=_workers).load( [ str(tmp_path / "00.dat"), str(tmp_path / "missing.dat") ] )
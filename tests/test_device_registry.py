@@ -0,0 +1,125 @@
+# ---------------------------------------------------------------------------------
+# 	test_device_registry
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import threading
+
+# Import registry, supervisor and driver
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from PyQtVisa.core.QVisaSupervisor import QVisaSupervisor
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+_resources = ("GPIB0::24::INSTR", "GPIB0::25::INSTR")
+
+# Lookups by resource, name, type and bus follow add and remove
+def test_registry_indexes(station):
+
+	_registry = QVisaDeviceRegistry()
+	_events = []
+	_registry.add_listener( lambda _event, _device: _events.append( (_event, _device.get_property("resource")) ) )
+
+	_smus = [ keithley2400(_) for _ in _resources ]
+	for _smu in _smus:
+		_registry.add_device(_smu)
+
+	assert len(_registry) == 2 and "GPIB0::25::INSTR" in _registry
+	assert _registry.get_device("GPIB0::24::INSTR") is _smus[0]
+	assert _registry.get_device_by_name("Keithley GPIB0::25") is _smus[1]
+	assert _registry.get_devices_by_type("Keithley") == _smus
+	assert _registry.get_devices_by_bus("GPIB0") == _smus
+	assert _registry.get_device_names() == ["Keithley GPIB0::24", "Keithley GPIB0::25"]
+
+	assert _registry.remove_device("GPIB0::24::INSTR", close=True) is _smus[0]
+	assert _registry.get_device_by_name("Keithley GPIB0::24") is None
+	assert _registry.get_devices_by_bus("GPIB0") == [ _smus[1] ]
+	assert _registry.get_device_names() == ["Keithley GPIB0::25"]
+	assert not station.get_resource("GPIB0::24::INSTR")._open
+
+	assert _events == [ ("added", _resources[0]), ("added", _resources[1]), ("removed", _resources[0]) ]
+
+# A device added on a registered resource replaces the old device
+def test_registry_replace(station):
+
+	_registry = QVisaDeviceRegistry()
+	_registry.add_device( keithley2400(_resources[0]) )
+
+	_smu = keithley2400(_resources[0])
+	_registry.add_device(_smu)
+
+	assert _registry.Devices == [_smu]
+	assert _registry.get_devices_by_type("Keithley") == [_smu]
+
+# Shutdown stops streaming and supervisors, puts outputs off and closes
+def test_close_devices(station):
+
+	_registry = QVisaDeviceRegistry()
+	_smus = [ keithley2400(_) for _ in _resources ]
+	for _smu in _smus:
+		_registry.add_device(_smu)
+		_smu.output_on()
+
+	_supervisor = QVisaSupervisor(_registry, interval=0.01)
+	_supervisor.start()
+	_smus[0].stream_start(10, 0.01)
+
+	assert _registry.close_devices(timeout=1.0) == {}
+	assert not _supervisor.is_running() and len(_registry) == 0
+
+	for _resource in _resources:
+		assert station.get_resource(_resource).settings["OUTP:STAT"] == "0"
+		assert not station.get_resource(_resource)._open
+
+# A device which hangs in output_off is reported and closed after output_off
+def test_close_devices_timeout(station):
+
+	_registry = QVisaDeviceRegistry()
+	_smus = [ keithley2400(_) for _ in _resources ]
+	for _smu in _smus:
+		_registry.add_device(_smu)
+
+	_release = threading.Event()
+	_output_off = _smus[0].output_off
+	_smus[0].output_off = lambda: ( _release.wait(5.0), _output_off() )
+
+	_errors = _registry.close_devices(timeout=0.1)
+	assert list(_errors) == [ _resources[0] ]
+	assert [ _step for _step, _ in _errors[_resources[0]] ] == ["output_off"]
+	assert isinstance(_errors[_resources[0]][0][1], TimeoutError)
+
+	assert station.get_resource(_resources[0])._open
+	assert not station.get_resource(_resources[1])._open
+
+	_release.set()
+	for _ in range(100):
+		if not station.get_resource(_resources[0])._open:
+			break
+		time.sleep(0.01)
+
+	assert station.get_resource(_resources[0]).settings["OUTP:STAT"] == "0"
+	assert not station.get_resource(_resources[0])._open
@@ -0,0 +1,73 @@
+# ---------------------------------------------------------------------------------
+# 	test_discovery
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import discovery, driver and registry
+from PyQtVisa.core.QVisaDiscovery import QVisaDiscovery
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.sim.QVisaSimKeithley2400 import QVisaSimKeithley2400
+
+# Discovery lists the resources which drivers can open
+def test_populate_query(station):
+
+	station.add_resource( QVisaSimKeithley2400("TCPIP0::10.0.0.5::5025::SOCKET", scale=0.0) )
+
+	_devices = QVisaDiscovery().populate( QVisaDeviceRegistry() )
+	assert sorted( _.get_property("resource") for _ in _devices ) == ["GPIB0::24::INSTR", "GPIB0::25::INSTR"]
+
+	# Resources which are outside of the driver query are skipped
+	_devices = QVisaDiscovery(query="?*").populate( QVisaDeviceRegistry(), resources=["TCPIP0::10.0.0.5::5025::SOCKET"] )
+	assert _devices == []
+
+# Devices which fail to initialize are skipped and their sessions closed
+def test_populate_init_error(station, monkeypatch):
+
+	def _rst(self):
+		raise RuntimeError("init failed")
+
+	monkeypatch.setattr(keithley2400, "rst", _rst)
+
+	assert QVisaDiscovery().populate( QVisaDeviceRegistry(), reset=True ) == []
+	assert not station.get_resource("GPIB0::24::INSTR")._open
+
+# Sessions are closed when the driver constructor raises after opening them
+def test_populate_constructor_error(station, monkeypatch):
+
+	_init = keithley2400.__init__
+
+	def _fail(self, _resource):
+		_init(self, _resource)
+		raise RuntimeError("driver setup failed")
+
+	monkeypatch.setattr(keithley2400, "__init__", _fail)
+
+	assert QVisaDiscovery().populate( QVisaDeviceRegistry() ) == []
+	assert not station.get_resource("GPIB0::24::INSTR")._open
+	assert not station.get_resource("GPIB0::25::INSTR")._open
@@ -0,0 +1,66 @@
+# ---------------------------------------------------------------------------------
+# 	test_imports
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+import subprocess
+
+import pytest
+
+# Headless imports do not load Qt or matplotlib
+def test_headless_imports():
+
+	_script = "; ".join([
+		"import sys",
+		"import PyQtVisa",
+		"import PyQtVisa.drivers.keithley2400",
+		"import PyQtVisa.core.QVisaAcquisition",
+		"import PyQtVisa.sim.QVisaSimKeithley2400",
+		"print( ','.join( sorted( set( _.split('.')[0] for _ in sys.modules ) & {'PyQt5', 'matplotlib'} ) ) )",
+	])
+
+	_output = subprocess.run([sys.executable, "-c", _script], capture_output=True, text=True, check=True)
+	assert _output.stdout.strip() == ""
+
+# Subpackages and their modules are loaded on attribute access
+def test_lazy_submodules():
+
+	_script = "; ".join([
+		"import PyQtVisa",
+		"print( PyQtVisa.drivers.keithley2400.keithley2400.__name__ )",
+		"print( PyQtVisa.core.QVisaAcquisition.QVisaAcquisition.__name__ )",
+		"print( PyQtVisa.utils.QVisaDataObject.__name__ )",
+		"print( 'core' in dir(PyQtVisa) and 'keithley2400' in dir(PyQtVisa.drivers) )",
+	])
+
+	_output = subprocess.run([sys.executable, "-c", _script], capture_output=True, text=True, check=True)
+	assert _output.stdout.split() == ["keithley2400", "QVisaAcquisition", "PyQtVisa.utils.QVisaDataObject", "True"]
+
+	import PyQtVisa.sim
+	with pytest.raises(AttributeError):
+		PyQtVisa.sim.QVisaMissing
@@ -0,0 +1,62 @@
+# ---------------------------------------------------------------------------------
+# 	test_meas_timeout
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import driver and simulated backend
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.sim.QVisaSimResourceManager import QVisaSimResourceManager
+from PyQtVisa.sim.QVisaSimKeithley2400 import QVisaSimKeithley2400
+
+# Timeout follows settings which are not cached (e.g. written by another session)
+def test_meas_timeout_uncached(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_sim.settings["TRIG:COUN"] = "100"
+	_sim.settings["SENS:CURR:NPLC"] = "10"
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	assert _smu.get_meas_timeout() > 2000.0 * 100 * 3 * 10 / 60.0
+
+# Retries wait for the response of the same :READ?
+def test_meas_retry_reads_response():
+
+	_rm = QVisaSimResourceManager()
+	_rm.add_resource( QVisaSimKeithley2400("GPIB0::24::INSTR") )
+	_rm.install()
+
+	try:
+		_smu = keithley2400("GPIB0::24::INSTR")
+		_smu.rst()
+		_smu.get_meas_timeout = lambda: 20
+
+		assert len( _smu.meas(_retries=10).split(",") ) == 5
+		assert _smu.query("*IDN?").startswith("KEITHLEY")
+
+	finally:
+		_rm.uninstall()
@@ -0,0 +1,142 @@
+# ---------------------------------------------------------------------------------
+# 	test_meta_table
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import math
+
+import numpy as np
+
+# Import data object and meta table
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+from PyQtVisa.utils.QVisaMetaTable import QVisaMetaTable
+
+_values = {
+	"int" 		: 10,
+	"float" 	: 1.0e-6,
+	"bool" 		: True,
+	"str" 		: "Keithley 2400",
+	"strnan" 	: "nan",
+	"inf" 		: float("inf"),
+	"neginf" 	: float("-inf"),
+	"list" 		: [1.0, float("nan"), float("inf")],
+	"tuple" 	: (0, None, 2.5),
+	"dict" 		: {"nplc" : 1.0, "range" : "AUTO"},
+	"array" 	: np.array([1.0, 2.0]),
+}
+
+# Compare metadata values (nan equals nan)
+def _equal(_a, _b):
+
+	if isinstance(_a, float) and isinstance(_b, float):
+		return _a == _b or ( math.isnan(_a) and math.isnan(_b) )
+
+	if isinstance(_a, (list, tuple)):
+		return type(_a) == type(_b) and len(_a) == len(_b) and all( _equal(*_) for _ in zip(_a, _b) )
+
+	return _a == _b and type(_a) == type(_b)
+
+# Non-finite floats and quoted strings survive encode and decode
+def test_encode_decode():
+
+	for _value in _values.values():
+		_value = _value.tolist() if hasattr(_value, "tolist") else _value
+		assert _equal( QVisaMetaTable.decode_value( QVisaMetaTable.encode_value(_value) ), _value )
+
+	assert math.isnan( QVisaMetaTable.decode_value("nan") )
+	assert QVisaMetaTable.decode_value("not a literal") == "not a literal"
+
+# Typed metadata round-trips through v1.2 files
+def test_file_round_trip(tmp_path):
+
+	_data = QVisaDataObject()
+	_data.set_metadata("__self__", "__note__", "IV sweep")
+	_data.set_metadata("__self__", "operator", "lab")
+
+	_key = _data.add_key("iv")
+	_data.set_subkeys(_key, ["V", "I"])
+	_data.append_subkey_data(_key, "V", 1.0)
+	_data.append_subkey_data(_key, "I", 2.0)
+
+	for _field, _value in _values.items():
+		_data.set_metadata(_key, _field, _value)
+
+	_file = str( tmp_path / "data.dat" )
+	_data.write_to_file(_file)
+
+	_read = QVisaDataObject()
+	_read.read_from_file(_file)
+
+	assert _read.roothash() == _data.roothash()
+	assert _read.get_metadata("__self__", "__note__") == "IV sweep"
+	assert _read.get_metadata("__self__", "operator") == "lab"
+	assert _read.get_subkey_data("iv", "I") == [2.0]
+
+	for _field, _value in _values.items():
+		_value = _value.tolist() if hasattr(_value, "tolist") else _value
+		assert _equal( _read.get_metadata("iv", _field), _value ), _field
+
+	assert _read.find_keys(int=10, str="Keithley 2400") == ["iv"]
+
+# Overwriting read drops metadata of the old keys
+def test_read_overwrite(tmp_path):
+
+	_data = QVisaDataObject()
+	_data.add_key("file")
+	_data.set_metadata("file", "nplc", 1.0)
+
+	_file = str( tmp_path / "data.dat" )
+	_data.write_to_file(_file)
+
+	_read = QVisaDataObject()
+	_read.add_key("old")
+	_read.set_metadata("old", "nplc", 10.0)
+	_read.read_from_file(_file, overwrite=True)
+
+	assert "old" not in _read.get_meta_table()
+	assert list( _read.get_meta_table().keys() ) == [_data.roothash(), "file"]
+	assert _read.find_keys(nplc=1.0) == ["file"]
+
+# Deleting rows keeps the columns aligned
+def test_del_rows():
+
+	_meta = QVisaMetaTable()
+
+	for _n in range(1000):
+		_meta.add_row(_n)
+		_meta.set_value(_n, "n", _n)
+
+	for _n in range(0, 1000, 2):
+		_meta.del_row(_n)
+
+	_meta.add_row("new")
+	_meta.set_value("new", "n", -1)
+
+	assert len(_meta) == 501
+	assert list( _meta.column("n") ) == list( range(1, 1000, 2) ) + [-1]
+	assert _meta.where( _meta.column("n") > 995 ) == [997, 999]
+	assert _meta.get_value(999, "n") == 999
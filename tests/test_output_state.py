@@ -0,0 +1,74 @@
+# ---------------------------------------------------------------------------------
+# 	test_output_state
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import driver and registry
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+
+# Output off is always written, also after a raw write switched it on
+def test_output_off_after_raw_write(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.output_off()
+	_smu.write(":OUTP:STAT ON")
+	assert _sim.settings["OUTP:STAT"] == "1"
+
+	_smu.output_off()
+	assert _sim.settings["OUTP:STAT"] == "0"
+
+# Raw writes drop cached values of commands with the same header
+def test_raw_write_invalidates_state(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_smu.set_current_nplc(1.0)
+
+	_smu.write(":SENS:CURR:NPLC 10;:SYST:AZER:STAT ONCE")
+	assert _smu.get_cached_value("current_nplc") is None
+	assert _smu.get_cached_value("autozero") is None
+	assert _smu.get_current_nplc() == 10.0
+
+# Closing the registry leaves all outputs off
+def test_close_devices_safe_state(station):
+
+	_registry = QVisaDeviceRegistry()
+
+	for _resource in ("GPIB0::24::INSTR", "GPIB0::25::INSTR"):
+		_smu = keithley2400(_resource)
+		_smu.output_off()
+		_smu.write(":OUTP:STAT ON")
+		_registry.add_device(_smu)
+
+	assert _registry.close_devices() == {}
+
+	for _resource in ("GPIB0::24::INSTR", "GPIB0::25::INSTR"):
+		assert station.get_resource(_resource).settings["OUTP:STAT"] == "0"
@@ -0,0 +1,76 @@
+# ---------------------------------------------------------------------------------
+# 	test_profiles
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+# Import driver
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+_headers = ("SYST:AZER:STAT", "DISP:ENAB", "SOUR:DEL:AUTO", "SENS:CURR:RANG:AUTO", "SENS:VOLT:RANG:AUTO")
+
+# Settings of the simulated instrument which are changed by profiles
+def _settings(_sim):
+	return dict( { _ : _sim.settings[_] for _ in _headers }, range=float( _sim.settings["SENS:CURR:RANG"] ) )
+
+# Profile is applied with overrides and restored from the previous values
+def test_apply_restore_profile(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+
+	_initial = _settings(_sim)
+	_time = _sim.reading_time()
+
+	_previous = _smu.apply_profile("max-throughput", current_range=1e-3)
+
+	assert [ _sim.settings[_] for _ in _headers ] == ["0"] * len(_headers)
+	assert float( _sim.settings["SENS:CURR:RANG"] ) == pytest.approx(1.05e-3)
+	assert _sim.reading_time() < _time
+	assert _previous["autozero"] is True and "current_range" in _previous
+
+	_smu.restore_profile(_previous)
+	assert _settings(_sim) == _initial
+	assert _sim.reading_time() == _time
+
+# use_profile restores the previous state when the block raises
+def test_use_profile_restore(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_initial = _settings(_sim)
+
+	with pytest.raises(RuntimeError):
+		with _smu.use_profile("balanced"):
+			assert _sim.settings["DISP:ENAB"] == "0"
+			raise RuntimeError("procedure failed")
+
+	assert _settings(_sim) == _initial
+	assert _smu.get_value("display") is True
@@ -0,0 +1,76 @@
+# ---------------------------------------------------------------------------------
+# 	test_readings
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+# Import driver
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+# Elements are selected in the fixed instrument order
+def test_set_elements(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.set_elements("stat", "curr", "Voltage")
+
+	assert _smu.get_elements() == ("VOLT", "CURR", "STAT")
+	assert station.get_resource("GPIB0::24::INSTR").settings["FORM:ELEM"] == "VOLT,CURR,STAT"
+	assert _smu.reading_dtype().names == ("volt", "curr", "stat", "overflow", "compliance", "range_compliance")
+
+	with pytest.raises(ValueError):
+		_smu.set_elements("VOLT", "OHMS")
+
+# Readings are decoded per element and the status word into flags
+def test_decode_readings(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.set_elements("VOLT", "CURR", "STAT")
+
+	_readings = _smu.decode_readings("+1.0E+00,+1.0E-03,+8.0E+00,+2.0E+00,+2.0E-03,+6.5545E+04")
+
+	assert list( _readings["volt"] ) == [1.0, 2.0]
+	assert list( _readings["curr"] ) == [1.0e-3, 2.0e-3]
+	assert list( _readings["compliance"] ) == [True, True]
+	assert list( _readings["overflow"] ) == [False, True]
+	assert list( _readings["range_compliance"] ) == [False, True]
+
+# Compliance of the simulated instrument is flagged in the status word
+def test_meas_array_compliance(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.set_elements("CURR", "STAT")
+	_smu.voltage_src()
+	_smu.write(":SENS:CURR:PROT 1e-4")
+	_smu.set_voltage(1.0)
+	_smu.output_on()
+
+	_readings = _smu.meas_array()
+
+	assert _readings.dtype.names[:2] == ("curr", "stat")
+	assert bool( _readings["compliance"][0] )
+	assert _readings["curr"][0] == pytest.approx(1.0e-4, rel=1e-2)
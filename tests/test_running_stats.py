@@ -0,0 +1,105 @@
+# ---------------------------------------------------------------------------------
+# 	test_running_stats
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+
+# Import running statistics and data object
+from PyQtVisa.utils.QVisaRunningStats import QVisaRunningStats
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# EWMA computed value by value
+def _ewma(_values, _alpha):
+
+	_average = _values[0]
+	for _value in _values[1:]:
+		_average = _alpha * _value + ( 1.0 - _alpha ) * _average
+
+	return _average
+
+# Single and batch updates agree with numpy
+def test_stats_numpy():
+
+	_values = np.random.default_rng(1).normal(1.0e-6, 1.0e-8, 1000)
+
+	_single = QVisaRunningStats(ewma=0.1)
+	for _value in _values:
+		_single.update(_value)
+
+	_batch = QVisaRunningStats(ewma=0.1)
+	_batch.update(_values[0])
+	for _chunk in np.array_split(_values[1:], 7):
+		_batch.update_array(_chunk)
+
+	for _stats in (_single, _batch):
+		assert _stats.get_count() == 1000
+		assert _stats.get_mean() == pytest.approx( _values.mean(), rel=1.0e-12 )
+		assert _stats.get_var() == pytest.approx( _values.var(), rel=1.0e-9 )
+		assert _stats.get_std(ddof=1) == pytest.approx( _values.std(ddof=1), rel=1.0e-9 )
+		assert _stats.get_min() == _values.min() and _stats.get_max() == _values.max()
+		assert _stats.get_last() == _values[-1]
+		assert _stats.get_ewma() == pytest.approx( _ewma(_values, 0.1), rel=1.0e-9 )
+
+# EWMA factor must be in (0, 1]
+@pytest.mark.parametrize("_alpha", [0.0, -0.5, 1.5])
+def test_stats_ewma_range(_alpha):
+
+	with pytest.raises(ValueError):
+		QVisaRunningStats(ewma=_alpha)
+
+# Statistics on data object subkeys follow appends and replaced data
+def test_subkey_stats():
+
+	_data = QVisaDataObject()
+	_key = _data.add_key("iv")
+	_data.add_subkey(_key, "I")
+	_data.enable_subkey_stats(_key, "I", ewma=1.0)
+
+	for _value in (1.0, 2.0, 3.0):
+		_data.append_subkey_data(_key, "I", _value)
+
+	# Rejected values are not stored
+	with pytest.raises(ValueError):
+		_data.append_subkey_data(_key, "I", "overflow")
+
+	assert _data.get_subkey_data(_key, "I") == [1.0, 2.0, 3.0]
+	assert _data.get_subkey_stats(_key, "I").get_mean() == 2.0
+
+	# Replaced data is taken into account on access
+	_data.set_subkey_data(_key, "I", [10.0, 20.0])
+	_data.append_subkey_data(_key, "I", 30.0)
+	assert _data.get_subkey_stats(_key, "I").summary()["mean"] == 20.0
+	assert _data.get_subkey_stats(_key, "I").get_ewma() == 30.0
+
+	# Configuration survives reset
+	_data.reset()
+	_data.add_key("iv")
+	_data.add_subkey("iv", "I")
+	_data.append_subkey_data("iv", "I", 5.0)
+	assert _data.get_subkey_stats("iv", "I").get_count() == 1
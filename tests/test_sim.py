@@ -0,0 +1,108 @@
+# ---------------------------------------------------------------------------------
+# 	test_sim
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+import pyvisa
+
+# Import simulated backend and benchmark harness
+from PyQtVisa.sim.QVisaSimResource import QVisaSimResource
+from PyQtVisa.sim.QVisaSimKeithley2400 import QVisaSimKeithley2400
+from benchmarks.QVisaBenchmark import QVisaBenchmark
+
+# Long form headers are normalized to the short form
+def test_normalize():
+
+	assert QVisaSimResource.normalize(":SENSe:CURRent:NPLCycles?") == "SENS:CURR:NPLC?"
+	assert QVisaSimResource.normalize(":SOURce:VOLTage:LEVel") == "SOUR:VOLT:LEV"
+	assert QVisaSimResource.normalize("*idn?") == "*IDN?"
+
+# Settings, error queue and readings of the 2400 model
+def test_keithley_model():
+
+	_sim = QVisaSimKeithley2400(noise=0.0, scale=0.0)
+	_sim.open()
+
+	_sim.write(":SOUR:FUNC VOLT;:SOUR:VOLT:LEV 1.0;:SENS:FUNC \"CURR\";:SENS:CURR:PROT 0.01;:OUTP:STAT ON")
+	assert _sim.query(":SOURce:VOLTage:LEVel?") == "1.0"
+
+	_sim.query(":BOGUS?")
+	assert _sim.query(":SYST:ERR?") == '-113,"Undefined header"'
+	assert _sim.query(":SYST:ERR?") == '0,"No error"'
+
+	_volt, _curr = [ float(_) for _ in _sim.query(":READ?").split(",")[:2] ]
+	assert _volt == pytest.approx(1.0) and _curr == pytest.approx(1.0e-3)
+
+# Readings take the modelled time and time out within the session timeout
+def test_timing_model():
+
+	_sim = QVisaSimKeithley2400(scale=1.0)
+	_sim.open()
+	_sim.write(":SENS:CURR:NPLC 0.5")
+
+	_t = time.perf_counter()
+	_sim.query(":READ?")
+	assert time.perf_counter() - _t >= 0.9 * _sim.reading_time()
+
+	_sim.timeout = 1
+	with pytest.raises(pyvisa.VisaIOError):
+		_sim.query(":READ?")
+
+	# Response stays queued
+	_sim.timeout = 2000
+	assert len( _sim.read().split(",") ) == 5
+
+# Injected faults fail all I/O until the session is reopened
+def test_fault():
+
+	_sim = QVisaSimKeithley2400(scale=0.0)
+	_sim.open()
+	_sim.inject_fault()
+
+	with pytest.raises(pyvisa.VisaIOError):
+		_sim.query("*IDN?")
+
+	_sim.open()
+	assert _sim.query("*IDN?").startswith("KEITHLEY")
+
+# Benchmark results and regression check against a baseline
+def test_benchmark(tmp_path):
+
+	_bench = QVisaBenchmark()
+	_result = _bench.run("sleep", lambda: time.sleep(1.0e-3), repeat=3, warmup=0, _units=2)
+	assert _result["n"] == 3 and _result["min"] >= 1.0e-3 and _result["rate"] < 2000.0
+
+	_baseline = str( tmp_path / "baseline.json" )
+	_bench.write_json(_baseline)
+	assert _bench.compare(_baseline) == []
+
+	_bench.add_result("sleep", 10.0)
+	assert [ _[0] for _ in _bench.compare(_baseline) ] == ["sleep"]
+	assert "sleep" in _bench.report()
@@ -0,0 +1,85 @@
+# ---------------------------------------------------------------------------------
+# 	test_source_memory
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+# Import driver
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+def _setup_smu(_station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_smu.voltage_src()
+	_smu.current_cmp(0.1)
+	_smu.output_on()
+	return _smu
+
+# Sequence runs through the locations in one :READ? and the source function
+# and trigger count are restored afterwards
+def test_run_sequence(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = _setup_smu(station)
+	_smu.set_trigger_count(2)
+
+	assert _smu.upload_sequence([ {"voltage" : 1.0}, {"voltage" : 2.0}, {"voltage" : 3.0} ], start=5) == [5, 6, 7]
+
+	_readings = _smu.run_sequence(6)
+	assert list( _readings["volt"] ) == pytest.approx([1.0, 2.0, 3.0, 1.0, 2.0, 3.0], rel=1e-2)
+
+	assert _sim.settings["SOUR:FUNC"] == "VOLT"
+	assert _sim.settings["TRIG:COUN"] == "2"
+	assert _smu.get_value("source_function") == "VOLT"
+	assert _smu.get_value("voltage") == 3.0
+
+	# Fixed levels are sourced again
+	_smu.set_voltage(0.5)
+	assert _smu.meas_array()["volt"][0] == pytest.approx(0.5, rel=1e-2)
+
+# Source function before the run is restored when the last location sources
+# another function
+def test_run_sequence_restore_function(station):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = _setup_smu(station)
+
+	_smu.upload_sequence([ {"voltage" : 1.0}, {"source_function" : "CURR", "current" : 1.0e-3} ])
+	_smu.set_source_function("VOLT")
+	_readings = _smu.run_sequence()
+
+	assert _readings["curr"][1] == pytest.approx(1.0e-3, rel=1e-2)
+	assert _sim.settings["SOUR:FUNC"] == "VOLT"
+	assert _smu.get_value("source_function") == "VOLT"
+
+# Running without sequence is an error
+def test_run_sequence_empty(station):
+
+	with pytest.raises(RuntimeError):
+		keithley2400("GPIB0::24::INSTR").run_sequence()
@@ -0,0 +1,110 @@
+# ---------------------------------------------------------------------------------
+# 	test_station_profile
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+
+# Import driver, registry and station profile
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from PyQtVisa.core.QVisaStationProfile import QVisaStationProfile
+
+_resource = "GPIB0::24::INSTR"
+
+# Configure device with output on and bus arm source
+def _configure(_registry):
+
+	_smu = keithley2400(_resource)
+	_smu.rst()
+	_smu.current_src()
+	_smu.set_current(1.0e-6)
+	_smu.set_voltage_nplc(10.0)
+	_smu.set_elements("VOLT", "STAT")
+	_smu.output_on()
+	_smu.set_arm_source("BUS")
+	_smu.write(":TRAC:CLE;:TRAC:FEED:CONT NEXT")
+
+	_registry.add_device(_smu)
+	return _smu
+
+# Output state and actions are not saved
+def test_save_filters_config(station, tmp_path):
+
+	_profile = QVisaStationProfile( str(tmp_path / "station.json") )
+	_registry = QVisaDeviceRegistry()
+	_configure(_registry)
+	assert _profile.save(_registry) == 1
+
+	_config = " ".join( _profile.load()[0]["config"] )
+	assert ":SOUR:FUNC CURR" in _config
+	for _command in ("OUTP", "ARM:SOUR", "TRAC:"):
+		assert _command not in _config
+
+# Warm start replays configuration into the state cache with the output off
+def test_warm_start(station, tmp_path):
+
+	_profile = QVisaStationProfile( str(tmp_path / "station.json") )
+	_smu = _configure( QVisaDeviceRegistry() )
+
+	# Profile written before output state and actions were filtered
+	with open(_profile.get_filename(), 'w') as f:
+		json.dump({"version" : 1, "devices" : [ {
+			"resource" : _resource, "driver" : "PyQtVisa.drivers.keithley2400:keithley2400",
+			"idn" : _smu.query("*IDN?").strip(), "config" : _smu.get_config_cache() + [":OUTP:STAT ON"],
+		} ] }, f)
+
+	_sim = station.get_resource(_resource)
+	_sim.settings["ARM:SOUR"] = "IMM"
+
+	_registry = QVisaDeviceRegistry()
+	assert _profile.warm_start(_registry) == {_resource : "warm"}
+
+	_smu = _registry.Devices[0]
+	assert _sim.settings["OUTP:STAT"] == "0"
+	assert _sim.settings["ARM:SOUR"] == "IMM"
+
+	assert _smu.get_cached_value("source_function") == "CURR"
+	assert _smu.get_cached_value("voltage_nplc") == 10.0
+	assert _smu.get_cached_value("elements") == "VOLT,STAT"
+	assert _smu.get_meas_timeout() > 2000.0 * 3 * 10 / 60.0
+
+# Driver errors fail the device and close its session
+def test_warm_start_error(station, tmp_path, monkeypatch):
+
+	_profile = QVisaStationProfile( str(tmp_path / "station.json") )
+	_registry = QVisaDeviceRegistry()
+	_configure(_registry)
+	_profile.save(_registry)
+
+	def _replay_config(self, _commands):
+		raise KeyError("replay")
+
+	monkeypatch.setattr(keithley2400, "replay_config", _replay_config)
+
+	assert _profile.warm_start( QVisaDeviceRegistry() ) == {_resource : "failed"}
+	assert not station.get_resource(_resource)._open
@@ -0,0 +1,81 @@
+# ---------------------------------------------------------------------------------
+# 	test_stream
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+
+# Import driver and data object
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# Streamed chunks are delivered to callback and data object. The trigger
+# model and the event status enable register are restored on stop.
+def test_stream(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.write(":SENS:CURR:PROT 0.01")
+	_smu.set_trigger_count(3)
+	_smu.set_ese(4)
+
+	_chunks = []
+	_data = QVisaDataObject()
+	_key = _smu.stream_start(10, 0.001, callback=lambda _readings: _chunks.append(len(_readings)), data=_data, key="stream")
+
+	for _ in range(500):
+		if len(_chunks) >= 3:
+			break
+		time.sleep(0.01)
+
+	_count = _smu.stream_stop()
+
+	assert _count == sum(_chunks) and len(_chunks) >= 3
+	assert set(_chunks[:3]) == {10}
+	assert len( _data.get_subkey_data(_key, "curr") ) == _count
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	assert _sim._ese == 4
+	assert _sim.settings["TRIG:COUN"] == "3"
+	assert _sim.settings["TRAC:FEED:CONT"] == "NEV"
+	assert not _smu.is_streaming()
+
+# Readings of an incomplete chunk are delivered on stop
+def test_stream_partial(station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.write(":SENS:CURR:PROT 0.01")
+
+	_chunks = []
+	_smu.stream_start(20, 10.0, callback=lambda _readings: _chunks.append(len(_readings)))
+
+	for _ in range(500):
+		if station.get_resource("GPIB0::24::INSTR")._buffer:
+			break
+		time.sleep(0.01)
+
+	assert _smu.stream_stop() == 20
+	assert _chunks == [20]
@@ -0,0 +1,87 @@
+# ---------------------------------------------------------------------------------
+# 	test_supervisor
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+
+# Import registry, supervisor and driver
+from PyQtVisa.core.QVisaDeviceRegistry import QVisaDeviceRegistry
+from PyQtVisa.core.QVisaSupervisor import QVisaSupervisor
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+_resources = ("GPIB0::24::INSTR", "GPIB0::25::INSTR")
+
+# Errors of one device are reported and do not stop the background thread
+def test_supervisor_error(station):
+
+	_registry = QVisaDeviceRegistry()
+	_smus = [ keithley2400(_) for _ in _resources ]
+	for _smu in _smus:
+		_registry.add_device(_smu)
+
+	def _fail():
+		raise RuntimeError("driver error")
+
+	_smus[0].get_idle_time = _fail
+
+	_events = []
+	_supervisor = QVisaSupervisor(_registry, interval=0.01, idle=0.0)
+	_supervisor.add_listener( lambda _event, _device: _events.append( (_event, _device.get_property("resource")) ) )
+	_supervisor.start()
+
+	for _ in range(100):
+		if len(_events) >= 2:
+			break
+		time.sleep(0.01)
+
+	assert _supervisor.is_running()
+	_supervisor.stop()
+
+	assert _supervisor.get_status() == { _resources[0] : "error", _resources[1] : "ok" }
+	assert isinstance( _supervisor.get_error(_resources[0]), RuntimeError )
+	assert _supervisor.get_error(_resources[1]) is None
+	assert set(_events) == { ("error", _resources[0]) }
+
+# Reconnect does not raise on a broken session or a failing reopen
+def test_reconnect_errors(station, monkeypatch):
+
+	_smu = keithley2400(_resources[0])
+	_inst = _smu.get_property("inst")
+
+	def _broken(_self):
+		raise RuntimeError("session lost")
+
+	monkeypatch.setattr(type(_inst), "timeout", property(_broken), raising=False)
+	assert _smu.reconnect()
+	monkeypatch.undo()
+
+	def _open_resource(_resource, **kwargs):
+		raise RuntimeError("backend error")
+
+	monkeypatch.setattr(station, "open_resource", _open_resource)
+	assert not _smu.reconnect()
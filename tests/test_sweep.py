@@ -0,0 +1,99 @@
+# ---------------------------------------------------------------------------------
+# 	test_sweep
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+# Import driver
+from PyQtVisa.drivers.keithley2400 import keithley2400
+
+# Voltage source into the simulated 1k load
+def _setup_smu(_station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_smu.voltage_src()
+	_smu.current_cmp(1.0)
+	_smu.output_on()
+	return _smu
+
+# Planned ranges hold the readings over four decades (both polarities)
+@pytest.mark.parametrize("_reorder", [False, True])
+def test_sweep_ranges(station, _reorder):
+
+	_smu = _setup_smu(station)
+
+	_decades = np.logspace(-3, 1, 9)
+	_levels = np.concatenate([_decades, -_decades[::-1]])
+	_readings = _smu.sweep(_levels, reorder=_reorder)
+
+	assert not _readings["overflow"].any()
+	assert _readings["curr"] == pytest.approx(_levels / 1.0e3, rel=1e-2)
+	assert _smu.get_sweep_result()["measured"] == len(_levels)
+
+# Range and autorange state of the sense function are restored
+@pytest.mark.parametrize("_range", [None, 1.05e-2])
+def test_sweep_restores_range(station, _range):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = _setup_smu(station)
+	_smu.set_sense_range("CURR", _range)
+
+	_smu.sweep([1e-3, 1e-2, 1e-1, 1.0])
+
+	if _range is None:
+		assert _sim.settings["SENS:CURR:RANG:AUTO"] == "1"
+
+	else:
+		assert _sim.settings["SENS:CURR:RANG:AUTO"] == "0"
+		assert float( _sim.settings["SENS:CURR:RANG"] ) == _range
+
+# Function replies of the instrument are normalized. Source memory and 
+# resistance sense are rejected.
+@pytest.mark.parametrize("_source, _sense, _expected", [
+	("VOLT", '"CURR:DC"', ("VOLT", "CURR")),
+	("CURR", '"VOLT:DC","CURR:DC"', ("CURR", "VOLT")),
+	("MEM", '"CURR:DC"', None),
+	("VOLT", '"RES"', None),
+])
+def test_sweep_functions(station, _source, _sense, _expected):
+
+	_sim = station.get_resource("GPIB0::24::INSTR")
+	_smu = keithley2400("GPIB0::24::INSTR")
+
+	_sim.settings["SOUR:FUNC"] = _source
+	_sim.settings["SENS:FUNC"] = _sense
+	_smu.invalidate_state()
+
+	if _expected is None:
+		with pytest.raises(ValueError):
+			_smu.sweep([0.1])
+
+	else:
+		assert _smu.get_sweep_functions() == _expected
@@ -0,0 +1,105 @@
+# ---------------------------------------------------------------------------------
+# 	test_sweep_policy
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+# Import driver and data object
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.utils.QVisaDataObject import QVisaDataObject
+
+# Bipolar levels. The simulated 1k load is in compliance (1mA) above 1V.
+_levels = np.array([0.2, 0.5, 1.5, 2.0, 3.0, -0.2, -0.5, -1.5, -2.0, -3.0])
+
+def _setup_smu(_station):
+
+	_smu = keithley2400("GPIB0::24::INSTR")
+	_smu.rst()
+	_smu.voltage_src()
+	_smu.current_cmp(1.0e-3)
+	_smu.output_on()
+	return _smu
+
+# Points measured, termination and level per policy
+@pytest.mark.parametrize("_policy, _failures, _measured, _termination, _level", [
+	("continue", 1, 10, None, None),
+	("skip", 1, 6, "compliance", -1.5),
+	("skip", 2, 8, "compliance", -2.0),
+	("abort", 1, 3, "compliance", 1.5),
+])
+def test_sweep_policy(station, _policy, _failures, _measured, _termination, _level):
+
+	_smu = _setup_smu(station)
+	_readings = _smu.sweep(_levels, policy=_policy, failures=_failures)
+	_result = _smu.get_sweep_result()
+
+	assert _result["measured"] == _measured and _result["points"] == len(_levels)
+	assert _result["termination"] == _termination
+	assert _result["termination_level"] == _level
+
+	# Skipped points are nan and never flagged
+	_skipped = np.isnan(_readings["curr"])
+	assert _skipped.sum() == len(_levels) - _measured
+	assert not _readings["compliance"][_skipped].any()
+
+	if _policy == "skip":
+		assert list( _levels[_skipped] ) == ( [3.0, -3.0] if _failures == 2 else [2.0, 3.0, -2.0, -3.0] )
+
+# An open device is detected from the reading magnitude
+def test_sweep_open(station):
+
+	_smu = _setup_smu(station)
+	station.get_resource("GPIB0::24::INSTR").load = float("inf")
+
+	_smu.sweep(_levels, policy="abort", open_level=1.0e-9)
+	assert _smu.get_sweep_result() == {"points" : 10, "measured" : 1, "termination" : "open", "termination_level" : 0.2}
+
+# Measured points and the outcome are stored in the data object
+def test_sweep_data(station):
+
+	_smu = _setup_smu(station)
+	_data = QVisaDataObject()
+
+	_smu.sweep(_levels, policy="abort", data=_data, key="sweep")
+
+	assert _data.get_subkey_data("sweep", "level") == [0.2, 0.5, 1.5]
+	assert _data.get_metadata("sweep", "termination") == "compliance"
+	assert _data.get_metadata("sweep", "measured") == 3
+
+# Policies are validated and require the status word
+def test_sweep_policy_errors(station):
+
+	_smu = _setup_smu(station)
+
+	with pytest.raises(ValueError):
+		_smu.sweep(_levels, policy="stop")
+
+	_smu.set_elements("VOLT", "CURR")
+	with pytest.raises(ValueError):
+		_smu.sweep(_levels, policy="skip")
@@ -0,0 +1,83 @@
+# ---------------------------------------------------------------------------------
+# 	test_trace
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import drivers, trace and simulated backend
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.drivers.QVisaTrace import QVisaTraceReader
+from PyQtVisa.core.QVisaTriggerGroup import QVisaTriggerGroup
+from PyQtVisa.sim.QVisaSimResourceManager import QVisaSimResourceManager
+from PyQtVisa.sim.QVisaReplayResource import QVisaReplayResource
+
+_resource = "GPIB0::24::INSTR"
+
+# Session with a long message and a triggered acquisition
+def _session(_smu):
+
+	_smu.write(":SOUR:LIST:VOLT %s"%",".join( ["0.001"] * 20000 ))
+	_smu.set_voltage(0.5)
+	_smu.output_on()
+
+	_readings = QVisaTriggerGroup([_smu]).measure(count=2)[_resource]
+	return [ _smu.query("*IDN?"), _readings["curr"].tolist() ]
+
+# Trace records long messages, triggers and clears and replays the session
+def test_trace_round_trip(station, tmp_path):
+
+	_file = str( tmp_path / "smu.trace" )
+
+	_smu = keithley2400(_resource)
+	_smu.rst()
+	_smu.start_recording(_file)
+	_recorded = _session(_smu)
+
+	_smu.query_start("*IDN?")
+	_smu.query_cancel()
+	_smu.stop_recording()
+
+	_ops = [ _[0] for _ in QVisaTraceReader(_file).records() ]
+	assert len( QVisaTraceReader(_file).records()[0][3] ) > 65535
+	assert "assert_trigger" in _ops and _ops[-1] == "clear"
+
+	# Replay against the trace
+	_rm = QVisaSimResourceManager()
+	_replay = _rm.add_resource( QVisaReplayResource(_file, scale=0.0) )
+	_rm.install()
+
+	try:
+		_smu = keithley2400(_resource)
+		_smu.invalidate_state()
+		assert _session(_smu) == _recorded
+
+		_smu.query_start("*IDN?")
+		_smu.query_cancel()
+		assert _replay.remaining() == 0
+
+	finally:
+		_rm.uninstall()
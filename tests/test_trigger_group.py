@@ -0,0 +1,50 @@
+# ---------------------------------------------------------------------------------
+# 	test_trigger_group
+#	Copyright (C) 2019 Michael Winters
+#	github: https://github.com/mesoic
+#	email:  mesoic@protonmail.com
+# ---------------------------------------------------------------------------------
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+
+
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import driver and trigger group
+from PyQtVisa.drivers.keithley2400 import keithley2400
+from PyQtVisa.core.QVisaTriggerGroup import QVisaTriggerGroup
+
+# Trigger model of the members is restored after measure
+def test_measure_restores_trigger_model(station):
+
+	_smus = [ keithley2400(_) for _ in ("GPIB0::24::INSTR", "GPIB0::25::INSTR") ]
+
+	for _smu in _smus:
+		_smu.rst()
+		_smu.set_trigger_count(5)
+
+	_readings = QVisaTriggerGroup(_smus).measure(count=3)
+	assert [ len(_) for _ in _readings.values() ] == [3, 3]
+
+	for _smu in _smus:
+		assert _smu.get_arm_source(cached=False) == "IMM"
+		assert _smu.get_trigger_count(cached=False) == 5
+		assert ":ARM:SOUR IMM" in _smu.get_config_cache()